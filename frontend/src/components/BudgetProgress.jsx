@@ -5,11 +5,16 @@ import { PieChart, Pie, Cell, ResponsiveContainer } from 'recharts';
 import { Colors } from 'chart.js';
 
 export default function BudgetProgress({ budget, onDelete }) {
-  const [progress, setProgress] = useState(null);
+  const [progress, setProgress] = useState(budget.progress || null);
 
   useEffect(() => {
-    fetchProgress();
-  }, [budget.id]);
+    // The budgets list already embeds progress; only fetch it when missing.
+    if (budget.progress) {
+      setProgress(budget.progress);
+    } else {
+      fetchProgress();
+    }
+  }, [budget.id, budget.progress]);
 
   const fetchProgress = async () => {
     try {
@@ -104,7 +104,7 @@ export default function TransactionReport() {
           <div>
             <h3 className="text-lg font-semibold mb-3">Summary</h3>
             <div className="grid grid-cols-1 md:grid-cols-3 gap-4">
-              {Object.entries(report.summary || {}).map(([key, value]) => (
+              {Object.entries(report.summary || {}).filter(([key]) => key !== 'count').map(([key, value]) => (
                 <div key={key} className="bg-gray-50 p-4 rounded-md">
                   <p className="text-sm text-gray-500 capitalize">{key.replace(/_/g, ' ')}</p>
                   <p className="text-lg font-semibold">{Number(value).toFixed(2)} RWF</p>
@@ -121,7 +121,7 @@ export default function TransactionReport() {
                   <thead className="bg-gray-50">
                     <tr>
                       <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">Category</th>
-                      <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">Total Amount</th>
+                      <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">Spent</th>
                       <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">Count</th>
                     </tr>
                   </thead>
@@ -129,7 +129,7 @@ export default function TransactionReport() {
                     {report.by_category.map((item, index) => (
                       <tr key={index}>
                         <td className="px-6 py-4 whitespace-nowrap">{item.category__name}</td>
-                        <td className="px-6 py-4 whitespace-nowrap">{Number(item.total).toFixed(2)} RWF</td>
+                        <td className="px-6 py-4 whitespace-nowrap">{Number(item.total_out).toFixed(2)} RWF</td>
                         <td className="px-6 py-4 whitespace-nowrap">{item.count}</td>
                       </tr>
                     ))}
@@ -139,22 +139,22 @@ export default function TransactionReport() {
             </div>
           )}
 
-          {report.daily_totals?.length > 0 && (
+          {report.period_totals?.length > 0 && (
             <div>
-              <h3 className="text-lg font-semibold mb-3">Daily Totals</h3>
+              <h3 className="text-lg font-semibold mb-3">Totals by Period</h3>
               <div className="overflow-x-auto">
                 <table className="min-w-full divide-y divide-gray-200">
                   <thead className="bg-gray-50">
                     <tr>
                       <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">Date</th>
-                      <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">Total</th>
+                      <th className="px-6 py-3 text-left text-xs font-medium text-gray-500 uppercase tracking-wider">Net</th>
                     </tr>
                   </thead>
                   <tbody className="bg-white divide-y divide-gray-200">
-                    {report.daily_totals.map((day, index) => (
+                    {report.period_totals.map((day, index) => (
                       <tr key={index}>
-                        <td className="px-6 py-4 whitespace-nowrap">{format(new Date(day.day), 'MMM d, yyyy')}</td>
-                        <td className="px-6 py-4 whitespace-nowrap">{Number(day.total).toFixed(2)} RWF</td>
+                        <td className="px-6 py-4 whitespace-nowrap">{format(new Date(day.period), 'MMM d, yyyy')}</td>
+                        <td className="px-6 py-4 whitespace-nowrap">{Number(day.net).toFixed(2)} RWF</td>
                       </tr>
                     ))}
                   </tbody>
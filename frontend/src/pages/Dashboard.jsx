@@ -38,13 +38,16 @@ export default function Dashboard() {
   useEffect(() => {
     const fetchData = async () => {
       try {
-        const [transactionsRes, accountsRes, budgetsRes] = await Promise.all([
-          transactionAPI.getAll(),
+        // The chart is aggregated by the server; only the latest page of
+        // transactions is listed.
+        const [transactionsRes, seriesRes, accountsRes, budgetsRes] = await Promise.all([
+          transactionAPI.getPage(),
+          transactionAPI.getVisualizationData({ period: 'daily' }),
           accountAPI.getAll(),
           budgetAPI.getAll(),
         ])
         
-        processTransactionData(transactionsRes.data)
+        processSeries(seriesRes.data.time_series)
         setAccounts(accountsRes.data)
         setBudgets(budgetsRes.data)
         setTransactions(transactionsRes.data)
@@ -59,22 +62,20 @@ export default function Dashboard() {
     fetchData()
   }, [])
 
-  const processTransactionData = (transactions) => {
-    // Group transactions by date
-    const dates = [...new Set(transactions.map(t => t.date))].sort()
-    const incomeData = dates.map(date => 
-      transactions
-        .filter(t => t.date === date && t.type === 'IN')
-        .reduce((sum, t) => sum + parseFloat(t.amount), 0)
-    )
-    const expenseData = dates.map(date => 
-      transactions
-        .filter(t => t.date === date && t.type === 'OUT')
-        .reduce((sum, t) => sum + parseFloat(t.amount), 0)
-    )
+  const processSeries = (series) => {
+    // Daily totals for the year; days without income or expenses are dropped.
+    const days = series.buckets
+      .map((date, i) => ({
+        date,
+        income: parseFloat(series.total_in[i]),
+        expense: parseFloat(series.total_out[i]),
+      }))
+      .filter((day) => day.income || day.expense)
+    const incomeData = days.map((day) => day.income)
+    const expenseData = days.map((day) => day.expense)
 
     setChartData({
-      labels: dates,
+      labels: days.map((day) => day.date),
       datasets: [
         {
           label: 'Income',
@@ -7,7 +7,9 @@ import { Plus } from 'lucide-react'
 
 export default function Transactions() {
   const [transactions, setTransactions] = useState([])
+  const [nextCursor, setNextCursor] = useState(null)
   const [loading, setLoading] = useState(true)
+  const [loadingMore, setLoadingMore] = useState(false)
   const [error, setError] = useState(null)
   const [showReport, setShowReport] = useState(false)
 
@@ -18,8 +20,9 @@ export default function Transactions() {
   const fetchTransactions = async () => {
     try {
       setLoading(true)
-      const response = await transactionAPI.getAll()
+      const response = await transactionAPI.getPage()
       setTransactions(response.data)
+      setNextCursor(response.next)
     } catch (err) {
       setError('Failed to fetch transactions')
     } finally {
@@ -27,6 +30,19 @@ export default function Transactions() {
     }
   }
 
+  const fetchMore = async () => {
+    try {
+      setLoadingMore(true)
+      const response = await transactionAPI.getPage({}, nextCursor)
+      setTransactions((loaded) => [...loaded, ...response.data])
+      setNextCursor(response.next)
+    } catch (err) {
+      setError('Failed to fetch transactions')
+    } finally {
+      setLoadingMore(false)
+    }
+  }
+
   if (loading) return <div className="text-center">Loading transactions...</div>
   if (error) return <div className="text-center text-red-500">{error}</div>
 
@@ -55,6 +71,17 @@ export default function Transactions() {
       
       <div className="bg-white rounded-lg shadow p-6">
         <TransactionList transactions={transactions} onTransactionDeleted={fetchTransactions} />
+        {nextCursor && (
+          <div className="mt-4 text-center">
+            <button
+              onClick={fetchMore}
+              disabled={loadingMore}
+              className="bg-forest-900 text-white px-4 py-2 rounded-md hover:bg-forest-800 disabled:opacity-50"
+            >
+              {loadingMore ? 'Loading...' : 'Load more'}
+            </button>
+          </div>
+        )}
       </div>
     </div>
   )
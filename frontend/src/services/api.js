@@ -56,12 +56,25 @@ export const authAPI = {
   getUserDetails: () => api.get('/auth/user/'),
 };
 
+// Transaction listings are cursor-paginated. A page resolves with its rows as
+// `data` and the cursors of the neighbouring pages as `next` and `previous`
+// (null at either end); pass one back as `cursor` to load that page.
+const cursorOf = (link) => (link ? new URL(link).searchParams.get('cursor') : null);
+
+const fetchPage = async (url, params, cursor) => {
+  const response = await api.get(url, { params: cursor ? { ...params, cursor } : params });
+  const { results, next, previous } = response.data;
+  return { ...response, data: results, next: cursorOf(next), previous: cursorOf(previous) };
+};
+
 export const accountAPI = {
   getAll: () => api.get('/api/accounts/'),
   getOne: (id) => api.get(`/api/accounts/${id}/`),
   create: (data) => api.post('/api/accounts/', data),
   update: (id, data) => api.put(`/api/accounts/${id}/`, data),
   delete: (id) => api.delete(`/api/accounts/${id}/`),
+  getTransactions: (id, params, cursor) => fetchPage(`/api/accounts/${id}/transactions/`, params, cursor),
+  getBalance: (id, asOf) => api.get(`/api/accounts/${id}/balance/`, { params: asOf ? { as_of: asOf } : {} }),
 };
 
 export const categoryAPI = {
@@ -73,7 +86,7 @@ export const categoryAPI = {
 };
 
 export const transactionAPI = {
-  getAll: (params) => api.get('/api/transactions/', { params }),
+  getPage: (params, cursor) => fetchPage('/api/transactions/', params, cursor),
   getOne: (id) => api.get(`/api/transactions/${id}/`),
   create: (data) => api.post('/api/transactions/', data),
   update: (id, data) => api.put(`/api/transactions/${id}/`, data),
@@ -84,6 +97,13 @@ export const transactionAPI = {
     end_date: params.end_date
   } }),
   getVisualizationData: (params) => api.get('/api/transactions/visualization_data/', { params }),
+  exportFile: (params) => api.get('/api/transactions/export/', {
+    params,
+    responseType: 'blob',
+  }),
+  importFile: (formData) => api.post('/api/transactions/import/', formData, {
+    headers: { 'Content-Type': 'multipart/form-data' },
+  }),
 };
 
 export const budgetAPI = {
@@ -93,6 +113,7 @@ export const budgetAPI = {
   update: (id, data) => api.put(`/api/budgets/${id}/`, data),
   delete: (id) => api.delete(`/api/budgets/${id}/`),
   getProgress: (id) => api.get(`/api/budgets/${id}/progress/`),
+  getAllProgress: () => api.get('/api/budgets/progress/'),
 };
 
 export default api;
\ No newline at end of file
@@ -1,7 +1,18 @@
 from django.contrib import admin
-from .models import Account, Category, Transaction, Budget
+from .models import Account, Category, Transaction, RecurringTransaction, Budget, FxRate
+
+
+@admin.register(Account)
+class AccountAdmin(admin.ModelAdmin):
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        # Account.save() leaves the balance of an existing account alone.
+        if change and "balance" in form.changed_data:
+            obj.set_balance(form.cleaned_data["balance"])
+
 
-admin.site.register(Account)
 admin.site.register(Category)
 admin.site.register(Transaction)
+admin.site.register(RecurringTransaction)
 admin.site.register(Budget)
+admin.site.register(FxRate)
@@ -0,0 +1,594 @@
+import asyncio
+import calendar
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from decimal import Decimal
+
+import numpy as np
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import BooleanField, Case, DateField, F, Q, Sum, Value, When
+from django.db.models.functions import TruncMonth, TruncWeek
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .fx import fx_rates
+from .models import CENT, Budget, DailyRollup, MonthlyRollup
+from .series import (
+    PERIODS,
+    bucket_starts,
+    bucketed_sums,
+    compact,
+    daily_matrix,
+    linear_trends,
+    moving_averages,
+    projected_totals,
+    to_amounts,
+    to_cents,
+)
+
+REPORT_GROUPINGS = {
+    "day": F("period"),
+    "week": TruncWeek("period"),
+    "month": TruncMonth("period"),
+}
+
+FLOWS = ("total_in", "total_out", "total_transfer")
+
+
+def _empty_totals():
+    totals = {flow: Decimal("0") for flow in FLOWS}
+    totals["count"] = 0
+    return totals
+
+
+def _add(totals, row):
+    for flow in FLOWS:
+        totals[flow] += row[flow]
+    totals["count"] += row["count"]
+
+
+def _flow_sums():
+    """Income, expense and transfer totals split by conditional aggregation."""
+    return {
+        "total_in": Sum("total", filter=Q(type="IN"), default=Decimal("0")),
+        "total_out": Sum("total", filter=Q(type="OUT"), default=Decimal("0")),
+        "total_transfer": Sum("total", filter=Q(type="TRANSFER"), default=Decimal("0")),
+        "count": Sum("count"),
+    }
+
+
+def _decimal(value):
+    if isinstance(value, Decimal):
+        return value
+    # SQLite can hand back sums as floats; go through str to keep the cents.
+    return Decimal(str(value or 0))
+
+
+def _grouped(rollups, fields, expressions, sums, monthly=None):
+    """
+    ``rollups`` grouped by ``fields`` and ``expressions`` with ``sums`` in the
+    base currency. Rows of accounts in other currencies are grouped per
+    currency and day as well, so each group converts at its day's rate before
+    being folded back into its group; base-currency rows group exactly as
+    they would without conversion.
+
+    With ``monthly = (buckets, expressions, covered)`` the monthly rollups
+    ``buckets`` stand in for the daily ``rollups`` of the whole months in the
+    ``covered`` (first, last) day range. Only the days of ``rollups`` outside
+    it, and currencies found in ``buckets``, are read back from the daily
+    rollups.
+    """
+    base = settings.BASE_CURRENCY
+    currency = {"currency": F("account__currency")}
+    day = Case(
+        When(account__currency=base, then=None),
+        default=F("period"),
+        output_field=DateField(),
+    )
+    daily = {**expressions, **currency, "day": day}
+    if monthly is None:
+        rows = _values(rollups, fields, daily, sums)
+    else:
+        buckets, monthly_expressions, covered = monthly
+        rows = _values(buckets, fields, {**monthly_expressions, **currency}, sums)
+        foreign = {row["currency"] for row in rows} - {base}
+        rows = [row for row in rows if row["currency"] == base]
+        # Partial months at either edge, and foreign amounts to convert by day.
+        remainder = ~Q(period__range=covered)
+        if foreign:
+            remainder |= Q(account__currency__in=foreign)
+        rows += _values(rollups.filter(remainder), fields, daily, sums)
+
+    keys = [*fields, *expressions]
+    converted = [row for row in rows if row["currency"] != base]
+    rates = fx_rates.rates({(row["currency"], row["day"]) for row in converted})
+    amounts = [name for name in sums if name != "count"]
+    groups = {}
+    for row in rows:
+        key = tuple(row[name] for name in keys)
+        rate = rates.get((row["currency"], row.get("day")))
+        group = groups.get(key)
+        if group is None and rate is None:
+            groups[key] = {name: row[name] for name in (*keys, *sums)}
+            continue
+        if group is None:
+            group = groups[key] = {name: row[name] for name in keys}
+        for name in amounts:
+            amount = _decimal(row[name])
+            if rate is not None:
+                amount = (amount * rate).quantize(CENT)
+            group[name] = _decimal(group.get(name)) + amount
+        if "count" in sums:
+            group["count"] = (group.get("count") or 0) + row["count"]
+    return list(groups.values())
+
+
+def _values(queryset, fields, expressions, sums):
+    return list(queryset.values(*fields, **expressions).annotate(**sums).order_by())
+
+
+def _date_range(params):
+    start_date = params.get("start_date")
+    end_date = params.get("end_date")
+    if not start_date or not end_date:
+        raise ValueError("start_date and end_date are required")
+    try:
+        start_date = parse_date(start_date)
+        end_date = parse_date(end_date)
+    except ValueError:
+        start_date = end_date = None
+    if not start_date or not end_date:
+        raise ValueError("Invalid date format. Use YYYY-MM-DD")
+    if start_date > end_date:
+        raise ValueError("start_date must be before end_date")
+    return start_date, end_date
+
+
+def report_parameters(params):
+    """
+    Validate the report query parameters, returning ``(start_date, end_date,
+    group_by)`` or raising ``ValueError`` with a message for the client.
+    """
+    start_date, end_date = _date_range(params)
+    group_by = params.get("group_by", "day")
+    if group_by not in REPORT_GROUPINGS:
+        raise ValueError("group_by must be one of day, week, month")
+    return start_date, end_date, group_by
+
+
+def visualization_parameters(params):
+    """
+    Validate the chart query parameters, returning ``(period, start_date,
+    end_date)``. The range is ``start_date`` to ``end_date`` when given and
+    otherwise the whole of ``year`` (default: the current year).
+    """
+    period = params.get("period", "monthly")
+    if period not in PERIODS:
+        raise ValueError(f"period must be one of {', '.join(PERIODS)}")
+    if params.get("start_date") or params.get("end_date"):
+        start_date, end_date = _date_range(params)
+    else:
+        try:
+            year = int(params.get("year", timezone.localdate().year))
+            start_date, end_date = date(year, 1, 1), date(year, 12, 31)
+        except ValueError:
+            raise ValueError("year must be a valid year")
+    return period, start_date, end_date
+
+
+def forecast_parameters(params):
+    """
+    Validate the forecast query parameters, returning ``(as_of, months,
+    window)``: the day the forecast is made on (default: today), the number
+    of whole months of history before its month, and the moving-average
+    window in days.
+    """
+    as_of = params.get("as_of")
+    if as_of:
+        try:
+            as_of = parse_date(as_of)
+        except ValueError:
+            as_of = None
+        if not as_of:
+            raise ValueError("Invalid date format. Use YYYY-MM-DD")
+    else:
+        as_of = timezone.localdate()
+    try:
+        months = int(params.get("months", 3))
+        window = int(params.get("window", 7))
+    except ValueError:
+        raise ValueError("months and window must be whole numbers")
+    if not 1 <= months <= 24:
+        raise ValueError("months must be between 1 and 24")
+    # At least one whole month of history precedes the window's first day.
+    if not 1 <= window <= 28:
+        raise ValueError("window must be between 1 and 28")
+    return as_of, months, window
+
+
+def build_report(user, start_date, end_date, group_by="day"):
+    """
+    Build every section of the transaction report from a single grouped scan
+    of the daily rollups. Each row of the scan is one (bucket, account,
+    category) cell with income, expense and transfer totals split by
+    conditional aggregation; the sections are folded from those cells.
+    """
+    rollups = DailyRollup.objects.filter(
+        user=user, period__range=[start_date, end_date]
+    )
+    cells = _grouped(
+        rollups,
+        ["account_id", "account__name", "category_id", "category__name"],
+        {"bucket": REPORT_GROUPINGS[group_by]},
+        _flow_sums(),
+    )
+
+    summary = _empty_totals()
+    by_category = {}
+    by_account = {}
+    by_period = {}
+    for row in cells:
+        _add(summary, row)
+        category = by_category.setdefault(
+            row["category_id"],
+            {"category__name": row["category__name"], **_empty_totals()},
+        )
+        _add(category, row)
+        account = by_account.setdefault(
+            row["account_id"],
+            {"account__name": row["account__name"], **_empty_totals()},
+        )
+        _add(account, row)
+        _add(by_period.setdefault(row["bucket"], _empty_totals()), row)
+
+    return _assemble_report(
+        start_date, end_date, group_by, summary, by_category, by_account, by_period
+    )
+
+
+def _assemble_report(
+    start_date, end_date, group_by, summary, by_category, by_account, by_period
+):
+    summary["net"] = summary["total_in"] - summary["total_out"]
+    for totals in by_period.values():
+        totals["net"] = totals["total_in"] - totals["total_out"]
+
+    return {
+        "currency": settings.BASE_CURRENCY,
+        "period": {
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat(),
+            "group_by": group_by,
+        },
+        "summary": summary,
+        "by_category": sorted(
+            by_category.values(), key=lambda row: row["total_out"], reverse=True
+        ),
+        "by_account": sorted(by_account.values(), key=lambda row: row["account__name"]),
+        "period_totals": [
+            {"period": bucket, **by_period[bucket]} for bucket in sorted(by_period)
+        ],
+    }
+
+
+def _series_rows(user, period, start_date, end_date):
+    """
+    Income and expense per day (daily and weekly charts) or per month (the
+    rest, read from the monthly rollups) over the range.
+    """
+    sums = {
+        "total_in": Sum("total", filter=Q(type="IN")),
+        "total_out": Sum("total", filter=Q(type="OUT")),
+    }
+    if period in ("daily", "weekly"):
+        daily = DailyRollup.objects.filter(
+            user=user, period__range=[start_date, end_date]
+        )
+        return _grouped(daily, [], {"bucket": F("period")}, sums)
+
+    daily, buckets, covered = _monthly_rollups(user, start_date, end_date)
+    return _grouped(
+        daily,
+        [],
+        {"bucket": TruncMonth("period")},
+        sums,
+        monthly=(
+            None if buckets is None else (buckets, {"bucket": F("period")}, covered)
+        ),
+    )
+
+
+def _time_series(user, period, start_date, end_date):
+    """Gap-filled income, expense and net per bucket in the columnar format."""
+    rows = _series_rows(user, period, start_date, end_date)
+    starts, cents = bucketed_sums(
+        period,
+        start_date,
+        end_date,
+        [row["bucket"] for row in rows],
+        {
+            "total_in": to_cents(_decimal(row["total_in"]) for row in rows),
+            "total_out": to_cents(_decimal(row["total_out"]) for row in rows),
+        },
+    )
+    cents["net"] = cents["total_in"] - cents["total_out"]
+    return {"period": period, **compact(starts, cents)}
+
+
+def _top_categories(user, start_date, end_date):
+    daily, buckets, covered = _monthly_rollups(user, start_date, end_date)
+    rows = _grouped(
+        daily,
+        ["category__name"],
+        {},
+        {"total": Sum("total")},
+        monthly=None if buckets is None else (buckets, {}, covered),
+    )
+    return sorted(rows, key=lambda row: row["total"], reverse=True)[:5]
+
+
+def _monthly_rollups(user, start_date, end_date):
+    """
+    The daily rollups of the range, and the monthly rollups of the whole
+    calendar months inside it with the (first, last) day they cover. Both
+    are None when the range contains no whole month.
+    """
+    daily = DailyRollup.objects.filter(user=user, period__range=[start_date, end_date])
+    first = start_date
+    if first.day != 1:
+        first = (first.replace(day=28) + timedelta(days=4)).replace(day=1)
+    last = end_date
+    if (last + timedelta(days=1)).day != 1:
+        last = last.replace(day=1) - timedelta(days=1)
+    if first > last:
+        return daily, None, None
+    return (
+        daily,
+        MonthlyRollup.objects.filter(user=user, period__range=[first, last]),
+        (first, last),
+    )
+
+
+def _visualization(start_date, end_date, time_series, category_data):
+    return {
+        "currency": settings.BASE_CURRENCY,
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat(),
+        "time_series": time_series,
+        "category_distribution": category_data,
+    }
+
+
+def build_visualization(user, period, start_date, end_date):
+    """
+    Chart data for the range: a gap-filled time series in ``period`` buckets
+    and the top five categories.
+    """
+    return _visualization(
+        start_date,
+        end_date,
+        _time_series(user, period, start_date, end_date),
+        _top_categories(user, start_date, end_date),
+    )
+
+
+def _amounts(cents):
+    return to_amounts(np.rint(cents))
+
+
+def build_forecast(user, as_of, months, window):
+    """
+    Spending trends and projections per category as of the day ``as_of``.
+
+    The expenses of the ``months`` whole months before ``as_of``'s month and
+    of that month so far, in the base currency, are read from the daily
+    rollups into one category x day matrix, from which every category's
+    moving averages, monthly totals and least-squares trend are computed
+    together. The trend projects each category's spend to the end of the
+    month and each active budget's spend up to ``as_of`` to the end of its
+    period. Budgets are in the base currency, so their spend and trends only
+    count the expenses of accounts in it.
+    """
+    month = as_of.replace(day=1)
+    start = date(
+        month.year + (month.month - months - 1) // 12,
+        (month.month - months - 1) % 12 + 1,
+        1,
+    )
+    month_end = month.replace(day=calendar.monthrange(month.year, month.month)[1])
+    budgets = list(
+        Budget.objects.filter(user=user, start_date__lte=as_of, end_date__gte=as_of)
+        .select_related("category")
+        .order_by("end_date", "pk")
+    )
+    # Budgets that started before the history still count all of their spend.
+    first = min([start, *(budget.start_date for budget in budgets)])
+    base = Case(
+        When(account__currency=settings.BASE_CURRENCY, then=Value(True)),
+        default=Value(False),
+        output_field=BooleanField(),
+    )
+    rows = _grouped(
+        DailyRollup.objects.filter(user=user, type="OUT", period__range=[first, as_of]),
+        ["category_id", "category__name"],
+        {"bucket": F("period"), "base": base},
+        {"total": Sum("total")},
+    )
+
+    index = {}
+    names = {}
+    for row in rows:
+        index.setdefault(row["category_id"], len(index))
+        names[row["category_id"]] = row["category__name"]
+    for budget in budgets:
+        index.setdefault(budget.category_id, len(index))
+        names[budget.category_id] = budget.category.name
+
+    spend, counted = (
+        daily_matrix(
+            first,
+            as_of,
+            [index[row["category_id"]] for row in selected],
+            len(index),
+            [row["bucket"] for row in selected],
+            to_cents(_decimal(row["total"]) for row in selected),
+        )
+        for selected in (rows, [row for row in rows if row["base"]])
+    )
+    offset = (start - first).days
+    history = spend[:, offset:]
+    intercepts, slopes = linear_trends(history)
+    projected = projected_totals(
+        intercepts, slopes, history.shape[1], (month_end - as_of).days
+    )
+
+    starts = bucket_starts("monthly", np.datetime64(start, "M"), months + 1)
+    columns = (starts - np.datetime64(start, "D")).astype(np.int64)
+    monthly = np.add.reduceat(history, columns, axis=1).astype(np.float64)
+    month_to_date = monthly[:, -1].copy()
+    # The current month is compared at its projected total, not part-way.
+    monthly[:, -1] += projected[:, (month_end - as_of).days]
+    averages = moving_averages(spend, window, as_of.day)
+
+    categories = [
+        {
+            "category_id": category_id,
+            "category__name": names[category_id],
+            "month_to_date": _amounts([month_to_date[row]])[0],
+            "projected_month_end": _amounts([monthly[row, -1]])[0],
+            "monthly": _amounts(monthly[row]),
+            "month_over_month": _amounts(np.diff(monthly[row])),
+            "moving_average": _amounts(averages[row]),
+            "daily_trend": _amounts([slopes[row]])[0],
+        }
+        for category_id, row in sorted(
+            index.items(), key=lambda item: monthly[item[1], -1], reverse=True
+        )
+    ]
+
+    # Budgets count and project the base-currency expenses only.
+    counted = counted[[index[b.category_id] for b in budgets]]
+    limits = to_cents(b.limit for b in budgets)
+    totals = np.concatenate(
+        [np.zeros((len(counted), 1), np.int64), np.cumsum(counted, axis=1)], axis=1
+    )
+    opened = np.array([(b.start_date - first).days for b in budgets], np.int64)
+    spent = totals[:, -1] - totals[np.arange(len(budgets)), opened]
+    budget_days = np.array([(b.end_date - as_of).days for b in budgets], np.int64)
+    running = spent[:, None] + projected_totals(
+        *linear_trends(counted[:, offset:]),
+        history.shape[1],
+        max([0, *budget_days.tolist()]),
+    )
+    # A budget's projection stops at the end of its own period.
+    within = np.arange(running.shape[1]) <= budget_days[:, None]
+    over = (running > limits[:, None]) & within
+    exceeds = over.any(axis=1)
+    first_day = over.argmax(axis=1)
+    final = running[np.arange(len(budgets)), budget_days]
+
+    return {
+        "currency": settings.BASE_CURRENCY,
+        "as_of": as_of.isoformat(),
+        "window": window,
+        "months": np.datetime_as_string(starts, unit="D").tolist(),
+        "categories": categories,
+        "budgets": [
+            {
+                "budget_id": budget.pk,
+                "category_id": budget.category_id,
+                "category__name": budget.category.name,
+                "start_date": budget.start_date.isoformat(),
+                "end_date": budget.end_date.isoformat(),
+                "limit": _amounts([limits[i]])[0],
+                "spent": _amounts([spent[i]])[0],
+                "projected_spent": _amounts([final[i]])[0],
+                "projected_to_exceed": bool(exceeds[i]),
+                "exceeds_on": (
+                    (as_of + timedelta(days=int(first_day[i]))).isoformat()
+                    if exceeds[i]
+                    else None
+                ),
+            }
+            for i, budget in enumerate(budgets)
+        ],
+    }
+
+
+_query_executor = ThreadPoolExecutor(
+    max_workers=settings.ASYNC_ANALYTICS_WORKERS, thread_name_prefix="analytics"
+)
+
+
+def _run_query(query):
+    # Worker threads keep their own connections between tasks; retire them on
+    # the same CONN_MAX_AGE / health-check rules a request boundary applies.
+    close_old_connections()
+    return query()
+
+
+async def gather_queries(*queries):
+    """
+    Run independent ORM callables concurrently. Django's async ORM funnels
+    every query through one thread, so each callable runs on a pooled worker
+    with its own database connection instead, and the results are awaited
+    together.
+    """
+    loop = asyncio.get_running_loop()
+    return await asyncio.gather(
+        *(loop.run_in_executor(_query_executor, _run_query, query) for query in queries)
+    )
+
+
+def _section(user, start_date, end_date, *fields, **expressions):
+    rollups = DailyRollup.objects.filter(
+        user=user, period__range=[start_date, end_date]
+    )
+    return _grouped(rollups, list(fields), expressions, _flow_sums())
+
+
+async def abuild_report(user, start_date, end_date, group_by="day"):
+    """
+    Async counterpart of ``build_report``. The period, category and account
+    sections are grouped by the database in three concurrent queries, so the
+    latency is that of the slowest section rather than the sum of all three,
+    and no (bucket, account, category) cross product is sent back.
+    """
+    periods, categories, accounts = await gather_queries(
+        lambda: _section(user, start_date, end_date, bucket=REPORT_GROUPINGS[group_by]),
+        lambda: _section(user, start_date, end_date, "category_id", "category__name"),
+        lambda: _section(user, start_date, end_date, "account_id", "account__name"),
+    )
+
+    summary = _empty_totals()
+    by_period = {}
+    for row in periods:
+        _add(summary, row)
+        _add(by_period.setdefault(row["bucket"], _empty_totals()), row)
+    by_category = {
+        row["category_id"]: {
+            "category__name": row["category__name"],
+            **{key: row[key] for key in (*FLOWS, "count")},
+        }
+        for row in categories
+    }
+    by_account = {
+        row["account_id"]: {
+            "account__name": row["account__name"],
+            **{key: row[key] for key in (*FLOWS, "count")},
+        }
+        for row in accounts
+    }
+    return _assemble_report(
+        start_date, end_date, group_by, summary, by_category, by_account, by_period
+    )
+
+
+async def abuild_visualization(user, period, start_date, end_date):
+    """Async counterpart of ``build_visualization``; both queries run concurrently."""
+    time_series, category_data = await gather_queries(
+        lambda: _time_series(user, period, start_date, end_date),
+        lambda: _top_categories(user, start_date, end_date),
+    )
+    return _visualization(start_date, end_date, time_series, category_data)
@@ -0,0 +1,115 @@
+"""
+Async variants of the analytics endpoints. They run natively under ASGI and
+issue independent report sections concurrently; responses match the
+synchronous ``TransactionViewSet`` and ``BudgetViewSet`` actions.
+"""
+
+import functools
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.utils.encoders import JSONEncoder
+
+from .analytics import (
+    abuild_report,
+    abuild_visualization,
+    report_parameters,
+    visualization_parameters,
+)
+from .authentication import CachedJWTAuthentication
+from .cache import analytics_cache
+from .fx import MissingRateError
+from .models import Budget
+from .serializers import BudgetProgressSerializer
+from .views import cache_headers
+
+_authenticator = CachedJWTAuthentication()
+
+
+def json_response(data, status=200, headers=None):
+    # DRF's encoder keeps Decimal and date output identical to the sync views.
+    return JsonResponse(
+        data, encoder=JSONEncoder, safe=False, status=status, headers=headers
+    )
+
+
+def async_api_view(view):
+    """Allow GET only and authenticate the bearer token like the DRF views do."""
+
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method != "GET":
+            return json_response(
+                {"detail": f'Method "{request.method}" not allowed.'}, status=405
+            )
+        try:
+            result = await sync_to_async(_authenticator.authenticate)(request)
+        except AuthenticationFailed as exc:
+            return json_response({"detail": exc.detail}, status=401)
+        if result is None:
+            return json_response(
+                {"detail": "Authentication credentials were not provided."},
+                status=401,
+            )
+        request.user = result[0]
+        return await view(request, *args, **kwargs)
+
+    return wrapper
+
+
+@async_api_view
+async def generate_report(request):
+    try:
+        start_date, end_date, group_by = report_parameters(request.GET)
+    except ValueError as e:
+        return json_response({"error": str(e)}, status=400)
+
+    try:
+        report_data, hit = await analytics_cache.aget_or_compute(
+            request.user,
+            "generate_report",
+            {"start_date": start_date, "end_date": end_date, "group_by": group_by},
+            lambda: abuild_report(request.user, start_date, end_date, group_by),
+        )
+    except MissingRateError as e:
+        return json_response({"error": str(e)}, status=400)
+    return json_response(report_data, headers=cache_headers(hit))
+
+
+@async_api_view
+async def visualization_data(request):
+    try:
+        period, start_date, end_date = visualization_parameters(request.GET)
+    except ValueError as e:
+        return json_response({"error": str(e)}, status=400)
+
+    try:
+        data, hit = await analytics_cache.aget_or_compute(
+            request.user,
+            "visualization_data",
+            {"period": period, "start_date": start_date, "end_date": end_date},
+            lambda: abuild_visualization(request.user, period, start_date, end_date),
+        )
+    except MissingRateError as e:
+        return json_response({"error": str(e)}, status=400)
+    return json_response(data, headers=cache_headers(hit))
+
+
+@async_api_view
+async def budget_progress(request, pk):
+    budget = await Budget.objects.filter(user=request.user, pk=pk).afirst()
+    if budget is None:
+        return json_response({"detail": "No Budget matches the given query."}, 404)
+    return json_response(budget.get_progress())
+
+
+@async_api_view
+async def batch_budget_progress(request):
+    budgets = [
+        budget
+        async for budget in Budget.objects.filter(user=request.user).select_related(
+            "category"
+        )
+    ]
+    return json_response(BudgetProgressSerializer(budgets, many=True).data)
@@ -0,0 +1,115 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+class UserCache:
+    """
+    In-process LRU of users by token user id. Entries expire after
+    ``settings.AUTH_USER_CACHE_TTL`` seconds and carry the user's version
+    from the shared ``settings.AUTH_USER_CACHE_ALIAS`` cache. Saving or
+    deleting a user (see ``signals``) bumps that version, so deactivation and
+    password changes reach every process sharing the cache on its next
+    request; with a per-process backend other processes only pick them up
+    when their entry expires.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._users = OrderedDict()
+
+    @staticmethod
+    def _version_key(user_id):
+        return f"auth-user-version:{user_id}"
+
+    def version(self, user_id):
+        """The user's current version; read it before loading the user."""
+        return caches[settings.AUTH_USER_CACHE_ALIAS].get(self._version_key(user_id), 0)
+
+    def get(self, user_id):
+        """A private copy of the cached user, or None."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._users.get(str(user_id))
+        if entry is None or entry[0] <= now or entry[1] != self.version(user_id):
+            return None
+        with self._lock:
+            if str(user_id) in self._users:
+                self._users.move_to_end(str(user_id))
+        # Requests may annotate or modify their user; never share the instance.
+        return copy.copy(entry[2])
+
+    def set(self, user, version):
+        if settings.AUTH_USER_CACHE_TTL <= 0:
+            return
+        # Keyed by string, as tokens may carry the id in either form.
+        user_id = str(getattr(user, api_settings.USER_ID_FIELD))
+        expires = time.monotonic() + settings.AUTH_USER_CACHE_TTL
+        with self._lock:
+            self._users[user_id] = (expires, version, copy.copy(user))
+            self._users.move_to_end(user_id)
+            while len(self._users) > settings.AUTH_USER_CACHE_SIZE:
+                self._users.popitem(last=False)
+
+    def discard(self, user):
+        user_id = str(getattr(user, api_settings.USER_ID_FIELD))
+        with self._lock:
+            self._users.pop(user_id, None)
+        cache = caches[settings.AUTH_USER_CACHE_ALIAS]
+        key = self._version_key(user_id)
+        cache.add(key, 0, timeout=None)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Evicted since the add; any other value invalidates as well.
+            cache.set(key, 1, timeout=None)
+
+    def clear(self):
+        with self._lock:
+            self._users.clear()
+
+
+user_cache = UserCache()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    ``JWTAuthentication`` that resolves the token's user through
+    ``user_cache``, so a burst of requests with the same token loads the user
+    once. The active-user and password-change checks still run on every
+    request.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user = user_cache.get(user_id)
+        if user is None:
+            # The version is read first, so a change made while the user loads
+            # leaves the new entry already outdated. Failures are not cached.
+            version = user_cache.version(user_id)
+            user = super().get_user(validated_token)
+            user_cache.set(user, version)
+            return user
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(
+                _("The user's password has been changed."), code="password_changed"
+            )
+        return user
@@ -0,0 +1,210 @@
+import math
+import statistics
+import time
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync
+from django.core.cache import caches
+from django.db import connection
+from django.db.models import Max
+from django.test import AsyncClient
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .authentication import user_cache
+from .models import Account, Budget, Category, Transaction
+
+
+class Benchmark:
+    """One timed API call; ``teardown(response)`` runs outside the timer."""
+
+    def __init__(self, name, method, path, data=None, teardown=None):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.data = data
+        self.teardown = teardown
+
+
+def default_benchmarks(user):
+    """The endpoints the dashboard hits, parameterised for ``user``'s ledger."""
+    last_day = Transaction.objects.filter(user=user).aggregate(last=Max("date"))["last"]
+    if last_day is None:
+        raise ValueError(f"{user.username} has no transactions to benchmark")
+    account = Account.objects.filter(user=user).order_by("pk").first()
+    category = Category.objects.filter(user=user, parent__isnull=True).first()
+    budget = Budget.objects.filter(user=user).order_by("-start_date", "pk").first()
+    report_range = f"start_date={last_day - timedelta(days=364)}&end_date={last_day}"
+
+    def delete_created(response):
+        if response.status_code == 201:
+            Transaction.objects.get(pk=response.data["id"]).delete()
+
+    return [
+        Benchmark("transaction_list", "get", "/api/transactions/"),
+        Benchmark("transaction_list_500", "get", "/api/transactions/?page_size=500"),
+        Benchmark(
+            "account_transactions", "get", f"/api/accounts/{account.pk}/transactions/"
+        ),
+        Benchmark(
+            "report_daily",
+            "get",
+            f"/api/transactions/generate_report/?{report_range}",
+        ),
+        Benchmark(
+            "report_monthly",
+            "get",
+            f"/api/transactions/generate_report/?{report_range}&group_by=month",
+        ),
+        Benchmark(
+            "visualization",
+            "get",
+            f"/api/transactions/visualization_data/?year={last_day.year}",
+        ),
+        Benchmark(
+            "report_daily_async",
+            "get",
+            f"/api/async/transactions/generate_report/?{report_range}",
+        ),
+        Benchmark(
+            "report_monthly_async",
+            "get",
+            f"/api/async/transactions/generate_report/?{report_range}&group_by=month",
+        ),
+        Benchmark(
+            "visualization_async",
+            "get",
+            f"/api/async/transactions/visualization_data/?year={last_day.year}",
+        ),
+        Benchmark("budget_list", "get", "/api/budgets/"),
+        Benchmark("budget_progress", "get", f"/api/budgets/{budget.pk}/progress/"),
+        Benchmark("budget_progress_all", "get", "/api/budgets/progress/"),
+        Benchmark(
+            "budget_progress_async",
+            "get",
+            f"/api/async/budgets/{budget.pk}/progress/",
+        ),
+        Benchmark("budget_progress_all_async", "get", "/api/async/budgets/progress/"),
+        Benchmark("category_tree", "get", "/api/categories/"),
+        Benchmark(
+            "category_descendants",
+            "get",
+            f"/api/categories/{category.pk}/descendants/",
+        ),
+        Benchmark(
+            "transaction_create",
+            "post",
+            "/api/transactions/",
+            data={
+                "account": account.pk,
+                "category": category.pk,
+                "amount": "12.34",
+                "date": last_day.isoformat(),
+                "type": "OUT",
+                "description": "Benchmark",
+            },
+            teardown=delete_created,
+        ),
+    ]
+
+
+def summarize(timings):
+    ordered = sorted(timings)
+    p95 = ordered[math.ceil(0.95 * len(ordered)) - 1]
+    return {
+        "min_ms": round(ordered[0], 3),
+        "median_ms": round(statistics.median(ordered), 3),
+        "mean_ms": round(statistics.fmean(ordered), 3),
+        "p95_ms": round(p95, 3),
+        "max_ms": round(ordered[-1], 3),
+    }
+
+
+def wsgi_caller(user):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+
+    def call(benchmark):
+        kwargs = {"format": "json"} if benchmark.data is not None else {}
+        return getattr(client, benchmark.method)(
+            benchmark.path, benchmark.data, **kwargs
+        )
+
+    return call
+
+
+def asgi_caller(user):
+    client = AsyncClient()
+    headers = {"Authorization": f"Bearer {AccessToken.for_user(user)}"}
+
+    def call(benchmark):
+        kwargs = {"headers": headers}
+        if benchmark.data is not None:
+            kwargs["content_type"] = "application/json"
+        return async_to_sync(getattr(client, benchmark.method))(
+            benchmark.path, benchmark.data, **kwargs
+        )
+
+    return call
+
+
+def run_benchmarks(
+    user, repeat=5, warm_cache=False, cold_auth=False, only=None, asgi=False
+):
+    """
+    Time every benchmark ``repeat`` times through the full request stack, with
+    JWT authentication as real clients use it, via Django's WSGI handler or,
+    with ``asgi``, its ASGI handler. Returns ``{name: result}`` with latency
+    statistics and the number of SQL queries per request. Queries that the
+    async endpoints run on worker connections are not included in the count.
+
+    Requests find ``user`` in the authenticated-user cache, as all but the
+    first of a client's requests do, unless ``cold_auth`` clears it first.
+    """
+    call = asgi_caller(user) if asgi else wsgi_caller(user)
+    user_cache.clear()
+    if not cold_auth:
+        user_cache.set(user, user_cache.version(user.pk))
+    results = {}
+    for benchmark in default_benchmarks(user):
+        if only and benchmark.name not in only:
+            continue
+        timings = []
+        queries = []
+        statuses = set()
+        for _ in range(repeat):
+            if not warm_cache:
+                caches["analytics"].clear()
+            if cold_auth:
+                user_cache.clear()
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = call(benchmark)
+                timings.append((time.perf_counter() - started) * 1000)
+            queries.append(len(captured))
+            statuses.add(response.status_code)
+            if benchmark.teardown:
+                benchmark.teardown(response)
+
+        results[benchmark.name] = {
+            "method": benchmark.method.upper(),
+            "path": benchmark.path,
+            "status": sorted(statuses),
+            "queries": max(queries),
+            "bytes": len(response.content),
+            **summarize(timings),
+        }
+    return results
+
+
+def compare(results, baseline):
+    """Yield ``(name, median_ratio, query_delta)`` for benchmarks in both runs."""
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        ratio = (
+            result["median_ms"] / previous["median_ms"] if previous["median_ms"] else 0
+        )
+        yield name, ratio, result["queries"] - previous["queries"]
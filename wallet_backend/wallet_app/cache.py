@@ -0,0 +1,84 @@
+import hashlib
+import json
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .models import DataVersion
+
+
+class AnalyticsCache:
+    """
+    Caches analytics results per user, endpoint and parameters. Keys embed the
+    user's ``DataVersion``, so any ledger write makes older entries unreachable
+    and the backend's eviction reclaims them.
+    """
+
+    def __init__(self, alias="analytics"):
+        self.alias = alias
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def backend(self):
+        return caches[self.alias]
+
+    def make_key(self, user_id, version, endpoint, params):
+        digest = hashlib.sha1(
+            json.dumps(params, sort_keys=True, default=str).encode()
+        ).hexdigest()
+        return f"analytics:{user_id}:{version}:{endpoint}:{digest}"
+
+    def get_or_compute(self, user, endpoint, params, compute):
+        """Return ``(value, hit)`` for the cached result, computing it on a miss."""
+        version, _ = DataVersion.current(user.pk)
+        key = self.make_key(user.pk, version, endpoint, params)
+        value = self.backend.get(key)
+        if value is not None:
+            self._count(hit=True)
+            return value, True
+
+        value = compute()
+        self.backend.set(key, value, settings.ANALYTICS_CACHE_TIMEOUT)
+        self._count(hit=False)
+        return value, False
+
+    async def aget_or_compute(self, user, endpoint, params, compute):
+        """Async ``get_or_compute``; ``compute`` is a coroutine function."""
+        version, _ = await DataVersion.acurrent(user.pk)
+        key = self.make_key(user.pk, version, endpoint, params)
+        value = await self.backend.aget(key)
+        if value is not None:
+            self._count(hit=True)
+            return value, True
+
+        value = await compute()
+        await self.backend.aset(key, value, settings.ANALYTICS_CACHE_TIMEOUT)
+        self._count(hit=False)
+        return value, False
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": settings.CACHES[self.alias]["BACKEND"],
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0,
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = self.misses = 0
+
+
+analytics_cache = AnalyticsCache()
@@ -0,0 +1,68 @@
+import csv
+import json
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+EXPORT_COLUMNS = (
+    "id",
+    "date",
+    "type",
+    "amount",
+    "account",
+    "account_name",
+    "to_account",
+    "category",
+    "category_name",
+    "description",
+)
+
+# Queryset columns backing EXPORT_COLUMNS, in the same order.
+EXPORT_FIELDS = (
+    "id",
+    "date",
+    "type",
+    "amount",
+    "account_id",
+    "account__name",
+    "to_account_id",
+    "category_id",
+    "category__name",
+    "description",
+)
+
+
+class _Echo:
+    """File-like object whose ``write`` hands the row back to the caller."""
+
+    def write(self, value):
+        return value
+
+
+def export_rows(queryset, chunk_size=2000):
+    """Yield export rows as tuples, fetching ``chunk_size`` rows at a time."""
+    return (
+        queryset.order_by("date", "id")
+        .values_list(*EXPORT_FIELDS)
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def stream_csv(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_COLUMNS)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def stream_ndjson(rows):
+    for row in rows:
+        record = dict(zip(EXPORT_COLUMNS, row))
+        record["date"] = record["date"].isoformat()
+        record["amount"] = str(record["amount"])
+        yield json.dumps(record) + "\n"
+
+
+STREAMERS = {"csv": stream_csv, "ndjson": stream_ndjson}
@@ -0,0 +1,101 @@
+import calendar
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+
+from .models import FxRate
+
+
+class MissingRateError(ValueError):
+    """No rate is known for a currency on or before a day."""
+
+
+class RateCache:
+    """
+    In-process LRU of daily exchange rates into ``settings.BASE_CURRENCY``.
+    Each entry holds one currency's rates for every day of a month, filled
+    forward from the latest earlier rate so weekends and holidays resolve
+    without another query, and expires after ``settings.FX_RATE_CACHE_TTL``.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._months = OrderedDict()
+
+    def rate(self, currency, day):
+        return self.rates([(currency, day)])[(currency, day)]
+
+    def rates(self, pairs):
+        """
+        Map each ``(currency, day)`` of ``pairs`` to its rate, loading the
+        months that are not cached with two small queries each.
+        """
+        result = {}
+        days = defaultdict(list)
+        for currency, day in pairs:
+            if currency == settings.BASE_CURRENCY:
+                result[(currency, day)] = Decimal("1")
+            else:
+                days[(currency, day.replace(day=1))].append(day)
+
+        for (currency, month), wanted in days.items():
+            rates = self._month(currency, month)
+            for day in wanted:
+                rate = rates.get(day)
+                if rate is None:
+                    raise MissingRateError(
+                        f"No {currency} exchange rate on or before {day.isoformat()}"
+                    )
+                result[(currency, day)] = rate
+        return result
+
+    def _month(self, currency, month):
+        key = (currency, month)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._months.get(key)
+            if entry is not None and entry[0] > now:
+                self._months.move_to_end(key)
+                return entry[1]
+
+        rates = self._load(currency, month)
+        with self._lock:
+            self._months[key] = (now + settings.FX_RATE_CACHE_TTL, rates)
+            self._months.move_to_end(key)
+            while len(self._months) > settings.FX_RATE_CACHE_SIZE:
+                self._months.popitem(last=False)
+        return rates
+
+    @staticmethod
+    def _load(currency, month):
+        last = month.replace(day=calendar.monthrange(month.year, month.month)[1])
+        rates = FxRate.objects.filter(currency=currency)
+        known = dict(
+            rates.filter(date__range=(month, last)).values_list("date", "rate")
+        )
+        # The latest rate before the month carries into its first days.
+        rate = (
+            rates.filter(date__lt=month)
+            .order_by("-date")
+            .values_list("rate", flat=True)
+            .first()
+        )
+        filled = {}
+        day = month
+        while day <= last:
+            rate = known.get(day, rate)
+            if rate is not None:
+                filled[day] = rate
+            day += timedelta(days=1)
+        return filled
+
+    def clear(self):
+        with self._lock:
+            self._months.clear()
+
+
+fx_rates = RateCache()
@@ -0,0 +1,180 @@
+import codecs
+import csv
+import json
+import re
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db import transaction
+
+from .ledger import LedgerDelta
+from .models import Account, Category, Transaction
+from .serializers import TransactionImportRowSerializer
+
+IMPORT_FORMATS = ("csv", "jsonl", "ofx")
+
+OFX_FIELD = re.compile(r"<(\w+)>([^<\r\n]*)")
+
+
+def _decoded_lines(upload):
+    """Yield the lines of an uploaded file as text without reading it whole."""
+    for number, line in enumerate(upload, start=1):
+        if isinstance(line, bytes):
+            line = line.decode("utf-8-sig" if number == 1 else "utf-8")
+        yield line
+
+
+def check_encoding(upload):
+    """
+    Raise ``ValueError`` naming the first line of ``upload`` that is not
+    UTF-8, before any row is imported. The file is read in chunks and
+    rewound for the parser.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    line = 1
+    for chunk in upload.chunks():
+        try:
+            decoder.decode(chunk)
+        except UnicodeDecodeError as exc:
+            line += chunk.count(b"\n", 0, max(exc.start, 0))
+            raise ValueError(f"Line {line} is not valid UTF-8")
+        line += chunk.count(b"\n")
+    try:
+        decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        raise ValueError(f"Line {line} is not valid UTF-8")
+    upload.seek(0)
+
+
+def parse_csv(upload):
+    """Yield ``(row_number, row)`` for each record of a CSV file with a header."""
+    reader = csv.DictReader(_decoded_lines(upload))
+    for number, row in enumerate(reader, start=1):
+        yield number, {key.strip().lower(): value for key, value in row.items() if key}
+
+
+def parse_jsonl(upload):
+    """Yield ``(row_number, row)`` for each non-blank line of a JSON Lines file."""
+    for number, line in enumerate(_decoded_lines(upload), start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            yield number, ValueError("Invalid JSON")
+            continue
+        if not isinstance(row, dict):
+            yield number, ValueError("Each line must be a JSON object")
+            continue
+        yield number, row
+
+
+def parse_ofx(upload):
+    """
+    Yield ``(row_number, row)`` for each ``<STMTTRN>`` block of an OFX statement.
+    Signed ``TRNAMT`` values are mapped to income and expense rows.
+    """
+    buffer = ""
+    number = 0
+    for line in _decoded_lines(upload):
+        buffer += line
+        while "</STMTTRN>" in buffer.upper():
+            end = buffer.upper().index("</STMTTRN>")
+            block, buffer = buffer[:end], buffer[end + len("</STMTTRN>") :]
+            number += 1
+            fields = {
+                tag.upper(): value.strip() for tag, value in OFX_FIELD.findall(block)
+            }
+            yield number, _ofx_row(fields)
+
+
+def _ofx_row(fields):
+    row = {"description": fields.get("NAME") or fields.get("MEMO", "")}
+    posted = fields.get("DTPOSTED", "")[:8]
+    try:
+        row["date"] = datetime.strptime(posted, "%Y%m%d").date().isoformat()
+    except ValueError:
+        row["date"] = posted
+    try:
+        amount = Decimal(fields.get("TRNAMT", ""))
+        row["amount"] = str(abs(amount))
+        row["type"] = "OUT" if amount < 0 else "IN"
+    except InvalidOperation:
+        row["amount"] = fields.get("TRNAMT", "")
+    return row
+
+
+PARSERS = {"csv": parse_csv, "jsonl": parse_jsonl, "ofx": parse_ofx}
+
+
+class TransactionImporter:
+    """
+    Validate and insert transaction rows in chunks. Each chunk is written with
+    one ``bulk_create`` and one aggregated ledger update; every budget
+    covering an imported expense is checked once after the last chunk.
+    """
+
+    def __init__(self, user, default_account_id=None, chunk_size=500):
+        self.user = user
+        self.chunk_size = chunk_size
+        accounts = {a.pk: a for a in Account.objects.filter(user=user)}
+        self.context = {
+            "accounts": accounts,
+            "categories": {c.pk: c for c in Category.objects.filter(user=user)},
+            "default_account": accounts.get(default_account_id),
+        }
+        self.created = 0
+        self.errors = []
+        # Expense dates per category, for the final budget check.
+        self.spending = defaultdict(set)
+
+    def run(self, rows):
+        chunk = []
+        for number, row in rows:
+            txn = self._validate(number, row)
+            if txn is not None:
+                chunk.append(txn)
+            if len(chunk) >= self.chunk_size:
+                self._write(chunk)
+                chunk = []
+        if chunk:
+            self._write(chunk)
+
+        Transaction.check_budgets(self.user, self.spending)
+
+        return {
+            "created": self.created,
+            "failed": len(self.errors),
+            "errors": self.errors,
+        }
+
+    def _validate(self, number, row):
+        if isinstance(row, Exception):
+            self.errors.append(
+                {"row": number, "errors": {"non_field_errors": [str(row)]}}
+            )
+            return None
+        serializer = TransactionImportRowSerializer(data=row, context=self.context)
+        if not serializer.is_valid():
+            self.errors.append({"row": number, "errors": serializer.errors})
+            return None
+        return Transaction(user=self.user, **serializer.validated_data)
+
+    def _write(self, chunk):
+        with transaction.atomic():
+            created = Transaction.objects.bulk_create(chunk)
+            delta = LedgerDelta()
+            for txn in created:
+                delta.post(txn)
+            delta.apply()
+        self.created += len(created)
+
+        for txn in created:
+            if (
+                txn.category
+                and txn.type == "OUT"
+                and txn.account.currency == settings.BASE_CURRENCY
+            ):
+                self.spending[txn.category_id].add(txn.date)
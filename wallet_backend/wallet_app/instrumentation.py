@@ -0,0 +1,158 @@
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework.serializers import BaseSerializer
+
+logger = logging.getLogger(__name__)
+
+_profile = ContextVar("request_profile", default=None)
+
+_IN_LIST = re.compile(r"\(\s*%s(?:\s*,\s*%s)*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(sql):
+    """Collapse ``IN (%s, %s, ...)`` lists and whitespace so repeats group together."""
+    return _WHITESPACE.sub(" ", _IN_LIST.sub("(%s...)", sql)).strip()
+
+
+class RequestProfile:
+    """SQL statements and phase timings collected while serving one request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = []
+        self.db_ms = 0.0
+        self.serialize_ms = 0.0
+        self.render_ms = 0.0
+        self.total_ms = 0.0
+        self._serializing = 0
+        self._render_started = None
+
+    def record_query(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            self.db_ms += elapsed
+            self.queries.append((sql, params, elapsed))
+
+    def repeated(self, limit=5):
+        """The most frequent statement shapes executed more than once."""
+        counts = Counter(fingerprint(sql) for sql, _, _ in self.queries)
+        return [(sql, count) for sql, count in counts.most_common(limit) if count > 1]
+
+    def slowest(self, limit=5):
+        return sorted(self.queries, key=lambda query: query[2], reverse=True)[:limit]
+
+    def server_timing(self):
+        return ", ".join(
+            [
+                f'db;dur={self.db_ms:.1f};desc="{len(self.queries)} queries"',
+                f"serialize;dur={self.serialize_ms:.1f}",
+                f"render;dur={self.render_ms:.1f}",
+                f"total;dur={self.total_ms:.1f}",
+            ]
+        )
+
+
+def _timed_data(data):
+    def wrapper(serializer):
+        profile = _profile.get()
+        if profile is None or profile._serializing:
+            return data.fget(serializer)
+        profile._serializing += 1
+        started = time.perf_counter()
+        try:
+            return data.fget(serializer)
+        finally:
+            profile._serializing -= 1
+            profile.serialize_ms += (time.perf_counter() - started) * 1000
+
+    wrapper._instrumented = True
+    return property(wrapper)
+
+
+class SQLInstrumentationMiddleware:
+    """
+    Opt-in per-request profiling, enabled with ``SQL_INSTRUMENTATION``. Counts
+    SQL statements and times the database, serializer and render phases,
+    reports them in a ``Server-Timing`` header and logs requests that exceed
+    ``SQL_INSTRUMENTATION_MAX_QUERIES`` or ``SQL_INSTRUMENTATION_SLOW_MS``
+    together with their slowest statements and repeated query shapes, which
+    is how N+1 patterns show up.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "SQL_INSTRUMENTATION", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.max_queries = settings.SQL_INSTRUMENTATION_MAX_QUERIES
+        self.slow_ms = settings.SQL_INSTRUMENTATION_SLOW_MS
+        # Serializer output is produced when ``.data`` is first read; timing
+        # the outermost read covers nested and list serializers as well.
+        if not getattr(BaseSerializer.data.fget, "_instrumented", False):
+            BaseSerializer.data = _timed_data(BaseSerializer.data)
+
+    def __call__(self, request):
+        profile = RequestProfile()
+        token = _profile.set(profile)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(profile.record_query)
+                    )
+                response = self.get_response(request)
+        finally:
+            _profile.reset(token)
+
+        profile.total_ms = (time.perf_counter() - profile.started) * 1000
+        response["Server-Timing"] = profile.server_timing()
+        self.log(request, response, profile)
+        return response
+
+    def process_template_response(self, request, response):
+        # Called right before DRF renders the response.
+        profile = _profile.get()
+        if profile is not None:
+            profile._render_started = time.perf_counter()
+            response.add_post_render_callback(
+                lambda rendered: self.rendered(profile, rendered)
+            )
+        return response
+
+    @staticmethod
+    def rendered(profile, response):
+        profile.render_ms += (time.perf_counter() - profile._render_started) * 1000
+
+    def log(self, request, response, profile):
+        too_many = len(profile.queries) > self.max_queries
+        too_slow = profile.total_ms > self.slow_ms
+        if not (too_many or too_slow):
+            return
+
+        lines = [
+            f"{request.method} {request.get_full_path()} -> {response.status_code}: "
+            f"{len(profile.queries)} queries, db {profile.db_ms:.1f}ms, "
+            f"serialize {profile.serialize_ms:.1f}ms, "
+            f"render {profile.render_ms:.1f}ms, total {profile.total_ms:.1f}ms"
+        ]
+        repeated = profile.repeated()
+        if repeated:
+            lines.append("Repeated queries:")
+            lines.extend(f"  {count}x {sql}" for sql, count in repeated)
+        lines.append("Slowest queries:")
+        lines.extend(
+            f"  {elapsed:.1f}ms {sql} {params!r}"
+            for sql, params, elapsed in profile.slowest()
+        )
+        logger.warning("\n".join(lines))
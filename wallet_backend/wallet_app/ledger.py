@@ -0,0 +1,306 @@
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Count, F, Sum, When
+from django.db.models import Value
+from django.db.models.functions import Coalesce, TruncMonth
+from django.utils import timezone
+
+from .models import (
+    CENT,
+    Account,
+    BalanceCheckpoint,
+    Budget,
+    DailyRollup,
+    DataVersion,
+    MonthlyRollup,
+    Transaction,
+)
+
+
+class LedgerDelta:
+    """
+    Collects the side effects of posting and reversing transactions so they can
+    be written in one pass, whether for a single save or a whole import batch.
+    """
+
+    def __init__(self):
+        self.balances = defaultdict(Decimal)
+        self.checkpoints = defaultdict(Decimal)
+        self.rollups = defaultdict(lambda: [Decimal("0"), 0])
+        self.spending = defaultdict(Decimal)
+
+    def post(self, txn):
+        """Record the effect of ``txn`` being added to the ledger."""
+        self._add(txn, 1)
+
+    def reverse(self, txn):
+        """Record the effect of ``txn`` being removed from the ledger."""
+        self._add(txn, -1)
+
+    def _add(self, txn, sign):
+        amount = sign * Decimal(txn.amount)
+        effects = defaultdict(Decimal)
+        if txn.type == "IN":
+            effects[txn.account_id] += amount
+        elif txn.type == "OUT":
+            effects[txn.account_id] -= amount
+        elif txn.type == "TRANSFER":
+            effects[txn.account_id] -= amount
+            if txn.to_account_id:
+                effects[txn.to_account_id] += amount
+        month = BalanceCheckpoint.truncate(txn.date)
+        for account_id, effect in effects.items():
+            self.balances[account_id] += effect
+            self.checkpoints[(account_id, month)] += effect
+
+        if txn.type == "OUT" and txn.category_id:
+            key = (txn.user_id, txn.category_id, txn.account_id, txn.date)
+            self.spending[key] += amount
+
+        key = (txn.user_id, txn.account_id, txn.category_id, txn.type, txn.date)
+        bucket = self.rollups[key]
+        bucket[0] += amount
+        bucket[1] += sign
+
+    def apply(self):
+        """Write the accumulated changes. Call inside ``transaction.atomic``."""
+        self._apply_balances()
+        BalanceCheckpoint.apply_deltas(self.checkpoints)
+        self._apply_spending()
+        deltas = {key: tuple(value) for key, value in self.rollups.items()}
+        DailyRollup.apply_deltas(deltas)
+        MonthlyRollup.apply_deltas(deltas)
+        DataVersion.bump(*(user_id for user_id, *_ in deltas))
+        self.balances.clear()
+        self.checkpoints.clear()
+        self.rollups.clear()
+        self.spending.clear()
+
+    def _apply_balances(self):
+        # Lock the rows in primary key order so two transfers between the same
+        # accounts in opposite directions cannot deadlock each other. Accounts
+        # whose checkpoints change (e.g. a re-dated transaction) are locked too.
+        account_ids = sorted(pk for pk, delta in self.balances.items() if delta)
+        locked = set(account_ids)
+        locked.update(pk for (pk, _), delta in self.checkpoints.items() if delta)
+        if not locked:
+            return
+        list(
+            Account.objects.select_for_update()
+            .filter(pk__in=locked)
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+        now = timezone.now()
+        for pk in account_ids:
+            Account.objects.filter(pk=pk).update(
+                balance=F("balance") + self.balances[pk], updated_at=now
+            )
+
+    def _apply_spending(self):
+        spending = {key: amount for key, amount in self.spending.items() if amount}
+        if not spending:
+            return
+        # Budgets are in the base currency; other accounts don't count.
+        counted = set(
+            Account.objects.filter(
+                pk__in={account_id for _, _, account_id, _ in spending},
+                currency=settings.BASE_CURRENCY,
+            ).values_list("pk", flat=True)
+        )
+        # Running totals per (user, category) in date order, so each budget
+        # reads its own range with two bisections.
+        days = defaultdict(Decimal)
+        for (user_id, category_id, account_id, day), amount in spending.items():
+            if account_id in counted:
+                days[(user_id, category_id, day)] += amount
+        if not days:
+            return
+        series = defaultdict(lambda: ([], [Decimal("0")]))
+        for user_id, category_id, day in sorted(days):
+            dates, totals = series[(user_id, category_id)]
+            dates.append(day)
+            totals.append(totals[-1] + days[(user_id, category_id, day)])
+
+        budgets = Budget.objects.filter(
+            user_id__in={user_id for user_id, _ in series},
+            category_id__in={category_id for _, category_id in series},
+            start_date__lte=max(day for _, _, day in days),
+            end_date__gte=min(day for _, _, day in days),
+        ).values_list("pk", "user_id", "category_id", "start_date", "end_date")
+
+        changes = {}
+        for pk, user_id, category_id, start_date, end_date in budgets:
+            if (user_id, category_id) not in series:
+                continue
+            dates, totals = series[(user_id, category_id)]
+            changes[pk] = (
+                totals[bisect_right(dates, end_date)]
+                - totals[bisect_left(dates, start_date)]
+            )
+
+        for pk, amount in changes.items():
+            if amount:
+                Budget.objects.filter(pk=pk).update(spent=F("spent") + amount)
+
+
+def rebuild_budget_spent(users=None):
+    """Recompute every budget's ``spent`` counter with a single UPDATE."""
+    budgets = Budget.objects.all()
+    if users is not None:
+        budgets = budgets.filter(user__in=users)
+    updated = budgets.update(
+        spent=Coalesce(Budget.spent_subquery(), Value(Decimal("0")))
+    )
+    DataVersion.bump(*budgets.values_list("user_id", flat=True).distinct())
+    return updated
+
+
+def net_changes(accounts, by_month=False):
+    """
+    Net effect of the transaction history on each of ``accounts`` (a
+    queryset): ``{account_id: net}``, or ``{(account_id, month): net}`` with
+    ``by_month``. Outgoing rows and incoming transfers are summed by the
+    database in two grouped queries and streamed back.
+    """
+    group = {"month": TruncMonth("date")} if by_month else {}
+    totals = defaultdict(Decimal)
+    outgoing = (
+        Transaction.objects.filter(account__in=accounts)
+        .values("account_id", **group)
+        .annotate(
+            net=Sum(Case(When(type="IN", then=F("amount")), default=-F("amount")))
+        )
+        .order_by()
+    )
+    incoming = (
+        Transaction.objects.filter(type="TRANSFER", to_account__in=accounts)
+        .values("to_account_id", **group)
+        .annotate(net=Sum("amount"))
+        .order_by()
+    )
+    for rows, field in ((outgoing, "account_id"), (incoming, "to_account_id")):
+        for row in rows.iterator():
+            key = (row[field], row["month"]) if by_month else row[field]
+            # SQLite sums decimals as floats; amounts are whole cents.
+            totals[key] += row["net"].quantize(CENT)
+    return totals
+
+
+def rebuild_checkpoints(users=None, batch_size=1000):
+    """
+    Recompute every account's balance checkpoints from its transactions by
+    accumulating the monthly net changes into running totals.
+    """
+    accounts = Account.objects.all()
+    if users is not None:
+        accounts = accounts.filter(user__in=users)
+
+    monthly = net_changes(accounts, by_month=True)
+    checkpoints = []
+    running = defaultdict(Decimal)
+    for account_id, month in sorted(monthly):
+        running[account_id] += monthly[(account_id, month)]
+        checkpoints.append(
+            BalanceCheckpoint(
+                account_id=account_id, period=month, net_change=running[account_id]
+            )
+        )
+    with transaction.atomic():
+        BalanceCheckpoint.objects.filter(account__in=accounts).delete()
+        BalanceCheckpoint.objects.bulk_create(checkpoints, batch_size=batch_size)
+    return len(checkpoints)
+
+
+def reconcile_balances(user_ids, fix=False):
+    """
+    Compare the stored balance of every account of ``user_ids`` with its
+    opening balance plus the net effect of its history. Returns a list of
+    discrepancies; with ``fix`` they are corrected in one transaction, with
+    the drifted accounts locked and recomputed so concurrent postings are
+    not overwritten.
+    """
+    accounts = Account.objects.filter(user_id__in=user_ids)
+    expected = net_changes(accounts)
+    discrepancies = [
+        {
+            "account": pk,
+            "user": user_id,
+            "name": name,
+            "stored": balance,
+            "expected": opening_balance + expected[pk],
+            "drift": balance - opening_balance - expected[pk],
+        }
+        for pk, user_id, name, balance, opening_balance in accounts.order_by(
+            "pk"
+        ).values_list("pk", "user_id", "name", "balance", "opening_balance")
+        if balance != opening_balance + expected[pk]
+    ]
+    if not fix or not discrepancies:
+        return discrepancies
+
+    with transaction.atomic():
+        drifted = dict(
+            Account.objects.select_for_update()
+            .filter(pk__in=[row["account"] for row in discrepancies])
+            .order_by("pk")
+            .values_list("pk", "opening_balance")
+        )
+        expected = net_changes(Account.objects.filter(pk__in=drifted))
+        now = timezone.now()
+        for pk, opening_balance in drifted.items():
+            Account.objects.filter(pk=pk).update(
+                balance=opening_balance + expected[pk], updated_at=now
+            )
+        DataVersion.bump(*(row["user"] for row in discrepancies))
+    return discrepancies
+
+
+def rebuild_rollups(users=None, batch_size=1000):
+    """
+    Recompute the daily and monthly rollups from the raw transactions. Limited
+    to ``users`` when given, otherwise every user is rebuilt.
+    """
+    transactions = Transaction.objects.all()
+    if users is not None:
+        transactions = transactions.filter(user__in=users)
+
+    created = 0
+    for model, bucket in (
+        (DailyRollup, F("date")),
+        (MonthlyRollup, TruncMonth("date")),
+    ):
+        buckets = (
+            transactions.annotate(bucket=bucket)
+            .values("user_id", "account_id", "category_id", "type", "bucket")
+            .annotate(total=Sum("amount"), count=Count("id"))
+            .order_by()
+        )
+        with transaction.atomic():
+            stale = model.objects.all()
+            if users is not None:
+                stale = stale.filter(user__in=users)
+            stale.delete()
+            created += len(
+                model.objects.bulk_create(
+                    (
+                        model(
+                            user_id=row["user_id"],
+                            account_id=row["account_id"],
+                            category_id=row["category_id"],
+                            type=row["type"],
+                            period=row["bucket"],
+                            total=row["total"],
+                            count=row["count"],
+                        )
+                        for row in buckets.iterator()
+                    ),
+                    batch_size=batch_size,
+                )
+            )
+    DataVersion.bump(*transactions.values_list("user_id", flat=True).distinct())
+    return created
@@ -0,0 +1,58 @@
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from wallet_app.synthetic import LedgerGenerator
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate synthetic users with accounts, nested categories, budgets and "
+        "seasonal transaction histories for benchmarking."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10)
+        parser.add_argument("--accounts", type=int, default=3, help="Per user.")
+        parser.add_argument(
+            "--transactions",
+            type=int,
+            default=10000,
+            help="Approximate number of transactions per user.",
+        )
+        parser.add_argument(
+            "--days", type=int, default=730, help="Length of each history in days."
+        )
+        parser.add_argument(
+            "--end-date",
+            type=date.fromisoformat,
+            help="Last day of the histories (defaults to today).",
+        )
+        parser.add_argument(
+            "--prefix",
+            default="bench",
+            help="Usernames are <prefix>0, <prefix>1, ...; the password is the prefix.",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        prefix = options["prefix"]
+        if User.objects.filter(username__startswith=prefix).exists():
+            raise CommandError(
+                f"Users prefixed {prefix!r} already exist; pick another --prefix."
+            )
+
+        created = LedgerGenerator(
+            users=options["users"],
+            accounts=options["accounts"],
+            transactions=options["transactions"],
+            days=options["days"],
+            end_date=options["end_date"],
+            prefix=prefix,
+            seed=options["seed"],
+            batch_size=options["batch_size"],
+        ).run()
+        summary = ", ".join(f"{count} {name}" for name, count in created.items())
+        self.stdout.write(self.style.SUCCESS(f"Created {summary}."))
@@ -0,0 +1,78 @@
+import csv
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils.dateparse import parse_date
+
+from wallet_app.fx import fx_rates
+from wallet_app.models import Account, DataVersion, FxRate, currency_code
+
+
+class Command(BaseCommand):
+    help = (
+        "Load daily exchange rates from a CSV file with date, currency and rate "
+        "columns, where rate is the value of one unit of the currency in "
+        "BASE_CURRENCY. Existing rates for the same currency and day are "
+        "replaced."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV file to load.")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        try:
+            with open(options["path"], newline="") as handle:
+                rates = [self.parse(line, row) for line, row in self.rows(handle)]
+        except OSError as exc:
+            raise CommandError(f"Cannot read {options['path']}: {exc}")
+
+        with transaction.atomic():
+            FxRate.objects.bulk_create(
+                rates,
+                batch_size=options["batch_size"],
+                update_conflicts=True,
+                unique_fields=["currency", "date"],
+                update_fields=["rate"],
+            )
+            # Cached reports of accounts in these currencies are now stale.
+            currencies = {rate.currency for rate in rates}
+            DataVersion.bump(
+                *Account.objects.filter(currency__in=currencies)
+                .values_list("user_id", flat=True)
+                .distinct()
+            )
+        fx_rates.clear()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Loaded {len(rates)} rates for {len(currencies)} currencies "
+                f"into {settings.BASE_CURRENCY}."
+            )
+        )
+
+    @staticmethod
+    def rows(handle):
+        reader = csv.DictReader(handle)
+        missing = {"date", "currency", "rate"} - set(reader.fieldnames or ())
+        if missing:
+            raise CommandError(f"Missing columns: {', '.join(sorted(missing))}")
+        for row in reader:
+            yield reader.line_num, row
+
+    @staticmethod
+    def parse(line, row):
+        currency = (row["currency"] or "").strip().upper()
+        try:
+            currency_code(currency)
+            day = parse_date((row["date"] or "").strip())
+            rate = Decimal((row["rate"] or "").strip())
+            valid = day is not None and rate.is_finite() and rate > 0
+        except (ValidationError, ValueError, InvalidOperation):
+            valid = False
+        if not valid:
+            raise CommandError(f"Line {line}: invalid rate {dict(row)!r}")
+        return FxRate(currency=currency, date=day, rate=rate)
@@ -0,0 +1,38 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from wallet_app.recurring import RecurringMaterializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Post every due occurrence of the recurring transaction rules, "
+        "catching up on any missed since the last run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--date",
+            help="Materialize occurrences due on or before this day "
+            "(YYYY-MM-DD, default today).",
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        today = None
+        if options["date"]:
+            try:
+                today = date.fromisoformat(options["date"])
+            except ValueError:
+                raise CommandError("--date must be in YYYY-MM-DD format.")
+
+        result = RecurringMaterializer(
+            today=today, batch_size=options["batch_size"]
+        ).run()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Materialized {result['created']} transactions from "
+                f"{result['rules']} rules."
+            )
+        )
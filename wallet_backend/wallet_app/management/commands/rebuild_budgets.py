@@ -0,0 +1,24 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from wallet_app.ledger import rebuild_budget_spent
+
+
+class Command(BaseCommand):
+    help = "Recompute the spent counter of every budget from the raw ledger."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            action="append",
+            dest="usernames",
+            help="Only rebuild budgets for this username (repeatable).",
+        )
+
+    def handle(self, *args, **options):
+        users = None
+        if options["usernames"]:
+            users = User.objects.filter(username__in=options["usernames"])
+
+        updated = rebuild_budget_spent(users=users)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {updated} budgets."))
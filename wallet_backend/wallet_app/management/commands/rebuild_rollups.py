@@ -0,0 +1,33 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from wallet_app.ledger import rebuild_checkpoints, rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the daily and monthly transaction rollups and the account "
+        "balance checkpoints from the raw ledger."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            action="append",
+            dest="usernames",
+            help="Only rebuild rollups for this username (repeatable).",
+        )
+
+    def handle(self, *args, **options):
+        users = None
+        if options["usernames"]:
+            users = User.objects.filter(username__in=options["usernames"])
+
+        created = rebuild_rollups(users=users)
+        checkpoints = rebuild_checkpoints(users=users)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt {created} rollup buckets and {checkpoints} balance "
+                "checkpoints."
+            )
+        )
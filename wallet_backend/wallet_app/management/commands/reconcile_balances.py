@@ -0,0 +1,99 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+
+from wallet_app.ledger import reconcile_balances
+
+
+def _init_worker():
+    # Forked workers must not share the parent's database connections.
+    django.setup()
+    connections.close_all()
+
+
+def _reconcile_batch(user_ids, fix):
+    return len(user_ids), reconcile_balances(user_ids, fix=fix)
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute every account balance from its opening balance and "
+        "transaction history, report drift and optionally fix it. Users are "
+        "reconciled in batches spread across a pool of worker processes. "
+        "Accounts that predate opening balances start from 0, so whatever "
+        "their history does not explain is reported for review."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            action="append",
+            dest="usernames",
+            help="Only reconcile this username (repeatable).",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Worker processes; 0 reconciles in this process.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=200,
+            help="Users per batch (each batch is one unit of work).",
+        )
+        parser.add_argument(
+            "--fix",
+            action="store_true",
+            help="Correct drifted balances, one transaction per batch.",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1")
+        users = User.objects.order_by("pk")
+        if options["usernames"]:
+            users = users.filter(username__in=options["usernames"])
+        user_ids = list(users.values_list("pk", flat=True))
+        size = options["batch_size"]
+        batches = [user_ids[i : i + size] for i in range(0, len(user_ids), size)]
+
+        workers = options["workers"]
+        if connection.vendor == "sqlite" and connection.is_in_memory_db():
+            # Other processes cannot see an in-memory database.
+            workers = 0
+        if workers and len(batches) > 1:
+            connections.close_all()
+            with ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_worker
+            ) as pool:
+                results = list(
+                    pool.map(_reconcile_batch, batches, [options["fix"]] * len(batches))
+                )
+        else:
+            results = [_reconcile_batch(batch, options["fix"]) for batch in batches]
+
+        discrepancies = [row for _, batch in results for row in batch]
+        for row in discrepancies:
+            self.stdout.write(
+                f"account {row['account']} ({row['name']}, user {row['user']}): "
+                f"stored {row['stored']}, expected {row['expected']}, "
+                f"drift {row['drift']:+}"
+            )
+        action = "fixed" if options["fix"] else "found"
+        style = (
+            self.style.WARNING
+            if discrepancies and not options["fix"]
+            else (self.style.SUCCESS)
+        )
+        self.stdout.write(
+            style(
+                f"Reconciled {sum(count for count, _ in results)} users in "
+                f"{len(batches)} batches: {len(discrepancies)} discrepancies {action}."
+            )
+        )
@@ -0,0 +1,108 @@
+import json
+import subprocess
+import sys
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from wallet_app.benchmarks import compare, run_benchmarks
+from wallet_app.models import Transaction
+
+
+def current_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the main API endpoints against an existing ledger (see "
+        "generate_ledger) and write latency and query counts as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", default="bench0", help="Username to run as.")
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument(
+            "--warm-cache",
+            action="store_true",
+            help="Keep the analytics cache between runs instead of clearing it.",
+        )
+        parser.add_argument(
+            "--cold-auth",
+            action="store_true",
+            help="Clear the authenticated-user cache before every request.",
+        )
+        parser.add_argument(
+            "--asgi",
+            action="store_true",
+            help="Serve requests through the ASGI handler instead of WSGI.",
+        )
+        parser.add_argument(
+            "--only",
+            action="append",
+            help="Only run this benchmark (repeatable).",
+        )
+        parser.add_argument("--output", help="Write the JSON results to this file.")
+        parser.add_argument(
+            "--compare", help="Print changes against an earlier results file."
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options["user"])
+        except User.DoesNotExist:
+            raise CommandError(f"Unknown user {options['user']!r}")
+        if options["repeat"] < 1:
+            raise CommandError("--repeat must be at least 1")
+
+        try:
+            results = run_benchmarks(
+                user,
+                repeat=options["repeat"],
+                warm_cache=options["warm_cache"],
+                cold_auth=options["cold_auth"],
+                only=options["only"],
+                asgi=options["asgi"],
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        report = {
+            "meta": {
+                "commit": current_commit(),
+                "timestamp": timezone.now().isoformat(),
+                "database": connection.vendor,
+                "python": sys.version.split()[0],
+                "user": user.username,
+                "transactions": Transaction.objects.filter(user=user).count(),
+                "repeat": options["repeat"],
+                "warm_cache": options["warm_cache"],
+                "cold_auth": options["cold_auth"],
+                "handler": "asgi" if options["asgi"] else "wsgi",
+            },
+            "results": results,
+        }
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as handle:
+                handle.write(output + "\n")
+        else:
+            self.stdout.write(output)
+
+        if options["compare"]:
+            with open(options["compare"]) as handle:
+                baseline = json.load(handle)["results"]
+            for name, ratio, query_delta in compare(results, baseline):
+                self.stderr.write(
+                    f"{name:<24} median x{ratio:.2f}  queries {query_delta:+d}"
+                )
@@ -0,0 +1,173 @@
+# Generated by Django 5.1.4 on 2026-10-18 01:34
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncMonth
+
+
+def populate_rollups(apps, schema_editor):
+    Transaction = apps.get_model("wallet_app", "Transaction")
+    for model_name, bucket in (
+        ("DailyRollup", F("date")),
+        ("MonthlyRollup", TruncMonth("date")),
+    ):
+        model = apps.get_model("wallet_app", model_name)
+        rows = (
+            Transaction.objects.annotate(bucket=bucket)
+            .values("user_id", "account_id", "category_id", "type", "bucket")
+            .annotate(total=Sum("amount"), count=Count("id"))
+            .order_by()
+        )
+        model.objects.bulk_create(
+            [
+                model(
+                    user_id=row["user_id"],
+                    account_id=row["account_id"],
+                    category_id=row["category_id"],
+                    type=row["type"],
+                    period=row["bucket"],
+                    total=row["total"],
+                    count=row["count"],
+                )
+                for row in rows
+            ],
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("wallet_app", "0002_alter_category_options_account_created_at_and_more"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "type",
+                    models.CharField(
+                        choices=[
+                            ("IN", "Income"),
+                            ("OUT", "Expense"),
+                            ("TRANSFER", "Transfer"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("period", models.DateField()),
+                (
+                    "total",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                ("count", models.IntegerField(default=0)),
+                (
+                    "account",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="wallet_app.account",
+                    ),
+                ),
+                (
+                    "category",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to="wallet_app.category",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("user", "account", "category", "type", "period"),
+                        name="unique_daily_rollup_bucket",
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="MonthlyRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "type",
+                    models.CharField(
+                        choices=[
+                            ("IN", "Income"),
+                            ("OUT", "Expense"),
+                            ("TRANSFER", "Transfer"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("period", models.DateField()),
+                (
+                    "total",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                ("count", models.IntegerField(default=0)),
+                (
+                    "account",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="wallet_app.account",
+                    ),
+                ),
+                (
+                    "category",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to="wallet_app.category",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("user", "account", "category", "type", "period"),
+                        name="unique_monthly_rollup_bucket",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(populate_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.1.4 on 2026-10-18 01:38
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def populate_spent(apps, schema_editor):
+    Budget = apps.get_model("wallet_app", "Budget")
+    Transaction = apps.get_model("wallet_app", "Transaction")
+    spent = Subquery(
+        Transaction.objects.filter(
+            user=OuterRef("user"),
+            category=OuterRef("category"),
+            type="OUT",
+            date__gte=OuterRef("start_date"),
+            date__lte=OuterRef("end_date"),
+        )
+        .order_by()
+        .values("category")
+        .annotate(total=Sum("amount"))
+        .values("total")
+    )
+    Budget.objects.update(spent=Coalesce(spent, Value(Decimal("0"))))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("wallet_app", "0003_rollups"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="budget",
+            name="spent",
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.RunPython(populate_spent, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.1.4 on 2026-10-18 01:39
+
+from django.db import migrations, models
+
+
+def populate_paths(apps, schema_editor):
+    Category = apps.get_model("wallet_app", "Category")
+    categories = {c.pk: c for c in Category.objects.only("pk", "parent_id")}
+
+    def path_of(category):
+        if not category.path:
+            parent = categories.get(category.parent_id)
+            prefix = path_of(parent) if parent else ""
+            category.path = f"{prefix}{category.pk}/"
+            category.depth = category.path.count("/") - 1
+        return category.path
+
+    for category in categories.values():
+        path_of(category)
+    Category.objects.bulk_update(
+        categories.values(), ["path", "depth"], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("wallet_app", "0004_budget_spent"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="category",
+            name="depth",
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="category",
+            name="path",
+            field=models.CharField(
+                db_index=True, default="", editable=False, max_length=255
+            ),
+        ),
+        migrations.RunPython(populate_paths, migrations.RunPython.noop),
+    ]
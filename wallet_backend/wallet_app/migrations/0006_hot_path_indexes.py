@@ -0,0 +1,63 @@
+# Generated by Django 5.1.4 on 2026-10-18 01:44
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("wallet_app", "0005_category_path"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="budget",
+            index=models.Index(
+                fields=["category", "start_date", "end_date"],
+                name="budget_category_dates_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="category",
+            index=models.Index(fields=["user", "path"], name="category_user_path_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="dailyrollup",
+            index=models.Index(
+                fields=["user", "period"], name="daily_rollup_user_period_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="monthlyrollup",
+            index=models.Index(
+                fields=["user", "period"], name="monthly_rollup_user_period_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                fields=["user", "date", "id"], name="txn_user_date_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                fields=["user", "type", "date"], name="txn_user_type_date_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                fields=["account", "date", "id"], name="txn_account_date_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                fields=["user", "category", "type", "date"],
+                name="txn_user_cat_type_date_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,96 @@
+# Generated by Django 5.1.4 on 2026-10-18 02:04
+
+from collections import defaultdict
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Case, F, Sum, When
+from django.db.models.functions import TruncMonth
+
+
+def populate_checkpoints(apps, schema_editor):
+    Transaction = apps.get_model("wallet_app", "Transaction")
+    BalanceCheckpoint = apps.get_model("wallet_app", "BalanceCheckpoint")
+    monthly = defaultdict(Decimal)
+    outgoing = (
+        Transaction.objects.values("account_id", month=TruncMonth("date"))
+        .annotate(
+            net=Sum(Case(When(type="IN", then=F("amount")), default=-F("amount")))
+        )
+        .order_by()
+    )
+    for row in outgoing:
+        monthly[(row["account_id"], row["month"])] += row["net"]
+    incoming = (
+        Transaction.objects.filter(type="TRANSFER", to_account__isnull=False)
+        .values("to_account_id", month=TruncMonth("date"))
+        .annotate(net=Sum("amount"))
+        .order_by()
+    )
+    for row in incoming:
+        monthly[(row["to_account_id"], row["month"])] += row["net"]
+
+    checkpoints = []
+    running = defaultdict(Decimal)
+    for account_id, month in sorted(monthly):
+        running[account_id] += monthly[(account_id, month)]
+        checkpoints.append(
+            BalanceCheckpoint(
+                account_id=account_id, period=month, net_change=running[account_id]
+            )
+        )
+    BalanceCheckpoint.objects.bulk_create(checkpoints, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("wallet_app", "0007_data_version"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BalanceCheckpoint",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("period", models.DateField()),
+                (
+                    "net_change",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                fields=["to_account", "date", "id"], name="txn_to_account_date_idx"
+            ),
+        ),
+        migrations.AddField(
+            model_name="balancecheckpoint",
+            name="account",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="checkpoints",
+                to="wallet_app.account",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="balancecheckpoint",
+            constraint=models.UniqueConstraint(
+                fields=("account", "period"), name="unique_balance_checkpoint"
+            ),
+        ),
+        migrations.RunPython(populate_checkpoints, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.4 on 2026-10-18 02:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("wallet_app", "0008_balance_checkpoints"),
+    ]
+
+    # Existing accounts start from an opening balance of 0: the history
+    # cannot tell an amount the account was opened with from drift left by
+    # earlier ledger bugs, so reconciliation reports both for review instead
+    # of taking the stored balance on trust.
+    operations = [
+        migrations.AddField(
+            model_name="account",
+            name="opening_balance",
+            field=models.DecimalField(
+                decimal_places=2, default=0, editable=False, max_digits=10
+            ),
+        ),
+    ]
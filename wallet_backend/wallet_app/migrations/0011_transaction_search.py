@@ -0,0 +1,46 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+from wallet_app.search import install_search_index, uninstall_search_index
+
+
+def create_search_index(apps, schema_editor):
+    install_search_index(schema_editor.connection)
+
+
+def drop_search_index(apps, schema_editor):
+    uninstall_search_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("wallet_app", "0010_recurring_transactions"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TransactionSearch",
+            fields=[
+                (
+                    "transaction",
+                    models.OneToOneField(
+                        db_column="rowid",
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        primary_key=True,
+                        related_name="search_entry",
+                        serialize=False,
+                        to="wallet_app.transaction",
+                    ),
+                ),
+                ("description", models.TextField()),
+                ("rank", models.FloatField()),
+            ],
+            options={
+                "db_table": "wallet_app_transaction_fts",
+                "managed": False,
+            },
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.1.4 on 2026-10-18 02:30
+
+import django.core.validators
+import wallet_app.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("wallet_app", "0011_transaction_search"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="account",
+            name="currency",
+            field=models.CharField(
+                default=wallet_app.models.default_currency,
+                max_length=3,
+                validators=[
+                    django.core.validators.RegexValidator(
+                        "^[A-Z]{3}$", "Use a three-letter ISO 4217 code."
+                    )
+                ],
+            ),
+        ),
+        migrations.CreateModel(
+            name="FxRate",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "currency",
+                    models.CharField(
+                        max_length=3,
+                        validators=[
+                            django.core.validators.RegexValidator(
+                                "^[A-Z]{3}$", "Use a three-letter ISO 4217 code."
+                            )
+                        ],
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("rate", models.DecimalField(decimal_places=8, max_digits=18)),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("currency", "date"), name="unique_fx_rate"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,73 @@
+import hashlib
+from datetime import datetime, time
+
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+from .models import DataVersion
+
+
+class _NotModified(Exception):
+    def __init__(self, response):
+        self.response = response
+
+
+class ConditionalGetMixin:
+    """
+    ETag / Last-Modified support for the user's own data. Validators come from
+    the user's ``DataVersion``, which every ledger write bumps, so a matching
+    ``If-None-Match`` or ``If-Modified-Since`` is answered with 304 right after
+    authentication, before the view's queries or serializers run.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.validators = None
+        if request.method not in ("GET", "HEAD"):
+            return
+
+        version, updated_at = DataVersion.current(request.user.pk)
+        parts = [
+            str(request.user.pk),
+            str(version),
+            request.get_full_path(),
+            request.accepted_media_type or "",
+        ]
+        # HTTP dates have whole-second resolution.
+        last_modified = int(updated_at.timestamp()) if updated_at else None
+        if self.varies_by_day(request):
+            # The response also changes at midnight, without any write.
+            today = timezone.localdate()
+            parts.append(today.isoformat())
+            midnight = timezone.make_aware(datetime.combine(today, time.min))
+            last_modified = max(last_modified or 0, int(midnight.timestamp()))
+        digest = hashlib.sha1("|".join(parts).encode()).hexdigest()
+        self.validators = {"etag": f'"{digest}"', "last_modified": last_modified}
+        response = get_conditional_response(request._request, **self.validators)
+        if response is not None:
+            raise _NotModified(response)
+
+    def varies_by_day(self, request):
+        """Whether the response depends on today's date, e.g. a defaulted day."""
+        return False
+
+    def handle_exception(self, exc):
+        if isinstance(exc, _NotModified):
+            return self.add_validator_headers(exc.response)
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if getattr(self, "validators", None) and response.status_code == 200:
+            self.add_validator_headers(response)
+        return response
+
+    def add_validator_headers(self, response):
+        response["ETag"] = self.validators["etag"]
+        if self.validators["last_modified"] is not None:
+            response["Last-Modified"] = http_date(self.validators["last_modified"])
+        # Responses are per user: let clients revalidate, never share them.
+        response["Cache-Control"] = "private, no-cache"
+        patch_vary_headers(response, ["Authorization"])
+        return response
@@ -1,15 +1,67 @@
-from django.db import models
+from django.db import models, transaction, IntegrityError
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
+from django.conf import settings
+from django.core.validators import (
+    MaxValueValidator,
+    MinValueValidator,
+    RegexValidator,
+)
+import calendar
+from collections import defaultdict
+from datetime import date, timedelta
 from decimal import Decimal
-from django.db.models import Sum
+from django.db.models import Case, Q, Sum, F, OuterRef, Subquery, Value, When, Window
+from django.db.models.functions import Concat, Substr
 from django.utils import timezone
 
+# Amounts are stored in whole cents; SQLite hands back sums as floats.
+CENT = Decimal("0.01")
+
+
+def increment_rows(model, changes, fields, batch_size=200):
+    """
+    Add ``{pk: (delta, ...)}`` to ``fields`` of the matching rows, with one
+    UPDATE per batch of rows instead of one per row.
+    """
+    pks = list(changes)
+    for start in range(0, len(pks), batch_size):
+        batch = pks[start : start + batch_size]
+        updates = {}
+        for index, name in enumerate(fields):
+            field = model._meta.get_field(name)
+            updates[name] = F(name) + Case(
+                *(
+                    When(pk=pk, then=Value(changes[pk][index], output_field=field))
+                    for pk in batch
+                ),
+                default=Value(0),
+                output_field=field,
+            )
+        model.objects.filter(pk__in=batch).update(**updates)
+
+
+def default_currency():
+    return settings.BASE_CURRENCY
+
+
+currency_code = RegexValidator(r"^[A-Z]{3}$", "Use a three-letter ISO 4217 code.")
+
 
 class Account(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     name = models.CharField(max_length=100)
     balance = models.DecimalField(max_digits=10, decimal_places=2)
+    # Balances and transaction amounts are in this currency.
+    currency = models.CharField(
+        max_length=3, default=default_currency, validators=[currency_code]
+    )
+    # Balance not explained by transactions: the amount the account was opened
+    # with plus any direct edits. Reconciliation expects
+    # balance == opening_balance + net effect of the transaction history.
+    opening_balance = models.DecimalField(
+        max_digits=10, decimal_places=2, default=0, editable=False
+    )
     # Added for tracking creation and updates
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
@@ -17,6 +69,114 @@ class Account(models.Model):
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        # Transactions move the balance with queryset updates, so an in-memory
+        # balance may be stale. Once created, it is only written by
+        # set_balance() or an explicit ``update_fields``.
+        if self._state.adding:
+            self.opening_balance = self.balance
+        elif kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in ("balance", "opening_balance")
+            ]
+        super().save(*args, **kwargs)
+
+    def set_balance(self, balance):
+        """Set the balance by hand; the change is carried into opening_balance."""
+        Account.objects.filter(pk=self.pk).update(
+            opening_balance=F("opening_balance") + Decimal(balance) - F("balance"),
+            balance=balance,
+            updated_at=timezone.now(),
+        )
+        self.refresh_from_db(fields=["balance", "opening_balance", "updated_at"])
+
+    def delete(self, *args, **kwargs):
+        from .ledger import LedgerDelta
+
+        # The account's transactions cascade away in SQL; reverse them first so
+        # transfer counterparts, checkpoints and rollups stay consistent.
+        with transaction.atomic():
+            delta = LedgerDelta()
+            for txn in (
+                Transaction.objects.select_for_update().filter(account=self).iterator()
+            ):
+                delta.reverse(txn)
+            delta.apply()
+            return super().delete(*args, **kwargs)
+
+    def _balance_before(self, month):
+        """Balance at the start of ``month``, from the account's checkpoints."""
+        checkpoints = BalanceCheckpoint.objects.filter(account=self).order_by("-period")
+        total = checkpoints.values_list("net_change", flat=True).first() or 0
+        before = (
+            checkpoints.filter(period__lt=month)
+            .values_list("net_change", flat=True)
+            .first()
+            or 0
+        )
+        # Everything posted from ``month`` on is in ``total`` but not ``before``.
+        return self.balance - total + before
+
+    def balance_as_of(self, day):
+        """
+        Balance at the end of ``day``: the nearest checkpoint before the month
+        of ``day`` plus that month's transactions up to ``day``.
+        """
+        month = BalanceCheckpoint.truncate(day)
+        within = Transaction.objects.filter(
+            Q(account=self) | Q(to_account=self), date__range=(month, day)
+        ).aggregate(total=Sum(balance_effect(self.pk)))["total"]
+        return self._balance_before(month) + (within or Decimal("0")).quantize(CENT)
+
+    def running_balances(self, transactions):
+        """
+        Map each of the loaded ``transactions`` to this account's balance right
+        after it, ordered by ``(date, id)``. A window function sums the rows
+        from the start of the oldest transaction's month, seeded from the
+        checkpoint before it.
+        """
+        if not transactions:
+            return {}
+        start = BalanceCheckpoint.truncate(min(txn.date for txn in transactions))
+        end = max(txn.date for txn in transactions)
+        seed = self._balance_before(start)
+        wanted = {txn.pk for txn in transactions}
+        rows = (
+            Transaction.objects.filter(
+                Q(account=self) | Q(to_account=self), date__range=(start, end)
+            )
+            .annotate(
+                running=Window(
+                    Sum(balance_effect(self.pk)),
+                    order_by=[F("date").asc(), F("id").asc()],
+                )
+            )
+            .values_list("pk", "running")
+        )
+        return {
+            pk: seed + running.quantize(CENT) for pk, running in rows if pk in wanted
+        }
+
+
+def balance_effect(account_id):
+    """Signed effect of a transaction row on the balance of ``account_id``."""
+    return Case(
+        When(
+            account_id=account_id,
+            to_account_id=account_id,
+            type="TRANSFER",
+            then=Value(0),
+        ),
+        When(account_id=account_id, type="IN", then=F("amount")),
+        When(account_id=account_id, then=-F("amount")),
+        When(to_account_id=account_id, type="TRANSFER", then=F("amount")),
+        default=Value(0),
+        output_field=models.DecimalField(max_digits=14, decimal_places=2),
+    )
+
 
 class Category(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -25,18 +185,121 @@ class Category(models.Model):
     # Added for better category organization
     description = models.TextField(blank=True)
     created_at = models.DateTimeField(default=timezone.now)
+    # Materialized path of primary keys from the root, e.g. "3/17/42/"
+    path = models.CharField(max_length=255, db_index=True, editable=False, default="")
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
 
     class Meta:
         verbose_name_plural = "Categories"
+        indexes = [
+            # Tree listings: a user's categories in path order.
+            models.Index(fields=["user", "path"], name="category_user_path_idx"),
+        ]
 
     def __str__(self):
         if self.parent:
             return f"{self.parent.name} > {self.name}"
         return self.name
 
+    def clean(self):
+        if self.pk and self.parent_id:
+            paths = dict(
+                Category.objects.filter(pk__in=[self.pk, self.parent_id]).values_list(
+                    "pk", "path"
+                )
+            )
+            if paths.get(self.parent_id, "").startswith(paths.get(self.pk) or "-"):
+                raise ValidationError("A category cannot be moved below itself")
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            old_path = ""
+            if self.pk:
+                old_path = (
+                    Category.objects.filter(pk=self.pk)
+                    .values_list("path", flat=True)
+                    .first()
+                    or ""
+                )
+            super().save(*args, **kwargs)
+
+            parent_path = ""
+            if self.parent_id:
+                parent_path = Category.objects.values_list("path", flat=True).get(
+                    pk=self.parent_id
+                )
+                if old_path and parent_path.startswith(old_path):
+                    raise ValidationError("A category cannot be moved below itself")
+            new_path = f"{parent_path}{self.pk}/"
+            if new_path == old_path:
+                return
+
+            depth = new_path.count("/") - 1
+            Category.objects.filter(pk=self.pk).update(path=new_path, depth=depth)
+            if old_path:
+                # Re-root the whole subtree with one UPDATE.
+                Category.objects.filter(path__startswith=old_path).exclude(
+                    pk=self.pk
+                ).update(
+                    path=Concat(Value(new_path), Substr("path", len(old_path) + 1)),
+                    depth=F("depth") + (depth - (old_path.count("/") - 1)),
+                )
+            self.path, self.depth = new_path, depth
+
     def get_children(self):
         return Category.objects.filter(parent=self)
 
+    def get_ancestor_ids(self):
+        """Primary keys from the root down to the parent, read from ``path``."""
+        return [int(pk) for pk in self.path.split("/")[:-2]]
+
+    def get_ancestors(self):
+        return Category.objects.filter(pk__in=self.get_ancestor_ids()).order_by("depth")
+
+    def get_descendants(self):
+        return Category.objects.filter(path__startswith=self.path).exclude(pk=self.pk)
+
+    @staticmethod
+    def children_map(categories):
+        """Group already-loaded categories by ``parent_id`` to walk a tree in memory."""
+        children = {}
+        for category in categories:
+            children.setdefault(category.parent_id, []).append(category)
+        return children
+
+    @staticmethod
+    def spending_totals(user, categories, start_date=None, end_date=None):
+        """
+        Return ``{pk: (own_total, subtree_total)}`` of expenses in the base
+        currency for the loaded ``categories``, grouped over the daily rollups
+        and converted through ``fx`` like the reports.
+        """
+        from .analytics import _decimal, _grouped
+
+        buckets = DailyRollup.objects.filter(user=user, type="OUT")
+        if start_date:
+            buckets = buckets.filter(period__gte=start_date)
+        if end_date:
+            buckets = buckets.filter(period__lte=end_date)
+        rows = _grouped(
+            buckets.filter(category__isnull=False),
+            ["category_id"],
+            {},
+            {"total": Sum("total")},
+        )
+        own = {row["category_id"]: _decimal(row["total"]) for row in rows}
+
+        subtree = {category.pk: Decimal("0") for category in categories}
+        for category in categories:
+            total = own.get(category.pk, Decimal("0"))
+            for pk in category.get_ancestor_ids() + [category.pk]:
+                if pk in subtree:
+                    subtree[pk] += total
+        return {
+            category.pk: (own.get(category.pk, Decimal("0")), subtree[category.pk])
+            for category in categories
+        }
+
 
 class Transaction(models.Model):
     # transaction types
@@ -60,57 +323,268 @@ class Transaction(models.Model):
         on_delete=models.SET_NULL,
     )
     created_at = models.DateTimeField(default=timezone.now)
+    # Set on rows materialized from a recurring rule: one row per occurrence.
+    recurring = models.ForeignKey(
+        "RecurringTransaction",
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="transactions",
+        editable=False,
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["recurring", "date"], name="unique_recurring_occurrence"
+            )
+        ]
+        indexes = [
+            # Transaction listings and keyset pages: user, newest first.
+            models.Index(fields=["user", "date", "id"], name="txn_user_date_id_idx"),
+            # Listings filtered by type (income/expense/transfer).
+            models.Index(
+                fields=["user", "type", "date"], name="txn_user_type_date_idx"
+            ),
+            # Account statements and their keyset pages.
+            models.Index(
+                fields=["account", "date", "id"], name="txn_account_date_id_idx"
+            ),
+            # Incoming transfers when replaying an account's month.
+            models.Index(
+                fields=["to_account", "date", "id"], name="txn_to_account_date_idx"
+            ),
+            # Budget spending sums: a user's expenses in one category over a range.
+            models.Index(
+                fields=["user", "category", "type", "date"],
+                name="txn_user_cat_type_date_idx",
+            ),
+        ]
 
     def clean(self):
         if self.type == "TRANSFER" and not self.to_account:
             raise ValidationError("Transfer transactions require a destination account")
 
     def save(self, *args, **kwargs):
-        # Update account balances based on transaction type
-        if self.type == "IN":
-            self.account.balance += self.amount
-        elif self.type == "OUT":
-            self.account.balance -= self.amount
-        elif self.type == "TRANSFER":
-            self.account.balance -= self.amount
-            if self.to_account:
-                self.to_account.balance += self.amount
-                self.to_account.save()
-
-        self.account.save()
-        super().save(*args, **kwargs)
+        from .ledger import LedgerDelta
+
+        # Balances are adjusted with database-side arithmetic by LedgerDelta:
+        # an edit reverses the stored row and posts the new values, so only
+        # the difference reaches the affected accounts.
+        with transaction.atomic():
+            delta = LedgerDelta()
+            if self.pk:
+                previous = (
+                    Transaction.objects.select_for_update().filter(pk=self.pk).first()
+                )
+                if previous:
+                    delta.reverse(previous)
+
+            super().save(*args, **kwargs)
+
+            delta.post(self)
+            delta.apply()
 
         # Check budget after transaction
         self._check_budget()
 
+    def delete(self, *args, **kwargs):
+        from .ledger import LedgerDelta
+
+        with transaction.atomic():
+            delta = LedgerDelta()
+            stored = Transaction.objects.select_for_update().filter(pk=self.pk).first()
+            delta.reverse(stored or self)
+            result = super().delete(*args, **kwargs)
+            delta.apply()
+        return result
+
     def _check_budget(self):
-        if self.category and self.type == "OUT":
-            current_month_start = timezone.now().replace(
-                day=1, hour=0, minute=0, second=0, microsecond=0
+        if (
+            self.category
+            and self.type == "OUT"
+            and self.account.currency == settings.BASE_CURRENCY
+        ):
+            Transaction.check_budget(self.user, self.category, self.date)
+
+    @staticmethod
+    def check_budget(user, category, day):
+        """Notify ``user`` when the budget covering ``day`` for ``category`` is exceeded."""
+        Transaction.check_budgets(user, {category.pk: {day}})
+
+    @staticmethod
+    def check_budgets(user, days):
+        """
+        Notify ``user`` of every exceeded budget covering one of the expense
+        ``days`` (``{category_id: set of dates}``) of its category.
+        """
+        every_day = [day for dates in days.values() for day in dates]
+        if not every_day:
+            return
+        budgets = Budget.objects.filter(
+            user=user,
+            category_id__in=days,
+            start_date__lte=max(every_day),
+            end_date__gte=min(every_day),
+            spent__gt=F("limit"),
+        ).select_related("category")
+        BudgetNotification.objects.bulk_create(
+            BudgetNotification(
+                user=user,
+                budget=budget,
+                message=f"Budget exceeded for {budget.category.name}. Limit: {budget.limit}, Spent: {budget.spent}",
             )
-            budget = Budget.objects.filter(
-                category=self.category,
-                start_date__lte=self.date,
-                end_date__gte=self.date,
-            ).first()
-
-            if budget:
-                month_total = Transaction.objects.filter(
-                    category=self.category, date__gte=current_month_start, type="OUT"
-                ).aggregate(Sum("amount"))["amount__sum"] or Decimal("0")
-
-                if month_total > budget.limit:
-                    # Create budget notification
-                    BudgetNotification.objects.create(
-                        user=self.user,
-                        budget=budget,
-                        message=f"Budget exceeded for {self.category.name}. Limit: {budget.limit}, Spent: {month_total}",
-                    )
+            for budget in budgets
+            if any(
+                budget.start_date <= day <= budget.end_date
+                for day in days[budget.category_id]
+            )
+        )
 
     def __str__(self):
         return f"{self.date} - {self.description}: ${self.amount}"
 
 
+def add_months(day, months, day_of_month):
+    """``day`` moved by ``months``, on ``day_of_month`` or the month's last day."""
+    month_index = day.year * 12 + day.month - 1 + months
+    year, month = divmod(month_index, 12)
+    last = calendar.monthrange(year, month + 1)[1]
+    return date(year, month + 1, min(day_of_month, last))
+
+
+class RecurringTransaction(models.Model):
+    """
+    A schedule (salary, rent, subscriptions) from which transactions are
+    materialized. ``next_date`` is the first occurrence not yet posted, or
+    null once the schedule has ended; the scheduler scans it through an index.
+    """
+
+    INTERVALS = [
+        ("daily", "Daily"),
+        ("weekly", "Weekly"),
+        ("monthly", "Monthly"),
+        ("yearly", "Yearly"),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    account = models.ForeignKey(Account, on_delete=models.CASCADE)
+    to_account = models.ForeignKey(
+        Account,
+        null=True,
+        blank=True,
+        related_name="incoming_recurring",
+        on_delete=models.SET_NULL,
+    )
+    category = models.ForeignKey(
+        Category, on_delete=models.SET_NULL, null=True, blank=True
+    )
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    type = models.CharField(max_length=10, choices=Transaction.TRANSACTION_TYPE)
+    description = models.TextField(blank=True)
+    interval = models.CharField(max_length=10, choices=INTERVALS, default="monthly")
+    every = models.PositiveSmallIntegerField(
+        default=1,
+        validators=[MinValueValidator(1)],
+        help_text="Number of intervals between occurrences",
+    )
+    day_of_month = models.PositiveSmallIntegerField(
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(1), MaxValueValidator(31)],
+        help_text="Monthly and yearly rules: day to post on (clamped to the "
+        "month's last day); defaults to the start date's day",
+    )
+    start_date = models.DateField()
+    end_date = models.DateField(null=True, blank=True)
+    next_date = models.DateField(null=True, blank=True, editable=False)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # The scheduler's scan: every rule due on or before a day.
+            models.Index(fields=["next_date"], name="recurring_next_date_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.description or self.get_type_display()} ({self.interval})"
+
+    def clean(self):
+        if self.end_date and self.end_date < self.start_date:
+            raise ValidationError("End date must be after start date")
+        if self.type == "TRANSFER" and not self.to_account_id:
+            raise ValidationError("Transfer transactions require a destination account")
+
+    def save(self, *args, **kwargs):
+        # A new or rescheduled rule resumes from its start date or from the
+        # occurrence it had reached, whichever is later.
+        resume = self.start_date
+        if self.pk:
+            reached = (
+                RecurringTransaction.objects.filter(pk=self.pk)
+                .values_list("next_date", flat=True)
+                .first()
+            )
+            if reached and reached > resume:
+                resume = reached
+        self.next_date = self.first_on_or_after(resume)
+        super().save(*args, **kwargs)
+
+    def occurrence(self, index):
+        """The ``index``-th occurrence counted from the start date."""
+        step = index * max(self.every, 1)
+        if self.interval == "daily":
+            return self.start_date + timedelta(days=step)
+        if self.interval == "weekly":
+            return self.start_date + timedelta(weeks=step)
+        months = step * 12 if self.interval == "yearly" else step
+        return add_months(
+            self.start_date, months, self.day_of_month or self.start_date.day
+        )
+
+    def first_on_or_after(self, day):
+        """The first occurrence on or after ``day``, or None past the end date."""
+        if self.interval in ("daily", "weekly"):
+            days = 1 if self.interval == "daily" else 7
+            period = days * max(self.every, 1)
+            index = max(0, -(-(day - self.start_date).days // period))
+        else:
+            months = (day.year - self.start_date.year) * 12 + (
+                day.month - self.start_date.month
+            )
+            period = max(self.every, 1) * (12 if self.interval == "yearly" else 1)
+            index = max(0, months // period - 1)
+        candidate = self.occurrence(index)
+        while candidate < day:
+            index += 1
+            candidate = self.occurrence(index)
+        if self.end_date and candidate > self.end_date:
+            return None
+        return candidate
+
+    def due_dates(self, until):
+        """Occurrences from ``next_date`` through ``until``, and the next one after."""
+        due = []
+        day = self.next_date
+        while day is not None and day <= until:
+            due.append(day)
+            day = self.first_on_or_after(day + timedelta(days=1))
+        return due, day
+
+    def build_transaction(self, day):
+        return Transaction(
+            user_id=self.user_id,
+            account_id=self.account_id,
+            to_account_id=self.to_account_id,
+            category_id=self.category_id,
+            amount=self.amount,
+            type=self.type,
+            description=self.description,
+            date=day,
+            recurring=self,
+        )
+
+
 class Budget(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     category = models.ForeignKey(Category, on_delete=models.CASCADE)
@@ -125,6 +599,59 @@ class Budget(models.Model):
         help_text="Percentage at which to notify (e.g., 80 for 80%)",
     )
     created_at = models.DateTimeField(default=timezone.now)
+    # Running total of matching expenses, maintained by LedgerDelta. Budgets
+    # are in the base currency: accounts in other currencies don't count.
+    spent = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        indexes = [
+            # Budgets covering a date for a category (budget checks, counters).
+            models.Index(
+                fields=["category", "start_date", "end_date"],
+                name="budget_category_dates_idx",
+            ),
+        ]
+
+    @staticmethod
+    def spent_subquery():
+        """Correlated subquery summing the expenses that count towards a budget."""
+        return Subquery(
+            Transaction.objects.filter(
+                user=OuterRef("user"),
+                category=OuterRef("category"),
+                account__currency=settings.BASE_CURRENCY,
+                type="OUT",
+                date__gte=OuterRef("start_date"),
+                date__lte=OuterRef("end_date"),
+            )
+            .order_by()
+            .values("category")
+            .annotate(total=Sum("amount"))
+            .values("total")
+        )
+
+    def save(self, *args, **kwargs):
+        # The counter is recalculated whenever the budget's range or category
+        # may have changed; transactions keep it current in between.
+        self.spent = Transaction.objects.filter(
+            user_id=self.user_id,
+            category_id=self.category_id,
+            account__currency=settings.BASE_CURRENCY,
+            type="OUT",
+            date__range=(self.start_date, self.end_date),
+        ).aggregate(total=Sum("amount"))["total"] or Decimal("0")
+        super().save(*args, **kwargs)
+
+    def get_progress(self):
+        """Progress against the limit, read from the maintained ``spent`` counter."""
+        return {
+            "budget_limit": self.limit,
+            "total_spent": self.spent,
+            "remaining": self.limit - self.spent,
+            "percentage_used": (
+                (self.spent / self.limit * 100) if self.limit > 0 else 0
+            ),
+        }
 
     def clean(self):
         if self.start_date > self.end_date:
@@ -148,6 +675,296 @@ class Budget(models.Model):
         return f"{self.category.name} - ${self.limit}"
 
 
+class FxRate(models.Model):
+    """Value of one unit of ``currency`` in ``settings.BASE_CURRENCY`` on ``date``."""
+
+    currency = models.CharField(max_length=3, validators=[currency_code])
+    date = models.DateField()
+    rate = models.DecimalField(max_digits=18, decimal_places=8)
+
+    class Meta:
+        constraints = [
+            # Also the index behind rate lookups by currency and day.
+            models.UniqueConstraint(fields=["currency", "date"], name="unique_fx_rate")
+        ]
+
+    def __str__(self):
+        return f"{self.currency} {self.date}: {self.rate}"
+
+
+class FullTextMatch(models.Lookup):
+    lookup_name = "match"
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} MATCH {rhs}", lhs_params + rhs_params
+
+
+class TransactionSearch(models.Model):
+    """
+    The SQLite FTS5 index over transaction descriptions, created and kept in
+    sync by ``search.install_search_index``. ``rank`` is bm25 relevance
+    (lower is better) and is only defined in queries that use ``match``.
+    """
+
+    transaction = models.OneToOneField(
+        Transaction,
+        primary_key=True,
+        db_column="rowid",
+        db_constraint=False,
+        on_delete=models.DO_NOTHING,
+        related_name="search_entry",
+    )
+    description = models.TextField()
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = "wallet_app_transaction_fts"
+
+
+TransactionSearch._meta.get_field("description").register_lookup(FullTextMatch)
+
+
+class BalanceCheckpoint(models.Model):
+    """
+    Net effect of all of an account's transactions dated up to the end of
+    ``period`` (a month), maintained by LedgerDelta. With the current balance
+    it gives the balance at any month boundary without replaying the history.
+    Months without activity have no row; the previous checkpoint applies.
+    """
+
+    account = models.ForeignKey(
+        Account, on_delete=models.CASCADE, related_name="checkpoints"
+    )
+    period = models.DateField()
+    net_change = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["account", "period"], name="unique_balance_checkpoint"
+            )
+        ]
+
+    @staticmethod
+    def truncate(day):
+        return day.replace(day=1)
+
+    @classmethod
+    def apply_deltas(cls, deltas):
+        """
+        Add ``{(account_id, period): amount}`` to the checkpoint for ``period``
+        and every later one. Call with the accounts locked.
+        """
+        changes = defaultdict(dict)
+        for (account_id, period), amount in deltas.items():
+            if amount:
+                changes[account_id][period] = amount
+        if not changes:
+            return
+
+        stored = defaultdict(list)
+        for pk, account_id, period, net_change in (
+            cls.objects.filter(account_id__in=changes)
+            .order_by("account_id", "period")
+            .values_list("pk", "account_id", "period", "net_change")
+        ):
+            stored[account_id].append((period, pk, net_change))
+
+        increments = {}
+        created = []
+        for account_id, amounts in changes.items():
+            rows = stored[account_id]
+            existing = {period for period, _, _ in rows}
+            # Walk the stored and new periods in order, carrying the sum of the
+            # deltas at or before each one and the last stored total.
+            periods = sorted(existing.union(amounts))
+            by_period = {period: (pk, net) for period, pk, net in rows}
+            carried = Decimal("0")
+            previous = Decimal("0")
+            for period in periods:
+                carried += amounts.get(period, 0)
+                if period in by_period:
+                    pk, previous = by_period[period]
+                    if carried:
+                        increments[pk] = (carried,)
+                else:
+                    created.append(
+                        cls(
+                            account_id=account_id,
+                            period=period,
+                            net_change=previous + carried,
+                        )
+                    )
+        increment_rows(cls, increments, ["net_change"])
+        cls.objects.bulk_create(created)
+
+
+class LedgerRollup(models.Model):
+    """Pre-aggregated transaction totals for one user, account, category and type."""
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    account = models.ForeignKey(Account, on_delete=models.CASCADE)
+    category = models.ForeignKey(
+        Category, on_delete=models.SET_NULL, null=True, blank=True
+    )
+    type = models.CharField(max_length=10, choices=Transaction.TRANSACTION_TYPE)
+    period = models.DateField()
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    count = models.IntegerField(default=0)
+
+    BUCKET_FIELDS = ("user_id", "account_id", "category_id", "type", "period")
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def truncate(cls, day):
+        """Return the first day of the bucket containing ``day``."""
+        raise NotImplementedError
+
+    @classmethod
+    def apply_deltas(cls, deltas):
+        """
+        Add ``{(user_id, account_id, category_id, type, date): (amount, count)}``
+        to the matching buckets, creating any bucket that does not exist yet.
+        """
+        buckets = {}
+        for (user_id, account_id, category_id, type_, day), (
+            amount,
+            count,
+        ) in deltas.items():
+            key = (user_id, account_id, category_id, type_, cls.truncate(day))
+            total, rows = buckets.get(key, (0, 0))
+            buckets[key] = (total + amount, rows + count)
+
+        buckets = {key: value for key, value in buckets.items() if any(value)}
+        if not buckets:
+            return
+        ids = cls._bucket_ids(buckets)
+        try:
+            with transaction.atomic():
+                cls._create_buckets(buckets, ids)
+        except IntegrityError:
+            # Another writer created some of these buckets first; add to those.
+            ids = cls._bucket_ids(buckets)
+            cls._create_buckets(buckets, ids)
+        increment_rows(
+            cls,
+            {pk: buckets[key] for key, pk in ids.items()},
+            ["total", "count"],
+        )
+
+    @classmethod
+    def _bucket_ids(cls, buckets):
+        """Map each key of ``buckets`` that has a row to that row's primary key."""
+        periods = [key[4] for key in buckets]
+        rows = (
+            cls.objects.filter(
+                user_id__in={key[0] for key in buckets},
+                account_id__in={key[1] for key in buckets},
+                period__range=(min(periods), max(periods)),
+            )
+            .order_by("pk")
+            .values_list("pk", *cls.BUCKET_FIELDS)
+        )
+        ids = {}
+        for pk, *key in rows:
+            key = tuple(key)
+            # Rows whose category was deleted share a NULL category and are not
+            # covered by the unique constraint, so always update a single row.
+            if key in buckets and key not in ids:
+                ids[key] = pk
+        return ids
+
+    @classmethod
+    def _create_buckets(cls, buckets, ids):
+        cls.objects.bulk_create(
+            cls(**dict(zip(cls.BUCKET_FIELDS, key)), total=total, count=count)
+            for key, (total, count) in buckets.items()
+            if key not in ids
+        )
+
+
+class DailyRollup(LedgerRollup):
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "account", "category", "type", "period"],
+                name="unique_daily_rollup_bucket",
+            )
+        ]
+        indexes = [
+            # Reports and charts: one user's buckets over a period range.
+            models.Index(
+                fields=["user", "period"], name="daily_rollup_user_period_idx"
+            ),
+        ]
+
+    @classmethod
+    def truncate(cls, day):
+        return day
+
+
+class MonthlyRollup(LedgerRollup):
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "account", "category", "type", "period"],
+                name="unique_monthly_rollup_bucket",
+            )
+        ]
+        indexes = [
+            # Reports and charts: one user's buckets over a period range.
+            models.Index(
+                fields=["user", "period"], name="monthly_rollup_user_period_idx"
+            ),
+        ]
+
+    @classmethod
+    def truncate(cls, day):
+        return day.replace(day=1)
+
+
+class DataVersion(models.Model):
+    """
+    Per-user counter bumped on every ledger write. Cached analytics are keyed
+    by it, so a write invalidates every cached result for that user at once.
+    """
+
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True)
+    version = models.BigIntegerField(default=1)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    @classmethod
+    def current(cls, user_id):
+        """Return ``(version, updated_at)`` for ``user_id``."""
+        row = cls.objects.filter(user_id=user_id).values_list("version", "updated_at")
+        return row.first() or (0, None)
+
+    @classmethod
+    async def acurrent(cls, user_id):
+        row = cls.objects.filter(user_id=user_id).values_list("version", "updated_at")
+        return await row.afirst() or (0, None)
+
+    @classmethod
+    def bump(cls, *user_ids):
+        now = timezone.now()
+        for user_id in set(user_ids):
+            if not cls.objects.filter(user_id=user_id).update(
+                version=F("version") + 1, updated_at=now
+            ):
+                try:
+                    with transaction.atomic():
+                        cls.objects.create(user_id=user_id, updated_at=now)
+                except IntegrityError:
+                    cls.objects.filter(user_id=user_id).update(
+                        version=F("version") + 1, updated_at=now
+                    )
+
+
 # New model for budget notifications
 class BudgetNotification(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
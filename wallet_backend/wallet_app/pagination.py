@@ -0,0 +1,137 @@
+import base64
+import json
+from collections import OrderedDict
+
+from django.db.models import Q
+from django.utils.dateparse import parse_date
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class TransactionKeysetPagination(BasePagination):
+    """
+    Keyset pagination over ``(date, id)``, newest first. Cursors hold the key of
+    the boundary row, so every page is one indexed range scan regardless of how
+    deep into the history it is. Search results requested with
+    ``ordering=relevance`` are paged over ``(search_rank, id)`` instead, best
+    match first.
+    """
+
+    page_size = 50
+    max_page_size = 500
+    page_size_query_param = "page_size"
+    cursor_query_param = "cursor"
+    ordering_query_param = "ordering"
+    relevance_ordering = "relevance"
+    rank_field = "search_rank"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.key = "date"
+        if (
+            request.query_params.get(self.ordering_query_param)
+            == self.relevance_ordering
+            and self.rank_field in queryset.query.annotations
+        ):
+            self.key = self.rank_field
+        key = self.key
+        cursor = self.decode_cursor(request)
+
+        if cursor is None:
+            reverse = False
+            queryset = queryset.order_by(f"-{key}", "-id")
+        else:
+            reverse, value, pk = cursor
+            if reverse:
+                queryset = queryset.filter(
+                    Q(**{f"{key}__gt": value}) | Q(**{key: value, "id__gt": pk})
+                ).order_by(key, "id")
+            else:
+                queryset = queryset.filter(
+                    Q(**{f"{key}__lt": value}) | Q(**{key: value, "id__lt": pk})
+                ).order_by(f"-{key}", "-id")
+
+        rows = list(queryset[: self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        if reverse:
+            rows.reverse()
+
+        self.next_row = self.previous_row = None
+        if rows:
+            if has_more or reverse:
+                self.next_row = rows[-1]
+            if (has_more and reverse) or (cursor is not None and not reverse):
+                self.previous_row = rows[0]
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            data = json.loads(base64.urlsafe_b64decode(encoded.encode()).decode())
+            if self.key == "date":
+                value = parse_date(data["d"])
+            else:
+                value = float(data["s"])
+            pk = int(data["i"])
+            reverse = bool(data.get("r"))
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        if value is None:
+            raise NotFound(self.invalid_cursor_message)
+        return reverse, value, pk
+
+    def encode_cursor(self, row, reverse):
+        if self.key == "date":
+            data = {"d": row.date.isoformat(), "i": row.pk}
+        else:
+            data = {"s": getattr(row, self.key), "i": row.pk}
+        if reverse:
+            data["r"] = 1
+        encoded = base64.urlsafe_b64encode(json.dumps(data).encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if self.next_row is None:
+            return None
+        return self.encode_cursor(self.next_row, reverse=False)
+
+    def get_previous_link(self):
+        if self.previous_row is None:
+            return None
+        return self.encode_cursor(self.previous_row, reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(
+            OrderedDict(
+                [
+                    ("next", self.get_next_link()),
+                    ("previous", self.get_previous_link()),
+                    ("results", data),
+                ]
+            )
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
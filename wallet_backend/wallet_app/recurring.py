@@ -0,0 +1,85 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .ledger import LedgerDelta
+from .models import RecurringTransaction, Transaction
+
+
+class RecurringMaterializer:
+    """
+    Post every occurrence of the recurring rules that is due by ``today``.
+    Due rules are read through the ``next_date`` index in batches; each batch
+    is written with one ``bulk_create`` and one aggregated ledger update and
+    advances its rules' ``next_date`` in the same transaction, so a rerun
+    finds nothing left to post. Occurrences that already exist are skipped
+    (and are unique per rule and date), which keeps reruns after a rule was
+    rescheduled from duplicating rows.
+    """
+
+    def __init__(self, today=None, batch_size=500):
+        self.today = today or timezone.localdate()
+        self.batch_size = batch_size
+        self.rules = 0
+        self.created = 0
+        # Expense dates per category of each user, for the final budget check.
+        self.spending = defaultdict(lambda: defaultdict(set))
+
+    def run(self):
+        while self._materialize_batch():
+            pass
+        for user, days in self.spending.items():
+            Transaction.check_budgets(user, days)
+        return {"rules": self.rules, "created": self.created}
+
+    def _materialize_batch(self):
+        with transaction.atomic():
+            # Concurrent schedulers skip each other's rules instead of waiting.
+            rules = list(
+                RecurringTransaction.objects.select_for_update(skip_locked=True)
+                .filter(next_date__lte=self.today)
+                .select_related("user", "category", "account")
+                .order_by("next_date", "pk")[: self.batch_size]
+            )
+            if not rules:
+                return False
+
+            pending = []
+            for rule in rules:
+                due, rule.next_date = rule.due_dates(self.today)
+                pending.extend(rule.build_transaction(day) for day in due)
+            existing = set(
+                Transaction.objects.filter(
+                    recurring__in=rules,
+                    date__gte=min(txn.date for txn in pending),
+                    date__lte=self.today,
+                ).values_list("recurring_id", "date")
+            )
+            created = Transaction.objects.bulk_create(
+                [
+                    txn
+                    for txn in pending
+                    if (txn.recurring_id, txn.date) not in existing
+                ],
+                batch_size=self.batch_size,
+            )
+
+            delta = LedgerDelta()
+            for txn in created:
+                delta.post(txn)
+            delta.apply()
+            RecurringTransaction.objects.bulk_update(rules, ["next_date"])
+
+        self.rules += len(rules)
+        self.created += len(created)
+        for txn in created:
+            rule = txn.recurring
+            if (
+                txn.category_id
+                and txn.type == "OUT"
+                and rule.account.currency == settings.BASE_CURRENCY
+            ):
+                self.spending[rule.user][txn.category_id].add(txn.date)
+        return True
@@ -0,0 +1,167 @@
+"""
+Full-text search over transaction descriptions. SQLite keeps an FTS5 index in
+a shadow table that triggers update on every insert, update and delete;
+PostgreSQL uses a GIN index on the description's ``tsvector``. Every term of
+a query is matched as a prefix, and matches carry a ``search_rank`` where
+higher is more relevant.
+"""
+
+import re
+
+from django.db import connections
+from django.db.models import F, FloatField, Q, Value
+
+FTS_TABLE = "wallet_app_transaction_fts"
+SEARCH_INDEX = "txn_description_search_idx"
+
+_TERM = re.compile(r"\w+")
+
+# The FTS5 table reads descriptions from the transaction table itself
+# ("external content"), so it stores only the index.
+_SQLITE_SCHEMA = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        description,
+        content='wallet_app_transaction',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert
+    AFTER INSERT ON wallet_app_transaction BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, description)
+        VALUES (new.id, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete
+    AFTER DELETE ON wallet_app_transaction BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, description)
+        VALUES ('delete', old.id, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update
+    AFTER UPDATE OF description ON wallet_app_transaction BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, description)
+        VALUES ('delete', old.id, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, description)
+        VALUES (new.id, new.description);
+    END
+    """,
+]
+
+# Must stay the expression _search_vector() compiles to, or it goes unused.
+_POSTGRES_INDEX = f"""
+    CREATE INDEX IF NOT EXISTS {SEARCH_INDEX} ON wallet_app_transaction
+    USING gin (to_tsvector('simple'::regconfig, COALESCE(description, '')))
+"""
+
+
+def search_terms(query):
+    """Lower-cased words of ``query``; punctuation is ignored."""
+    return _TERM.findall((query or "").lower())
+
+
+def _search_vector():
+    from django.contrib.postgres.search import SearchVector
+
+    return SearchVector("description", config="simple")
+
+
+def install_search_index(connection):
+    """Create the search index for ``connection`` and fill it from existing rows."""
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            for statement in _SQLITE_SCHEMA:
+                cursor.execute(statement)
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        elif connection.vendor == "postgresql":
+            cursor.execute(_POSTGRES_INDEX)
+
+
+def repair_search_index(connection):
+    """
+    SQLite drops triggers along with their table, which Django does when a
+    migration rebuilds the transaction table. Recreate them and resync the
+    index if that happened; a no-op when search is not installed.
+    """
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE name LIKE %s",
+            [f"{FTS_TABLE}%"],
+        )
+        names = {row[0] for row in cursor.fetchall()}
+    triggers = {f"{FTS_TABLE}_{suffix}" for suffix in ("insert", "delete", "update")}
+    if FTS_TABLE in names and not triggers <= names:
+        install_search_index(connection)
+
+
+def uninstall_search_index(connection):
+    if connection.vendor == "sqlite":
+        with connection.cursor() as cursor:
+            for suffix in ("insert", "delete", "update"):
+                cursor.execute(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}")
+            cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+    elif connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP INDEX IF EXISTS {SEARCH_INDEX}")
+
+
+def search_transactions(queryset, query, ranked=False):
+    """
+    Restrict ``queryset`` to transactions whose description contains a word
+    starting with each term of ``query``. With ``ranked`` the rows are also
+    annotated with ``search_rank``, where higher is more relevant.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return queryset
+    vendor = connections[queryset.db].vendor
+
+    if vendor == "sqlite":
+        from .models import TransactionSearch
+
+        match = " AND ".join(f'"{term}"*' for term in terms)
+        if ranked:
+            # Joining the index reads bm25() once per match; lower is better.
+            return queryset.filter(search_entry__description__match=match).annotate(
+                search_rank=-F("search_entry__rank")
+            )
+        # A list of matching rowids leaves the ordering to the (user, date)
+        # index, which stops after one page.
+        return queryset.filter(
+            pk__in=TransactionSearch.objects.filter(description__match=match).values(
+                "transaction_id"
+            )
+        )
+
+    if vendor == "postgresql":
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+
+        search = SearchQuery(
+            " & ".join(f"{term}:*" for term in terms),
+            config="simple",
+            search_type="raw",
+        )
+        # Filtering on the same expression as the index lets it be used.
+        queryset = queryset.annotate(search_vector=_search_vector()).filter(
+            search_vector=search
+        )
+        if ranked:
+            queryset = queryset.annotate(
+                search_rank=SearchRank(_search_vector(), search)
+            )
+        return queryset
+
+    # Other backends have no index to use: match substrings, unranked.
+    condition = Q()
+    for term in terms:
+        condition &= Q(description__icontains=term)
+    queryset = queryset.filter(condition)
+    if ranked:
+        queryset = queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+    return queryset
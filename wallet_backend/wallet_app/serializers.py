@@ -1,8 +1,23 @@
+from django.db.models import Q
 from rest_framework import serializers
 from django.contrib.auth.models import User
 from django.contrib.auth import get_user_model
-from django.db.models import Sum
-from .models import Account, Category, Transaction, Budget, BudgetNotification
+from .models import (
+    Account,
+    Category,
+    Transaction,
+    RecurringTransaction,
+    Budget,
+    BudgetNotification,
+)
+
+
+def _check_transfer_currency(account, to_account):
+    """Transfers move the same amount out and in, so both sides share a currency."""
+    if account and to_account and account.currency != to_account.currency:
+        raise serializers.ValidationError(
+            {"to_account": "Transfers must be between accounts in the same currency."}
+        )
 
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
@@ -47,36 +62,301 @@ class AccountSerializer(serializers.ModelSerializer):
     def get_total_balance(self, obj):
         return obj.balance
 
+    def validate_currency(self, value):
+        # Existing amounts, and the budgets counting them, are in the old one.
+        if (
+            self.instance is not None
+            and value != self.instance.currency
+            and Transaction.objects.filter(
+                Q(account=self.instance) | Q(to_account=self.instance)
+            ).exists()
+        ):
+            raise serializers.ValidationError(
+                "The currency of an account with transactions cannot be changed."
+            )
+        return value
+
+    def update(self, instance, validated_data):
+        # A balance edit is an explicit adjustment; other edits never write it.
+        balance = validated_data.pop("balance", None)
+        if balance is not None and balance != instance.balance:
+            instance.set_balance(balance)
+        return super().update(instance, validated_data)
+
+
+class AccountBalanceSerializer(serializers.Serializer):
+    account = serializers.IntegerField()
+    as_of = serializers.DateField()
+    balance = serializers.DecimalField(max_digits=14, decimal_places=2)
+
 
 class CategorySerializer(serializers.ModelSerializer):
     subcategories = serializers.SerializerMethodField()
     total_spending = serializers.SerializerMethodField()
+    subtree_spending = serializers.SerializerMethodField()
 
     class Meta:
         model = Category
         exclude = ["user"]
 
     def get_subcategories(self, obj):
-        return CategorySerializer(obj.get_children(), many=True).data
+        children = self._tree(obj)[0].get(obj.pk, [])
+        return CategorySerializer(children, many=True, context=self.context).data
+
+    def validate_parent(self, value):
+        if value is None:
+            return value
+        request = self.context.get("request")
+        if request and value.user_id != request.user.pk:
+            raise serializers.ValidationError("Unknown category.")
+        if self.instance and value.path.startswith(self.instance.path):
+            raise serializers.ValidationError(
+                "A category cannot be moved below itself."
+            )
+        return value
 
     def get_total_spending(self, obj):
-        return (
-            Transaction.objects.filter(category=obj, type="OUT").aggregate(
-                total=Sum("amount")
-            )["total"]
-            or 0
+        return self._spending(obj)[0]
+
+    def get_subtree_spending(self, obj):
+        return self._spending(obj)[1]
+
+    def _spending(self, obj):
+        return self._tree(obj)[1][obj.pk]
+
+    def _tree(self, obj):
+        # Views that load a whole tree pass its ``children`` map and ``spending``
+        # totals, so nesting is assembled in memory. Otherwise (e.g. write
+        # responses) the outermost node loads its subtree once and shares it
+        # with the nested serializers through the context.
+        children = self.context.get("children")
+        spending = self.context.get("spending")
+        if children is None or spending is None or obj.pk not in spending:
+            tree = [obj, *obj.get_descendants().order_by("path")]
+            children = self.context["children"] = Category.children_map(tree)
+            spending = self.context["spending"] = Category.spending_totals(
+                obj.user, tree
+            )
+        return children, spending
+
+
+class CategoryNodeSerializer(serializers.ModelSerializer):
+    """Flat representation of a category used for ancestor and descendant lists."""
+
+    class Meta:
+        model = Category
+        fields = ("id", "name", "parent", "path", "depth")
+
+
+class CategorySpendingSerializer(CategoryNodeSerializer):
+    """Category with its own and subtree expense totals taken from the context."""
+
+    total_spending = serializers.SerializerMethodField()
+    subtree_spending = serializers.SerializerMethodField()
+
+    class Meta(CategoryNodeSerializer.Meta):
+        fields = CategoryNodeSerializer.Meta.fields + (
+            "total_spending",
+            "subtree_spending",
         )
 
+    def get_total_spending(self, obj):
+        return self.context["spending"][obj.pk][0]
+
+    def get_subtree_spending(self, obj):
+        return self.context["spending"][obj.pk][1]
+
 
 class TransactionSerializer(serializers.ModelSerializer):
     category_name = serializers.CharField(source="category.name", read_only=True)
     account_name = serializers.CharField(source="account.name", read_only=True)
+    running_balance = serializers.DecimalField(
+        max_digits=14, decimal_places=2, read_only=True
+    )
 
     class Meta:
         model = Transaction
         exclude = ["user"]
         read_only_fields = ["category_name", "account_name"]
 
+    def validate(self, attrs):
+        current = {
+            name: getattr(self.instance, name)
+            for name in ("account", "to_account", "type")
+            if self.instance is not None
+        }
+        merged = {**current, **attrs}
+        if merged.get("type") == "TRANSFER":
+            _check_transfer_currency(merged.get("account"), merged.get("to_account"))
+        return attrs
+
+    def to_representation(self, instance):
+        # Only present when the view computed ``running_balances`` for the page.
+        data = super().to_representation(instance)
+        running = self.context.get("running_balances")
+        if running is not None:
+            data["running_balance"] = self.fields["running_balance"].to_representation(
+                running[instance.pk]
+            )
+        return data
+
+
+class TransactionReadSerializer(serializers.BaseSerializer):
+    """
+    Read-only counterpart of ``TransactionSerializer`` with the same output,
+    for listings and detail views. Rows come from ``select()``, which joins the
+    account and category names and loads only the columns shown, and each row
+    is formatted directly instead of through a field per column.
+    """
+
+    columns = (
+        "id",
+        "account_id",
+        "account__name",
+        "category_id",
+        "category__name",
+        "amount",
+        "date",
+        "description",
+        "type",
+        "created_at",
+        "to_account_id",
+        "recurring_id",
+    )
+    amount = serializers.DecimalField(max_digits=10, decimal_places=2)
+    created_at = serializers.DateTimeField()
+    running_balance = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+    @classmethod
+    def select(cls, queryset):
+        return queryset.select_related("account", "category").only(*cls.columns)
+
+    def to_representation(self, instance):
+        data = {"id": instance.pk}
+        # TransactionSerializer omits the name of a missing category.
+        if instance.category_id is not None:
+            data["category_name"] = instance.category.name
+        data.update(
+            account_name=instance.account.name,
+            amount=self.amount.to_representation(instance.amount),
+            date=instance.date.isoformat(),
+            description=instance.description,
+            type=instance.type,
+            created_at=self.created_at.to_representation(instance.created_at),
+            account=instance.account_id,
+            category=instance.category_id,
+            to_account=instance.to_account_id,
+            recurring=instance.recurring_id,
+        )
+        running = self.context.get("running_balances")
+        if running is not None:
+            data["running_balance"] = self.running_balance.to_representation(
+                running[instance.pk]
+            )
+        return data
+
+
+class TransactionImportRowSerializer(serializers.Serializer):
+    """
+    Validates one row of a bulk import. Accounts and categories are resolved
+    from the ``accounts`` and ``categories`` maps in the context, so a row
+    costs no queries. Rows without a type are classified by the amount's sign.
+    """
+
+    date = serializers.DateField()
+    amount = serializers.DecimalField(max_digits=10, decimal_places=2)
+    type = serializers.ChoiceField(choices=Transaction.TRANSACTION_TYPE, required=False)
+    description = serializers.CharField(required=False, allow_blank=True, default="")
+    account = serializers.IntegerField(required=False)
+    to_account = serializers.IntegerField(required=False)
+    category = serializers.IntegerField(required=False)
+
+    def to_internal_value(self, data):
+        # Blank CSV cells mean "not provided" rather than invalid values.
+        data = {key: value for key, value in data.items() if value not in ("", None)}
+        return super().to_internal_value(data)
+
+    def _resolve(self, mapping, pk, label):
+        try:
+            return self.context[mapping][pk]
+        except KeyError:
+            raise serializers.ValidationError(f"Unknown {label} {pk}.")
+
+    def validate_account(self, value):
+        return self._resolve("accounts", value, "account")
+
+    def validate_to_account(self, value):
+        return self._resolve("accounts", value, "account")
+
+    def validate_category(self, value):
+        return self._resolve("categories", value, "category")
+
+    def validate(self, attrs):
+        attrs.setdefault("account", self.context.get("default_account"))
+        if attrs["account"] is None:
+            raise serializers.ValidationError({"account": "This field is required."})
+
+        if "type" not in attrs:
+            attrs["type"] = "OUT" if attrs["amount"] < 0 else "IN"
+        attrs["amount"] = abs(attrs["amount"])
+
+        if attrs["type"] == "TRANSFER" and not attrs.get("to_account"):
+            raise serializers.ValidationError(
+                {"to_account": "Transfer transactions require a destination account"}
+            )
+        if attrs["type"] == "TRANSFER":
+            _check_transfer_currency(attrs["account"], attrs["to_account"])
+        return attrs
+
+
+class RecurringTransactionSerializer(serializers.ModelSerializer):
+    category_name = serializers.CharField(source="category.name", read_only=True)
+    account_name = serializers.CharField(source="account.name", read_only=True)
+
+    class Meta:
+        model = RecurringTransaction
+        exclude = ["user"]
+        read_only_fields = ["category_name", "account_name", "next_date"]
+
+    def _owned(self, value, label):
+        request = self.context.get("request")
+        if value is not None and request and value.user_id != request.user.pk:
+            raise serializers.ValidationError(f"Unknown {label}.")
+        return value
+
+    def validate_account(self, value):
+        return self._owned(value, "account")
+
+    def validate_to_account(self, value):
+        return self._owned(value, "account")
+
+    def validate_category(self, value):
+        return self._owned(value, "category")
+
+    def validate(self, attrs):
+        merged = {**self._current(), **attrs}
+        if merged.get("type") == "TRANSFER" and not merged.get("to_account"):
+            raise serializers.ValidationError(
+                "Transfer transactions require a destination account"
+            )
+        if merged.get("type") == "TRANSFER":
+            _check_transfer_currency(merged.get("account"), merged["to_account"])
+        end_date = merged.get("end_date")
+        if end_date and end_date < merged["start_date"]:
+            raise serializers.ValidationError("End date must be after start date")
+        return attrs
+
+    def _current(self):
+        if self.instance is None:
+            return {}
+        return {
+            "type": self.instance.type,
+            "account": self.instance.account,
+            "to_account": self.instance.to_account,
+            "start_date": self.instance.start_date,
+            "end_date": self.instance.end_date,
+        }
+
 
 class BudgetSerializer(serializers.ModelSerializer):
     category_name = serializers.CharField(source="category.name", read_only=True)
@@ -85,23 +365,24 @@ class BudgetSerializer(serializers.ModelSerializer):
     class Meta:
         model = Budget
         exclude = ["user"]
-        read_only_fields = ["category_name"]
+        read_only_fields = ["category_name", "spent"]
 
     def get_progress(self, obj):
-        total_spent = (
-            Transaction.objects.filter(
-                category=obj.category,
-                date__range=[obj.start_date, obj.end_date],
-                type="OUT",
-            ).aggregate(total=Sum("amount"))["total"]
-            or 0
-        )
+        return obj.get_progress()
 
-        return {
-            "total_spent": total_spent,
-            "remaining": obj.limit - total_spent,
-            "percentage_used": (total_spent / obj.limit * 100) if obj.limit > 0 else 0,
-        }
+
+class BudgetProgressSerializer(serializers.ModelSerializer):
+    """Progress of one budget, as returned by the batch progress endpoint."""
+
+    category_name = serializers.CharField(source="category.name", read_only=True)
+    progress = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Budget
+        fields = ("id", "category", "category_name", "progress")
+
+    def get_progress(self, obj):
+        return obj.get_progress()
 
 
 class BudgetNotificationSerializer(serializers.ModelSerializer):
@@ -113,26 +394,19 @@ class BudgetNotificationSerializer(serializers.ModelSerializer):
         read_only_fields = ["budget_name"]
 
 
+class TransactionReportTotalsSerializer(serializers.Serializer):
+    total_in = serializers.DecimalField(max_digits=14, decimal_places=2)
+    total_out = serializers.DecimalField(max_digits=14, decimal_places=2)
+    total_transfer = serializers.DecimalField(max_digits=14, decimal_places=2)
+    count = serializers.IntegerField()
+
+
 class TransactionReportSerializer(serializers.Serializer):
-    period = serializers.DictField(child=serializers.DateField())
-    summary = serializers.DictField(
-        child=serializers.DecimalField(max_digits=10, decimal_places=2)
-    )
-    by_category = serializers.ListField(
-        child=serializers.DictField(
-            child=serializers.DecimalField(max_digits=10, decimal_places=2)
-        )
-    )
-    by_account = serializers.ListField(
-        child=serializers.DictField(
-            child=serializers.DecimalField(max_digits=10, decimal_places=2)
-        )
-    )
-    daily_totals = serializers.ListField(
-        child=serializers.DictField(
-            child=serializers.DecimalField(max_digits=10, decimal_places=2)
-        )
-    )
+    period = serializers.DictField(child=serializers.CharField())
+    summary = TransactionReportTotalsSerializer()
+    by_category = serializers.ListField(child=TransactionReportTotalsSerializer())
+    by_account = serializers.ListField(child=TransactionReportTotalsSerializer())
+    period_totals = serializers.ListField(child=TransactionReportTotalsSerializer())
 
     def validate_period(self, value):
         if value["start_date"] > value["end_date"]:
@@ -0,0 +1,129 @@
+"""
+Calendar bucketing of aggregated amounts with NumPy. Rows are mapped to the
+index of their bucket in one vectorized step and summed into dense arrays,
+so buckets without activity come back as zeros rather than missing entries.
+Amounts are summed in whole cents to stay exact.
+"""
+
+from decimal import Decimal
+
+import numpy as np
+
+PERIODS = ("daily", "weekly", "monthly", "quarterly", "yearly")
+
+
+def bucket_origin(period, start):
+    """Start of the calendar bucket containing the date ``start``."""
+    day = np.datetime64(start, "D")
+    if period == "daily":
+        return day
+    if period == "weekly":
+        return day - start.weekday()
+    if period == "yearly":
+        return day.astype("datetime64[Y]")
+    month = day.astype("datetime64[M]")
+    if period == "quarterly":
+        return month - (start.month - 1) % 3
+    return month
+
+
+def bucket_index(period, origin, days):
+    """Index, counted from ``origin``, of the bucket holding each of ``days``."""
+    if period in ("daily", "weekly"):
+        index = (days - origin).astype(np.int64)
+        return index // 7 if period == "weekly" else index
+    if period == "yearly":
+        return (days.astype("datetime64[Y]") - origin).astype(np.int64)
+    months = (days.astype("datetime64[M]") - origin).astype(np.int64)
+    return months // 3 if period == "quarterly" else months
+
+
+def bucket_starts(period, origin, count):
+    """First day of each of the ``count`` buckets from ``origin``."""
+    steps = np.arange(count)
+    if period == "weekly":
+        steps = steps * 7
+    elif period == "quarterly":
+        steps = steps * 3
+    return (origin + steps).astype("datetime64[D]")
+
+
+def to_cents(values):
+    """Amounts (None for no rows) as an int64 array of whole cents."""
+    return np.array([round((value or 0) * 100) for value in values], dtype=np.int64)
+
+
+def bucketed_sums(period, start, end, days, columns):
+    """
+    Sum the int64 arrays of ``columns``, aligned with the ``days`` array, into
+    every ``period`` bucket from ``start`` to ``end``. Returns the bucket start
+    days and ``{name: int64 array}`` with one entry per bucket.
+    """
+    origin = bucket_origin(period, start)
+    count = int(bucket_index(period, origin, np.array([end], "datetime64[D]"))[0]) + 1
+    index = bucket_index(period, origin, np.asarray(days, "datetime64[D]"))
+    inside = (index >= 0) & (index < count)
+    sums = {}
+    for name, values in columns.items():
+        sums[name] = np.zeros(count, dtype=np.int64)
+        np.add.at(sums[name], index[inside], values[inside])
+    return bucket_starts(period, origin, count), sums
+
+
+def to_amounts(cents):
+    """Whole cents as exact decimal strings, the API's format for money."""
+    return [str(Decimal(int(value)).scaleb(-2)) for value in cents]
+
+
+def compact(starts, cents):
+    """
+    Columnar series: ISO start days under ``buckets`` and one list of amounts
+    per column, in the same order.
+    """
+    return {
+        "buckets": np.datetime_as_string(starts, unit="D").tolist(),
+        **{name: to_amounts(values) for name, values in cents.items()},
+    }
+
+
+def daily_matrix(start, end, rows, count, days, cents):
+    """
+    Dense ``count`` x days int64 matrix of the ``cents`` booked on ``days``
+    to row ``rows``, with one column per day from ``start`` to ``end``.
+    """
+    origin = np.datetime64(start, "D")
+    width = int((np.datetime64(end, "D") - origin).astype(np.int64)) + 1
+    matrix = np.zeros((count, width), dtype=np.int64)
+    columns = (np.asarray(days, "datetime64[D]") - origin).astype(np.int64)
+    np.add.at(matrix, (np.asarray(rows, np.int64), columns), cents)
+    return matrix
+
+
+def moving_averages(matrix, window, last):
+    """Trailing ``window``-day averages of the last ``last`` columns of each row."""
+    totals = np.cumsum(matrix, axis=1)
+    totals = np.concatenate([np.zeros((len(matrix), 1), np.int64), totals], axis=1)
+    end = np.arange(matrix.shape[1] - last + 1, matrix.shape[1] + 1)
+    return (totals[:, end] - totals[:, end - window]) / window
+
+
+def linear_trends(matrix):
+    """
+    Least-squares line through each row against its column index, fitted for
+    every row at once. Returns the intercepts and slopes.
+    """
+    x = np.arange(matrix.shape[1], dtype=np.float64)
+    centred = x - x.mean()
+    slopes = matrix @ centred / (centred @ centred)
+    return matrix.mean(axis=1) - slopes * x.mean(), slopes
+
+
+def projected_totals(intercepts, slopes, first, horizon):
+    """
+    Running totals of the trend lines from column ``first``: column ``d`` of
+    the result holds the total over the next ``d`` columns, for ``d`` up to
+    ``horizon``. A line below zero adds nothing rather than refunding spend.
+    """
+    x = first + np.arange(horizon, dtype=np.float64)
+    daily = np.clip(intercepts[:, None] + np.outer(slopes, x), 0, None)
+    return np.concatenate([np.zeros((len(daily), 1)), np.cumsum(daily, axis=1)], axis=1)
@@ -0,0 +1,38 @@
+from django.contrib.auth.models import User
+from django.db import connections
+from django.db.models.signals import post_delete, post_migrate, post_save
+from django.dispatch import receiver
+
+from .authentication import user_cache
+from .models import Account, Budget, Category, DataVersion, RecurringTransaction
+from .search import repair_search_index
+
+
+@receiver(post_save, sender=Account)
+@receiver(post_save, sender=Budget)
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=RecurringTransaction)
+@receiver(post_delete, sender=Account)
+@receiver(post_delete, sender=Budget)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=RecurringTransaction)
+def bump_data_version(sender, instance, origin=None, **kwargs):
+    """Invalidate the owner's cached analytics. Transactions bump via LedgerDelta."""
+    if isinstance(origin, User):
+        # The user and their version row are being deleted together.
+        return
+    DataVersion.bump(instance.user_id)
+
+
+@receiver(post_migrate)
+def restore_search_index(sender, using, **kwargs):
+    """Recreate search triggers dropped when a migration rebuilt the table."""
+    if sender.name == "wallet_app":
+        repair_search_index(connections[using])
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_cached_user(sender, instance, **kwargs):
+    """Make deactivation and password changes take effect on the next request."""
+    user_cache.discard(instance)
@@ -0,0 +1,253 @@
+import calendar
+import math
+import random
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from .ledger import rebuild_budget_spent, rebuild_checkpoints, rebuild_rollups
+from .models import Account, Budget, Category, Transaction
+
+ACCOUNT_NAMES = ["Checking", "Savings", "Credit Card", "Cash", "Brokerage"]
+
+# (parent, children, typical expense, share of daily spending)
+CATEGORY_TREE = [
+    ("Housing", ["Utilities", "Maintenance"], 80, 0.08),
+    ("Food", ["Groceries", "Dining", "Coffee"], 25, 0.45),
+    ("Transport", ["Fuel", "Transit"], 30, 0.17),
+    ("Leisure", ["Travel", "Subscriptions", "Gifts"], 60, 0.15),
+    ("Health", ["Pharmacy", "Fitness"], 40, 0.10),
+    ("Shopping", ["Clothing", "Electronics"], 70, 0.05),
+]
+INCOME_CATEGORIES = ["Salary", "Interest"]
+
+
+def seasonality(day):
+    """Spending multiplier: December peaks, late summer dips, weekends run hot."""
+    month = 1 + 0.25 * math.cos(2 * math.pi * (day.month - 12) / 12)
+    weekend = 1.4 if day.weekday() >= 5 else 0.85
+    return month * weekend
+
+
+class LedgerGenerator:
+    """
+    Generates realistic synthetic ledgers for benchmarking: users with several
+    accounts, a two-level category tree, monthly budgets and a transaction
+    history with salary, rent, transfers and seasonal day-to-day spending.
+    Every table is written with ``bulk_create``; balances, rollups and budget
+    counters are derived afterwards in a handful of set-based statements.
+    """
+
+    def __init__(
+        self,
+        users=10,
+        accounts=3,
+        transactions=10000,
+        days=730,
+        end_date=None,
+        prefix="bench",
+        seed=0,
+        batch_size=5000,
+    ):
+        self.users = users
+        self.accounts = max(1, min(accounts, len(ACCOUNT_NAMES)))
+        self.transactions = transactions
+        self.days = days
+        self.end_date = end_date or date.today()
+        self.start_date = self.end_date - timedelta(days=days - 1)
+        self.prefix = prefix
+        self.batch_size = batch_size
+        self.random = random.Random(seed)
+
+    def run(self):
+        """Create the ledgers and return ``{model_name: rows_created}``."""
+        created = defaultdict(int)
+        with transaction.atomic():
+            users = self.create_users()
+            created["users"] = len(users)
+            for user in users:
+                accounts = self.create_accounts(user)
+                categories = self.create_categories(user)
+                created["accounts"] += len(accounts)
+                created["categories"] += len(categories)
+                created["budgets"] += self.create_budgets(user, categories)
+                created["transactions"] += self.create_transactions(
+                    user, accounts, categories
+                )
+            rebuild_rollups(users=users, batch_size=self.batch_size)
+            rebuild_checkpoints(users=users, batch_size=self.batch_size)
+            rebuild_budget_spent(users=users)
+        return dict(created)
+
+    def create_users(self):
+        password = make_password(self.prefix)
+        return User.objects.bulk_create(
+            User(username=f"{self.prefix}{index}", password=password)
+            for index in range(self.users)
+        )
+
+    def create_accounts(self, user):
+        accounts = []
+        for name in ACCOUNT_NAMES[: self.accounts]:
+            opening = Decimal(self.random.randint(500, 5000))
+            accounts.append(
+                Account(user=user, name=name, balance=opening, opening_balance=opening)
+            )
+        return Account.objects.bulk_create(accounts)
+
+    def create_categories(self, user):
+        """Return ``{name: category}`` for the whole tree, paths filled in."""
+        roots = Category.objects.bulk_create(
+            Category(user=user, name=name) for name, *_ in CATEGORY_TREE + [("Income",)]
+        )
+        by_name = {root.name: root for root in roots}
+        children = [
+            Category(user=user, name=child, parent=by_name[parent])
+            for parent, names, *_ in CATEGORY_TREE
+            for child in names
+        ] + [
+            Category(user=user, name=name, parent=by_name["Income"])
+            for name in INCOME_CATEGORIES
+        ]
+        children = Category.objects.bulk_create(children)
+
+        for category in roots:
+            category.path, category.depth = f"{category.pk}/", 0
+        for category in children:
+            category.path = f"{category.parent.path}{category.pk}/"
+            category.depth = 1
+        Category.objects.bulk_update(roots + children, ["path", "depth"])
+        by_name.update((category.name, category) for category in children)
+        return by_name
+
+    def create_budgets(self, user, categories):
+        """A budget per expense category for each of the last twelve months."""
+        budgets = []
+        month = self.end_date.replace(day=1)
+        for _ in range(12):
+            last_day = calendar.monthrange(month.year, month.month)[1]
+            for parent, names, typical, share in CATEGORY_TREE:
+                for name in names:
+                    expected = self.daily_rate() * share / len(names) * 30 * typical
+                    budgets.append(
+                        Budget(
+                            user=user,
+                            category=categories[name],
+                            limit=Decimal(max(50, round(expected, -1))),
+                            start_date=month,
+                            end_date=month.replace(day=last_day),
+                        )
+                    )
+            month = (month - timedelta(days=1)).replace(day=1)
+        return len(Budget.objects.bulk_create(budgets, batch_size=self.batch_size))
+
+    def daily_rate(self):
+        """Average day-to-day expenses per day, after monthly fixed entries."""
+        fixed = 4 * self.days / 30
+        return max(0.0, (self.transactions - fixed) / self.days)
+
+    def create_transactions(self, user, accounts, categories):
+        balances = defaultdict(Decimal)
+        batch = []
+        created = 0
+        for txn in self.iter_transactions(user, accounts, categories):
+            if txn.type == "IN":
+                balances[txn.account_id] += txn.amount
+            else:
+                balances[txn.account_id] -= txn.amount
+                if txn.to_account_id:
+                    balances[txn.to_account_id] += txn.amount
+            batch.append(txn)
+            if len(batch) >= self.batch_size:
+                created += len(Transaction.objects.bulk_create(batch))
+                batch = []
+            if created + len(batch) >= self.transactions:
+                break
+        if batch:
+            created += len(Transaction.objects.bulk_create(batch))
+
+        for account in accounts:
+            account.balance += balances[account.pk]
+        Account.objects.bulk_update(accounts, ["balance"])
+        return created
+
+    def iter_transactions(self, user, accounts, categories):
+        main = accounts[0]
+        savings = accounts[1] if len(accounts) > 1 else None
+        spending_accounts = [account for account in accounts if account != savings]
+        salary = Decimal(self.random.randint(30, 90) * 100)
+        rent = (salary * Decimal("0.3")).quantize(Decimal("1"))
+        leaves = [
+            (categories[name], typical, share / len(names))
+            for _, names, typical, share in CATEGORY_TREE
+            for name in names
+        ]
+        weights = [share for _, _, share in leaves]
+
+        def entry(day, type_, amount, account, category=None, **kwargs):
+            return Transaction(
+                user=user,
+                account=account,
+                category=category,
+                amount=amount,
+                date=day,
+                type=type_,
+                **kwargs,
+            )
+
+        rate = self.daily_rate()
+        day = self.start_date
+        while day <= self.end_date:
+            if day.day == 1:
+                yield entry(
+                    day,
+                    "IN",
+                    salary,
+                    main,
+                    categories["Salary"],
+                    description="Monthly salary",
+                )
+                yield entry(
+                    day,
+                    "OUT",
+                    rent,
+                    main,
+                    categories["Housing"],
+                    description="Rent",
+                )
+                if savings:
+                    yield entry(
+                        day,
+                        "TRANSFER",
+                        (salary * Decimal("0.1")).quantize(Decimal("1")),
+                        main,
+                        description="Monthly savings",
+                        to_account=savings,
+                    )
+                    yield entry(
+                        day,
+                        "IN",
+                        Decimal(self.random.randint(100, 2000)) / 100,
+                        savings,
+                        categories["Interest"],
+                        description="Interest",
+                    )
+
+            expected = rate * seasonality(day)
+            count = int(expected) + (self.random.random() < expected % 1)
+            for _ in range(count):
+                category, typical, _ = self.random.choices(leaves, weights)[0]
+                amount = typical * self.random.lognormvariate(0, 0.6)
+                yield entry(
+                    day,
+                    "OUT",
+                    Decimal(str(round(max(amount, 1), 2))),
+                    self.random.choice(spending_accounts),
+                    category,
+                    description=f"{category.name} purchase",
+                )
+            day += timedelta(days=1)
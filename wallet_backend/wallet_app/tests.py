@@ -1,3 +1,2347 @@
-from django.test import TestCase
+import csv
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+import numpy as np
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import (
+    OperationalError,
+    close_old_connections,
+    connection,
+    transaction,
+)
+from django.db.models import Q, Sum
+from django.test import AsyncClient, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient, APITestCase
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .analytics import build_forecast, build_report
+from .authentication import user_cache
+from .benchmarks import run_benchmarks
+from .cache import analytics_cache
+from .fx import fx_rates
+from .instrumentation import fingerprint
+from .ledger import LedgerDelta, rebuild_budget_spent, rebuild_checkpoints
+from .models import (
+    Account,
+    BalanceCheckpoint,
+    Budget,
+    BudgetNotification,
+    Category,
+    DailyRollup,
+    FxRate,
+    MonthlyRollup,
+    RecurringTransaction,
+    Transaction,
+)
+from .search import search_transactions
+from .serializers import TransactionReadSerializer, TransactionSerializer
+from .series import linear_trends, projected_totals
+from .synthetic import LedgerGenerator
+
+
+class LedgerTestMixin:
+    """Creates a user with one account and one category to post against."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="alice", password="secret")
+        self.account = Account.objects.create(
+            user=self.user, name="Checking", balance=Decimal("1000.00")
+        )
+        self.category = Category.objects.create(user=self.user, name="Groceries")
+
+    def make_transaction(self, amount, type="OUT", day=date(2025, 1, 15), **kwargs):
+        kwargs.setdefault("category", self.category)
+        kwargs.setdefault("account", self.account)
+        return Transaction.objects.create(
+            user=self.user,
+            amount=Decimal(amount),
+            type=type,
+            date=day,
+            **kwargs,
+        )
+
+
+class RollupTests(LedgerTestMixin, TestCase):
+    def bucket(self, model, period, type="OUT"):
+        return model.objects.get(
+            user=self.user,
+            account=self.account,
+            category=self.category,
+            type=type,
+            period=period,
+        )
+
+    def test_save_updates_daily_and_monthly_buckets(self):
+        self.make_transaction("10.00", day=date(2025, 1, 15))
+        self.make_transaction("5.50", day=date(2025, 1, 20))
+
+        daily = self.bucket(DailyRollup, date(2025, 1, 15))
+        self.assertEqual((daily.total, daily.count), (Decimal("10.00"), 1))
+        monthly = self.bucket(MonthlyRollup, date(2025, 1, 1))
+        self.assertEqual((monthly.total, monthly.count), (Decimal("15.50"), 2))
+
+    def test_edit_moves_amount_between_buckets(self):
+        txn = self.make_transaction("10.00", day=date(2025, 1, 15))
+        txn.amount = Decimal("12.00")
+        txn.date = date(2025, 2, 3)
+        txn.save()
+
+        january = self.bucket(MonthlyRollup, date(2025, 1, 1))
+        self.assertEqual((january.total, january.count), (Decimal("0.00"), 0))
+        february = self.bucket(MonthlyRollup, date(2025, 2, 1))
+        self.assertEqual((february.total, february.count), (Decimal("12.00"), 1))
+
+    def test_delete_reverses_buckets(self):
+        txn = self.make_transaction("10.00")
+        txn.delete()
+
+        daily = self.bucket(DailyRollup, date(2025, 1, 15))
+        self.assertEqual((daily.total, daily.count), (Decimal("0.00"), 0))
+
+    def test_rebuild_command_restores_drifted_rollups(self):
+        self.make_transaction("10.00", day=date(2025, 1, 15))
+        self.make_transaction("20.00", type="IN", day=date(2025, 1, 16))
+        DailyRollup.objects.update(total=Decimal("999.00"))
+        MonthlyRollup.objects.all().delete()
+
+        call_command("rebuild_rollups", stdout=StringIO())
+
+        self.assertEqual(
+            self.bucket(DailyRollup, date(2025, 1, 15)).total, Decimal("10.00")
+        )
+        self.assertEqual(
+            self.bucket(MonthlyRollup, date(2025, 1, 1), type="IN").total,
+            Decimal("20.00"),
+        )
+
+
+class BalanceTests(LedgerTestMixin, TestCase):
+    def balance(self, account=None):
+        account = account or self.account
+        account.refresh_from_db()
+        return account.balance
+
+    def test_create_applies_signed_amount(self):
+        self.make_transaction("100.00", type="IN")
+        self.make_transaction("30.00", type="OUT")
+        self.assertEqual(self.balance(), Decimal("1070.00"))
+
+    def test_edit_applies_only_the_difference(self):
+        txn = self.make_transaction("30.00", type="OUT")
+        txn.amount = Decimal("45.00")
+        txn.save()
+        self.assertEqual(self.balance(), Decimal("955.00"))
+
+        txn.type = "IN"
+        txn.save()
+        self.assertEqual(self.balance(), Decimal("1045.00"))
+
+    def test_delete_reverses_effect(self):
+        txn = self.make_transaction("30.00", type="OUT")
+        txn.delete()
+        self.assertEqual(self.balance(), Decimal("1000.00"))
+
+    def test_transfer_moves_between_accounts(self):
+        savings = Account.objects.create(
+            user=self.user, name="Savings", balance=Decimal("0.00")
+        )
+        txn = self.make_transaction("200.00", type="TRANSFER", to_account=savings)
+        self.assertEqual(self.balance(), Decimal("800.00"))
+        self.assertEqual(self.balance(savings), Decimal("200.00"))
+
+        txn.to_account = None
+        txn.type = "OUT"
+        txn.save()
+        self.assertEqual(self.balance(), Decimal("800.00"))
+        self.assertEqual(self.balance(savings), Decimal("0.00"))
+
+
+class BalanceCheckpointTests(LedgerTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.user)
+        self.savings = Account.objects.create(
+            user=self.user, name="Savings", balance=Decimal("100.00")
+        )
+        self.make_transaction("2000.00", type="IN", day=date(2024, 11, 30))
+        self.make_transaction("45.10", day=date(2024, 12, 5))
+        self.make_transaction(
+            "300.00", type="TRANSFER", day=date(2025, 1, 2), to_account=self.savings
+        )
+        self.make_transaction("12.00", day=date(2025, 1, 2))
+        self.make_transaction("80.00", day=date(2025, 3, 20))
+
+    def replay(self, account):
+        """Opening balance and the balance after each transaction, oldest first."""
+        account.refresh_from_db()
+        rows = sorted(
+            Transaction.objects.filter(Q(account=account) | Q(to_account=account)),
+            key=lambda txn: (txn.date, txn.pk),
+        )
+        effects = [
+            (
+                txn.amount
+                if txn.type == "IN" or txn.to_account_id == account.pk
+                else -txn.amount
+            )
+            for txn in rows
+        ]
+        balance = opening = account.balance - sum(effects)
+        after = []
+        for txn, effect in zip(rows, effects):
+            balance += effect
+            after.append((txn, balance))
+        return opening, after
+
+    def expected_balance(self, account, day):
+        balance, after = self.replay(account)
+        for txn, running in after:
+            if txn.date <= day:
+                balance = running
+        return balance
+
+    def assertBalancesMatchReplay(self):
+        for account in (self.account, self.savings):
+            account.refresh_from_db()
+            for day in (
+                date(2024, 11, 1),
+                date(2024, 11, 30),
+                date(2024, 12, 31),
+                date(2025, 1, 1),
+                date(2025, 1, 2),
+                date(2025, 2, 15),
+                date(2025, 3, 31),
+            ):
+                self.assertEqual(
+                    account.balance_as_of(day),
+                    self.expected_balance(account, day),
+                    (account.name, day),
+                )
+
+    def assertCheckpointsMatchRebuild(self):
+        # Maintained checkpoints may keep a row for a month that lost all of its
+        # activity; it repeats the previous total, so compare the totals in
+        # effect at every month boundary rather than the rows themselves.
+        def rows():
+            return list(
+                BalanceCheckpoint.objects.order_by("-period").values_list(
+                    "account", "period", "net_change"
+                )
+            )
+
+        def in_effect(rows, account, month):
+            return next(
+                (
+                    net
+                    for other, period, net in rows
+                    if other == account and period <= month
+                ),
+                0,
+            )
+
+        maintained = rows()
+        rebuild_checkpoints()
+        rebuilt = rows()
+        for account in (self.account.pk, self.savings.pk):
+            for _, month, _ in maintained + rebuilt:
+                self.assertEqual(
+                    in_effect(maintained, account, month),
+                    in_effect(rebuilt, account, month),
+                    (account, month),
+                )
+
+    def test_checkpoints_follow_posts_edits_and_deletes(self):
+        self.assertBalancesMatchReplay()
+        self.assertCheckpointsMatchRebuild()
+
+        # Re-date an expense across months and backdate a new income.
+        txn = Transaction.objects.get(amount=Decimal("45.10"))
+        txn.date = date(2025, 2, 1)
+        txn.save()
+        self.make_transaction("7.00", type="IN", day=date(2024, 10, 1))
+        Transaction.objects.get(amount=Decimal("12.00")).delete()
+
+        self.assertBalancesMatchReplay()
+        self.assertCheckpointsMatchRebuild()
+
+    def test_balance_endpoint_reads_a_bounded_range(self):
+        url = f"/api/accounts/{self.account.pk}/balance/"
+        with self.assertNumQueries(5):
+            response = self.client.get(url, {"as_of": "2025-01-15"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            Decimal(response.data["balance"]),
+            self.expected_balance(self.account, date(2025, 1, 15)),
+        )
+        self.assertEqual(response.data["as_of"], "2025-01-15")
+
+        response = self.client.get(url)
+        self.account.refresh_from_db()
+        self.assertEqual(Decimal(response.data["balance"]), self.account.balance)
+        self.assertEqual(self.client.get(url, {"as_of": "2025-02-30"}).status_code, 400)
+
+    def test_running_balance_on_account_listing(self):
+        url = f"/api/accounts/{self.account.pk}/transactions/"
+        response = self.client.get(url, {"running_balance": "true", "page_size": 2})
+        self.assertNotIn("running_balance", self.client.get(url).data["results"][0])
+
+        _, after = self.replay(self.account)
+        expected = {txn.pk: balance for txn, balance in after}
+        results = response.data["results"]
+        while True:
+            for row in results:
+                self.assertEqual(Decimal(row["running_balance"]), expected[row["id"]])
+            if not response.data["next"]:
+                break
+            response = self.client.get(response.data["next"])
+            results = response.data["results"]
+
+
+class ReconciliationTests(LedgerTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.savings = Account.objects.create(
+            user=self.user, name="Savings", balance=Decimal("50.00")
+        )
+        self.make_transaction("200.00", type="IN")
+        self.make_transaction("30.00")
+        self.make_transaction("70.00", type="TRANSFER", to_account=self.savings)
+        self.other = User.objects.create_user(username="bob", password="secret")
+        self.wallet = Account.objects.create(
+            user=self.other, name="Wallet", balance=Decimal("10.00")
+        )
+
+    def reconcile(self, *args, **options):
+        out = StringIO()
+        call_command("reconcile_balances", *args, stdout=out, **options)
+        return out.getvalue()
+
+    def test_consistent_ledger_has_no_drift(self):
+        self.assertIn(
+            "Reconciled 2 users in 1 batches: 0 discrepancies", self.reconcile()
+        )
+
+    def test_direct_balance_edits_are_not_drift(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.patch(
+            f"/api/accounts/{self.account.pk}/", {"balance": "5000.00"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.make_transaction("1.00")
+        self.assertIn("0 discrepancies", self.reconcile())
+
+    def test_saving_a_stale_account_keeps_its_balance(self):
+        stale = Account.objects.get(pk=self.savings.pk)
+        self.make_transaction("5.00", type="TRANSFER", to_account=self.savings)
+        stale.name = "Rainy day"
+        stale.save()
+
+        self.savings.refresh_from_db()
+        self.assertEqual(self.savings.name, "Rainy day")
+        self.assertEqual(self.savings.balance, Decimal("125.00"))
+        self.assertEqual(self.savings.opening_balance, Decimal("50.00"))
+        self.assertIn("0 discrepancies", self.reconcile())
+
+    def test_deleting_an_account_reverses_its_transactions(self):
+        self.make_transaction(
+            "30.00", type="TRANSFER", account=self.savings, to_account=self.account
+        )
+        self.client.force_authenticate(self.user)
+        response = self.client.delete(f"/api/accounts/{self.savings.pk}/")
+        self.assertEqual(response.status_code, 204)
+
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal("1100.00"))
+        self.assertIn("0 discrepancies", self.reconcile())
+        checkpoints = list(
+            BalanceCheckpoint.objects.order_by("account", "period").values_list(
+                "account", "period", "net_change"
+            )
+        )
+        rebuild_checkpoints()
+        self.assertEqual(
+            checkpoints,
+            list(
+                BalanceCheckpoint.objects.order_by("account", "period").values_list(
+                    "account", "period", "net_change"
+                )
+            ),
+        )
+
+    def test_reports_and_fixes_drift(self):
+        Account.objects.filter(pk=self.savings.pk).update(balance=Decimal("999.00"))
+        Account.objects.filter(pk=self.wallet.pk).update(balance=Decimal("0.00"))
+
+        output = self.reconcile(batch_size=1, workers=2)
+        self.assertIn(
+            f"account {self.savings.pk} (Savings, user {self.user.pk}): "
+            "stored 999.00, expected 120.00, drift +879.00",
+            output,
+        )
+        self.assertIn("drift -10.00", output)
+        self.assertIn("Reconciled 2 users in 2 batches: 2 discrepancies found", output)
+        self.savings.refresh_from_db()
+        self.assertEqual(self.savings.balance, Decimal("999.00"))
+
+        output = self.reconcile(fix=True, user=["alice"])
+        self.assertIn("1 discrepancies fixed", output)
+        self.savings.refresh_from_db()
+        self.assertEqual(self.savings.balance, Decimal("120.00"))
+        self.assertIn("1 discrepancies found", self.reconcile())
+
+
+class RecurringTests(LedgerTestMixin, APITestCase):
+    def make_rule(self, amount="100.00", **kwargs):
+        kwargs.setdefault("type", "OUT")
+        kwargs.setdefault("category", self.category)
+        kwargs.setdefault("start_date", date(2025, 1, 31))
+        return RecurringTransaction.objects.create(
+            user=self.user, account=self.account, amount=Decimal(amount), **kwargs
+        )
+
+    def materialize(self, day):
+        out = StringIO()
+        call_command("materialize_recurring", date=day.isoformat(), stdout=out)
+        return out.getvalue()
+
+    def posted_dates(self, rule):
+        return list(
+            Transaction.objects.filter(recurring=rule)
+            .order_by("date")
+            .values_list("date", flat=True)
+        )
+
+    def test_monthly_rule_catches_up_and_clamps_to_month_end(self):
+        rule = self.make_rule()
+        self.assertEqual(rule.next_date, date(2025, 1, 31))
+
+        output = self.materialize(date(2025, 4, 30))
+        self.assertIn("Materialized 4 transactions from 1 rules.", output)
+        self.assertEqual(
+            self.posted_dates(rule),
+            [
+                date(2025, 1, 31),
+                date(2025, 2, 28),
+                date(2025, 3, 31),
+                date(2025, 4, 30),
+            ],
+        )
+        rule.refresh_from_db()
+        self.assertEqual(rule.next_date, date(2025, 5, 31))
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal("600.00"))
+        self.assertEqual(
+            self.account.balance_as_of(date(2025, 2, 28)), Decimal("800.00")
+        )
+
+        self.assertIn(
+            "Materialized 0 transactions from 0 rules.",
+            self.materialize(date(2025, 4, 30)),
+        )
+
+    def test_rerun_after_reschedule_skips_posted_occurrences(self):
+        rule = self.make_rule()
+        self.materialize(date(2025, 2, 28))
+        RecurringTransaction.objects.filter(pk=rule.pk).update(
+            next_date=date(2025, 1, 31)
+        )
+
+        self.assertIn(
+            "Materialized 1 transactions", self.materialize(date(2025, 3, 31))
+        )
+        self.assertEqual(len(self.posted_dates(rule)), 3)
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal("700.00"))
+
+    def test_weekly_rule_stops_at_end_date(self):
+        rule = self.make_rule(
+            "10.00",
+            interval="weekly",
+            every=2,
+            start_date=date(2025, 1, 1),
+            end_date=date(2025, 2, 1),
+        )
+        self.materialize(date(2025, 6, 1))
+        self.assertEqual(
+            self.posted_dates(rule),
+            [date(2025, 1, 1), date(2025, 1, 15), date(2025, 1, 29)],
+        )
+        rule.refresh_from_db()
+        self.assertIsNone(rule.next_date)
+
+    def test_transfer_rule_and_budget_spending(self):
+        savings = Account.objects.create(
+            user=self.user, name="Savings", balance=Decimal("0.00")
+        )
+        budget = Budget.objects.create(
+            user=self.user,
+            category=self.category,
+            limit=Decimal("100.00"),
+            start_date=date(2025, 1, 1),
+            end_date=date(2025, 12, 31),
+        )
+        self.make_rule("25.00", type="TRANSFER", to_account=savings, category=None)
+        self.make_rule("40.00", start_date=date(2025, 1, 10))
+
+        self.materialize(date(2025, 3, 31))
+        self.account.refresh_from_db()
+        savings.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal("805.00"))
+        self.assertEqual(savings.balance, Decimal("75.00"))
+        budget.refresh_from_db()
+        self.assertEqual(budget.spent, Decimal("120.00"))
+        self.assertTrue(BudgetNotification.objects.filter(budget=budget).exists())
+
+    def test_catch_up_checks_every_budget_it_spends_against(self):
+        january, february, march = (
+            Budget.objects.create(
+                user=self.user,
+                category=self.category,
+                limit=Decimal(limit),
+                start_date=start,
+                end_date=end,
+            )
+            for limit, start, end in (
+                ("50.00", date(2025, 1, 1), date(2025, 1, 31)),
+                ("500.00", date(2025, 2, 1), date(2025, 2, 28)),
+                ("50.00", date(2025, 3, 1), date(2025, 3, 31)),
+            )
+        )
+        self.make_rule(end_date=date(2025, 2, 28))
+        self.materialize(date(2025, 2, 28))
+        self.assertEqual(
+            list(BudgetNotification.objects.values_list("budget", flat=True)),
+            [january.pk],
+        )
+
+        # Foreign-currency expenses don't count towards budgets or check them.
+        self.make_transaction("60.00", day=date(2025, 3, 5))
+        BudgetNotification.objects.all().delete()
+        euros = Account.objects.create(
+            user=self.user, name="Euros", balance=0, currency="EUR"
+        )
+        RecurringTransaction.objects.create(
+            user=self.user,
+            account=euros,
+            category=self.category,
+            amount=Decimal("10.00"),
+            type="OUT",
+            start_date=date(2025, 3, 10),
+        )
+        self.materialize(date(2025, 3, 10))
+        march.refresh_from_db()
+        self.assertEqual(march.spent, Decimal("60.00"))
+        self.assertFalse(BudgetNotification.objects.exists())
+
+    def test_api_is_scoped_to_user(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.post(
+            "/api/recurring/",
+            {
+                "account": self.account.pk,
+                "amount": "12.50",
+                "type": "OUT",
+                "interval": "monthly",
+                "start_date": "2025-03-15",
+            },
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["next_date"], "2025-03-15")
+
+        response = self.client.post(
+            "/api/recurring/",
+            {
+                "account": self.account.pk,
+                "amount": "12.50",
+                "type": "TRANSFER",
+                "start_date": "2025-03-15",
+            },
+        )
+        self.assertEqual(response.status_code, 400)
+
+        other = User.objects.create_user(username="bob", password="secret")
+        self.client.force_authenticate(other)
+        self.assertEqual(self.client.get("/api/recurring/").data, [])
+
+    def test_rules_only_use_the_users_accounts_and_categories(self):
+        other = User.objects.create_user(username="bob", password="secret")
+        theirs = Account.objects.create(user=other, name="Theirs", balance=0)
+        their_category = Category.objects.create(user=other, name="Theirs")
+        self.client.force_authenticate(self.user)
+        rule = {
+            "account": self.account.pk,
+            "amount": "12.50",
+            "type": "OUT",
+            "start_date": "2025-03-15",
+        }
+        for field, value in (
+            ("account", theirs.pk),
+            ("category", their_category.pk),
+            ("to_account", theirs.pk),
+        ):
+            response = self.client.post(
+                "/api/recurring/", {**rule, field: value, "type": "TRANSFER"}
+            )
+            self.assertEqual(response.status_code, 400, field)
+            self.assertIn(field, response.data)
+        self.assertFalse(RecurringTransaction.objects.exists())
+
+    def test_rule_changes_invalidate_the_listing_etag(self):
+        self.client.force_authenticate(self.user)
+        listed = self.client.get("/api/recurring/")
+        etag = listed["ETag"]
+        self.assertEqual(
+            self.client.get("/api/recurring/", HTTP_IF_NONE_MATCH=etag).status_code,
+            304,
+        )
+
+        rule = self.make_rule()
+        response = self.client.get("/api/recurring/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 1)
+
+        etag = response["ETag"]
+        rule.delete()
+        response = self.client.get("/api/recurring/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+
+class AuthenticationTests(LedgerTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        user_cache.clear()
+        self.authorize()
+
+    def authorize(self):
+        token = AccessToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def count_queries(self):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get("/api/budgets/")
+        return response.status_code, len(captured)
+
+    def test_cached_user_saves_a_query(self):
+        status, cold = self.count_queries()
+        self.assertEqual(status, 200)
+        self.assertEqual(self.count_queries(), (200, cold - 1))
+
+    @override_settings(AUTH_USER_CACHE_TTL=0)
+    def test_cache_can_be_disabled(self):
+        _, cold = self.count_queries()
+        self.assertEqual(self.count_queries(), (200, cold))
+
+    def test_deactivation_applies_to_the_next_request(self):
+        self.assertEqual(self.count_queries()[0], 200)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.count_queries()[0], 401)
+
+    def test_password_change_revokes_cached_tokens(self):
+        # simplejwt reads its settings once, so patch them rather than override.
+        with mock.patch.object(jwt_settings, "CHECK_REVOKE_TOKEN", True):
+            self.authorize()
+            self.count_queries()
+            self.assertEqual(self.count_queries()[0], 200)
+            self.user.set_password("changed")
+            self.user.save()
+            self.assertEqual(self.count_queries()[0], 401)
+
+    def test_changes_reach_entries_cached_by_other_processes(self):
+        self.assertEqual(self.count_queries()[0], 200)
+        # Another worker sharing the version cache still holds this entry.
+        other_process = dict(user_cache._users)
+        self.user.is_active = False
+        self.user.save()
+        user_cache._users.update(other_process)
+        self.assertEqual(self.count_queries()[0], 401)
+
+    def test_cached_user_is_not_shared_between_requests(self):
+        self.count_queries()
+        first = user_cache.get(self.user.pk)
+        first.first_name = "Mallory"
+        self.assertEqual(user_cache.get(self.user.pk).first_name, "")
+
+
+class BudgetCounterTests(LedgerTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.budget = Budget.objects.create(
+            user=self.user,
+            category=self.category,
+            limit=Decimal("100.00"),
+            start_date=date(2025, 1, 1),
+            end_date=date(2025, 1, 31),
+        )
+
+    def spent(self):
+        self.budget.refresh_from_db()
+        return self.budget.spent
+
+    def test_counter_tracks_create_edit_and_delete(self):
+        txn = self.make_transaction("30.00", day=date(2025, 1, 10))
+        self.assertEqual(self.spent(), Decimal("30.00"))
+
+        txn.amount = Decimal("45.00")
+        txn.save()
+        self.assertEqual(self.spent(), Decimal("45.00"))
+
+        txn.date = date(2025, 2, 10)
+        txn.save()
+        self.assertEqual(self.spent(), Decimal("0.00"))
+
+        txn.date = date(2025, 1, 10)
+        txn.save()
+        txn.delete()
+        self.assertEqual(self.spent(), Decimal("0.00"))
+
+    def test_counter_ignores_income_and_other_users(self):
+        other = User.objects.create_user(username="bob", password="secret")
+        other_account = Account.objects.create(user=other, name="Bob", balance=0)
+        Transaction.objects.create(
+            user=other,
+            account=other_account,
+            category=self.category,
+            amount=Decimal("70.00"),
+            type="OUT",
+            date=date(2025, 1, 10),
+        )
+        self.make_transaction("20.00", type="IN", day=date(2025, 1, 10))
+        self.assertEqual(self.spent(), Decimal("0.00"))
+
+    def test_deleting_an_account_removes_its_spending(self):
+        cash = Account.objects.create(user=self.user, name="Cash", balance=0)
+        self.make_transaction("17.00", day=date(2025, 1, 10), account=cash)
+        self.make_transaction("5.00", day=date(2025, 1, 12))
+        self.assertEqual(self.spent(), Decimal("22.00"))
+
+        cash.delete()
+        self.assertEqual(self.spent(), Decimal("5.00"))
+
+    def test_batch_spending_counts_against_each_budget_once(self):
+        dining = Category.objects.create(user=self.user, name="Dining")
+        february = Budget.objects.create(
+            user=self.user,
+            category=self.category,
+            limit=Decimal("100.00"),
+            start_date=date(2025, 2, 1),
+            end_date=date(2025, 2, 28),
+        )
+        quarter = Budget.objects.create(
+            user=self.user,
+            category=dining,
+            limit=Decimal("100.00"),
+            start_date=date(2025, 1, 1),
+            end_date=date(2025, 3, 31),
+        )
+        delta = LedgerDelta()
+        for amount, category, day in (
+            ("10.00", self.category, date(2024, 12, 31)),
+            ("20.00", self.category, date(2025, 1, 31)),
+            ("30.00", self.category, date(2025, 2, 1)),
+            ("40.00", dining, date(2025, 2, 14)),
+            ("50.00", dining, date(2025, 4, 1)),
+        ):
+            delta.post(
+                Transaction(
+                    user=self.user,
+                    account=self.account,
+                    category=category,
+                    amount=Decimal(amount),
+                    type="OUT",
+                    date=day,
+                )
+            )
+        with transaction.atomic():
+            delta.apply()
+
+        self.assertEqual(self.spent(), Decimal("20.00"))
+        february.refresh_from_db()
+        self.assertEqual(february.spent, Decimal("30.00"))
+        quarter.refresh_from_db()
+        self.assertEqual(quarter.spent, Decimal("40.00"))
+
+    def test_new_budget_counts_existing_spending(self):
+        self.make_transaction("15.00", day=date(2025, 3, 5))
+        march = Budget.objects.create(
+            user=self.user,
+            category=self.category,
+            limit=Decimal("50.00"),
+            start_date=date(2025, 3, 1),
+            end_date=date(2025, 3, 31),
+        )
+        self.assertEqual(march.spent, Decimal("15.00"))
+
+    def test_exceeding_the_limit_notifies(self):
+        self.make_transaction("60.00", day=date(2025, 1, 10))
+        self.assertFalse(BudgetNotification.objects.exists())
+        self.make_transaction("60.00", day=date(2025, 1, 11))
+        self.assertEqual(BudgetNotification.objects.count(), 1)
+
+    def test_rebuild_command_fixes_drift(self):
+        self.make_transaction("30.00", day=date(2025, 1, 10))
+        Budget.objects.update(spent=Decimal("999.00"))
+
+        call_command("rebuild_budgets", stdout=StringIO())
+
+        self.assertEqual(self.spent(), Decimal("30.00"))
+
+
+class BudgetProgressTests(LedgerTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.user)
+
+    def add_budget(self, month):
+        category = Category.objects.create(user=self.user, name=f"Month {month}")
+        self.make_transaction("25.00", category=category, day=date(2025, month, 10))
+        return Budget.objects.create(
+            user=self.user,
+            category=category,
+            limit=Decimal("100.00"),
+            start_date=date(2025, month, 1),
+            end_date=date(2025, month, 28),
+        )
+
+    def test_list_and_batch_query_counts_are_constant(self):
+        self.add_budget(1)
+        with CaptureQueriesContext(connection) as one_list:
+            self.client.get("/api/budgets/")
+        with CaptureQueriesContext(connection) as one_batch:
+            self.client.get("/api/budgets/progress/")
+
+        for month in range(2, 7):
+            self.add_budget(month)
+        with CaptureQueriesContext(connection) as many_list:
+            response = self.client.get("/api/budgets/")
+        with CaptureQueriesContext(connection) as many_batch:
+            batch = self.client.get("/api/budgets/progress/")
+
+        self.assertEqual(len(one_list), len(many_list))
+        self.assertEqual(len(one_batch), len(many_batch))
+        self.assertEqual(len(response.data), 6)
+        self.assertEqual(response.data[0]["progress"]["total_spent"], Decimal("25.00"))
+        self.assertEqual(
+            [row["progress"]["percentage_used"] for row in batch.data],
+            [Decimal("25.00")] * 6,
+        )
+
+    def test_detail_progress(self):
+        budget = self.add_budget(1)
+        response = self.client.get(f"/api/budgets/{budget.pk}/progress/")
+        self.assertEqual(response.data["remaining"], Decimal("75.00"))
+
+
+class ConcurrentBalanceTests(LedgerTestMixin, TransactionTestCase):
+    """Stress test: parallel writers against the same pair of accounts."""
+
+    writes_per_worker = 25
+
+    def setUp(self):
+        super().setUp()
+        self.savings = Account.objects.create(
+            user=self.user, name="Savings", balance=Decimal("1000.00")
+        )
+
+    def write(self, worker):
+        close_old_connections()
+        try:
+            for i in range(self.writes_per_worker):
+                # Alternate transfer direction so the lock ordering is exercised.
+                source, target = (
+                    (self.account, self.savings)
+                    if (worker + i) % 2
+                    else (self.savings, self.account)
+                )
+                while True:
+                    try:
+                        with transaction.atomic():
+                            Transaction.objects.create(
+                                user=self.user,
+                                account=source,
+                                to_account=target,
+                                amount=Decimal("1.00"),
+                                type="TRANSFER",
+                                date=date(2025, 1, 15),
+                            )
+                            Transaction.objects.create(
+                                user=self.user,
+                                account=source,
+                                amount=Decimal("2.00"),
+                                type="IN",
+                                date=date(2025, 1, 15),
+                            )
+                        break
+                    except OperationalError:
+                        # SQLite serializes writers; retry when the file is busy.
+                        time.sleep(0.01)
+        finally:
+            connection.close()
+
+    def run_workers(self, workers):
+        threads = [
+            threading.Thread(target=self.write, args=(n,)) for n in range(workers)
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        return workers * self.writes_per_worker * 2 / elapsed
+
+    def test_parallel_writers_do_not_lose_updates(self):
+        workers = 4
+        self.run_workers(workers)
+
+        self.account.refresh_from_db()
+        self.savings.refresh_from_db()
+        income = Decimal("2.00") * workers * self.writes_per_worker
+        self.assertEqual(
+            self.account.balance + self.savings.balance, Decimal("2000.00") + income
+        )
+        self.assertEqual(
+            Transaction.objects.count(), workers * self.writes_per_worker * 2
+        )
+
+    def test_throughput_scales_with_writers(self):
+        if connection.vendor == "sqlite":
+            self.skipTest("SQLite allows a single writer at a time")
+        single = self.run_workers(1)
+        parallel = self.run_workers(4)
+        self.assertGreater(parallel, single)
+
+
+class CategoryTreeTests(LedgerTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.user)
+        self.food = Category.objects.create(user=self.user, name="Food")
+        self.dining = Category.objects.create(
+            user=self.user, name="Dining", parent=self.food
+        )
+        self.coffee = Category.objects.create(
+            user=self.user, name="Coffee", parent=self.dining
+        )
+
+    def test_paths_follow_parents(self):
+        self.assertEqual(self.food.path, f"{self.food.pk}/")
+        self.coffee.refresh_from_db()
+        self.assertEqual(
+            self.coffee.path, f"{self.food.pk}/{self.dining.pk}/{self.coffee.pk}/"
+        )
+        self.assertEqual(self.coffee.depth, 2)
+
+    def test_moving_a_category_moves_its_subtree(self):
+        self.dining.parent = self.category
+        self.dining.save()
+
+        self.coffee.refresh_from_db()
+        self.assertEqual(
+            self.coffee.path,
+            f"{self.category.pk}/{self.dining.pk}/{self.coffee.pk}/",
+        )
+        self.assertEqual(
+            self.coffee.get_ancestor_ids(), [self.category.pk, self.dining.pk]
+        )
+
+    def test_cannot_move_below_own_descendant(self):
+        self.food.parent = self.coffee
+        with self.assertRaises(ValidationError):
+            self.food.save()
+        response = self.client.patch(
+            f"/api/categories/{self.food.pk}/", {"parent": self.coffee.pk}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_subcategories_are_nested_from_one_query(self):
+        # Data version for the ETag, the category, then its subtree.
+        with self.assertNumQueries(3):
+            response = self.client.get(f"/api/categories/{self.food.pk}/descendants/")
+        self.assertEqual([node["name"] for node in response.data], ["Dining", "Coffee"])
+
+        response = self.client.get(f"/api/categories/{self.food.pk}/subcategories/")
+        self.assertEqual(response.data[0]["name"], "Dining")
+        self.assertEqual(response.data[0]["subcategories"][0]["name"], "Coffee")
+
+    def test_spending_rolls_up_the_tree(self):
+        self.make_transaction("4.00", category=self.coffee, day=date(2025, 1, 2))
+        self.make_transaction("20.00", category=self.dining, day=date(2025, 1, 3))
+        self.make_transaction("50.00", category=self.food, day=date(2025, 2, 1))
+
+        response = self.client.get("/api/categories/spending/")
+        totals = {
+            row["name"]: (row["total_spending"], row["subtree_spending"])
+            for row in response.data
+        }
+        self.assertEqual(totals["Food"], (Decimal("50.00"), Decimal("74.00")))
+        self.assertEqual(totals["Dining"], (Decimal("20.00"), Decimal("24.00")))
+
+        response = self.client.get(
+            "/api/categories/spending/", {"end_date": "2025-01-31"}
+        )
+        totals = {row["name"]: row["subtree_spending"] for row in response.data}
+        self.assertEqual(totals["Food"], Decimal("24.00"))
+
+    def test_list_query_count_does_not_depend_on_tree_size(self):
+        with CaptureQueriesContext(connection) as small:
+            self.client.get("/api/categories/")
+        parent = self.coffee
+        for i in range(5):
+            parent = Category.objects.create(
+                user=self.user, name=f"Level {i}", parent=parent
+            )
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get("/api/categories/")
+
+        self.assertEqual(len(small), len(large))
+        food = next(row for row in response.data if row["name"] == "Food")
+        self.assertEqual(food["subcategories"][0]["subcategories"][0]["name"], "Coffee")
+
+    def test_detail_query_count_does_not_depend_on_tree_size(self):
+        self.make_transaction("4.00", category=self.coffee, day=date(2025, 1, 2))
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(f"/api/categories/{self.food.pk}/")
+        parent = self.coffee
+        for i in range(5):
+            parent = Category.objects.create(
+                user=self.user, name=f"Level {i}", parent=parent
+            )
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get(
+                f"/api/categories/{self.food.pk}/", {"end_date": "2025-01-31"}
+            )
+
+        self.assertEqual(len(small), len(large))
+        self.assertEqual(response.data["subtree_spending"], Decimal("4.00"))
+        dining = response.data["subcategories"][0]
+        self.assertEqual(dining["subcategories"][0]["name"], "Coffee")
+        self.assertEqual(dining["subtree_spending"], Decimal("4.00"))
+
+    def test_write_responses_load_the_subtree_once(self):
+        self.make_transaction("4.00", category=self.coffee, day=date(2025, 1, 2))
+        with CaptureQueriesContext(connection) as small:
+            self.client.patch(f"/api/categories/{self.food.pk}/", {"description": "a"})
+        parent = self.coffee
+        for i in range(5):
+            parent = Category.objects.create(
+                user=self.user, name=f"Level {i}", parent=parent
+            )
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.patch(
+                f"/api/categories/{self.food.pk}/", {"description": "b"}
+            )
+
+        self.assertEqual(len(small), len(large))
+        self.assertEqual(response.data["subtree_spending"], Decimal("4.00"))
+        dining = response.data["subcategories"][0]
+        self.assertEqual(dining["subcategories"][0]["name"], "Coffee")
+
+    def test_ancestors_root_first(self):
+        response = self.client.get(f"/api/categories/{self.coffee.pk}/ancestors/")
+        self.assertEqual([node["name"] for node in response.data], ["Food", "Dining"])
+
+
+@skipUnless(connection.vendor == "sqlite", "asserts on SQLite query plans")
+class AnalyticsCacheTests(LedgerTestMixin, APITestCase):
+    report_url = "/api/transactions/generate_report/"
+    report_params = {"start_date": "2025-01-01", "end_date": "2025-01-31"}
+
+    def setUp(self):
+        super().setUp()
+        caches["analytics"].clear()
+        analytics_cache.reset_stats()
+        self.client.force_authenticate(self.user)
+
+    def report(self):
+        return self.client.get(self.report_url, self.report_params)
+
+    def test_repeat_requests_hit_until_the_ledger_changes(self):
+        self.make_transaction("10.00")
+        self.assertEqual(self.report()["X-Analytics-Cache"], "MISS")
+
+        response = self.report()
+        self.assertEqual(response["X-Analytics-Cache"], "HIT")
+        self.assertEqual(response.data["summary"]["total_out"], Decimal("10.00"))
+
+        self.make_transaction("5.00")
+        response = self.report()
+        self.assertEqual(response["X-Analytics-Cache"], "MISS")
+        self.assertEqual(response.data["summary"]["total_out"], Decimal("15.00"))
+        self.assertEqual(analytics_cache.stats()["hits"], 1)
+        self.assertEqual(analytics_cache.stats()["misses"], 2)
+
+    def test_budget_account_and_category_writes_invalidate(self):
+        self.report()
+        for write in (
+            lambda: Category.objects.create(user=self.user, name="Rent"),
+            lambda: Account.objects.create(user=self.user, name="Cash", balance=0),
+            lambda: Budget.objects.create(
+                user=self.user,
+                category=self.category,
+                limit=Decimal("10.00"),
+                start_date=date(2025, 1, 1),
+                end_date=date(2025, 1, 31),
+            ),
+        ):
+            write()
+            self.assertEqual(self.report()["X-Analytics-Cache"], "MISS")
+
+    def test_parameters_and_users_are_isolated(self):
+        self.report()
+        response = self.client.get(
+            self.report_url, {**self.report_params, "group_by": "week"}
+        )
+        self.assertEqual(response["X-Analytics-Cache"], "MISS")
+
+        other = User.objects.create_user(username="bob", password="secret")
+        self.client.force_authenticate(other)
+        self.assertEqual(self.report()["X-Analytics-Cache"], "MISS")
+
+    def test_stats_require_staff(self):
+        self.assertEqual(self.client.get("/api/analytics/cache/").status_code, 403)
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get("/api/analytics/cache/")
+        self.assertEqual(set(response.data), {"backend", "hits", "misses", "hit_rate"})
+
+
+class ConditionalGetTests(LedgerTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.user)
+        self.make_transaction("10.00")
+
+    def test_unchanged_data_is_answered_with_304_before_the_view_runs(self):
+        for url in (
+            "/api/accounts/",
+            f"/api/accounts/{self.account.pk}/",
+            "/api/categories/",
+            "/api/transactions/",
+            "/api/budgets/",
+        ):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            etag = response["ETag"]
+
+            # Authentication, the version lookup and nothing else.
+            with self.assertNumQueries(1):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304, url)
+            self.assertEqual(response["ETag"], etag)
+
+    def test_writes_change_the_validator(self):
+        etag = self.client.get("/api/transactions/")["ETag"]
+        self.make_transaction("5.00")
+        response = self.client.get("/api/transactions/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), 2)
+
+    def test_validators_differ_per_url_and_user(self):
+        accounts = self.client.get("/api/accounts/")["ETag"]
+        self.assertNotEqual(accounts, self.client.get("/api/categories/")["ETag"])
+
+        other = User.objects.create_user(username="bob", password="secret")
+        self.client.force_authenticate(other)
+        response = self.client.get("/api/accounts/", HTTP_IF_NONE_MATCH=accounts)
+        self.assertEqual(response.status_code, 200)
+
+    def test_if_modified_since(self):
+        last_modified = self.client.get("/api/budgets/")["Last-Modified"]
+        response = self.client.get(
+            "/api/budgets/", HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_todays_balance_revalidates_the_next_day(self):
+        self.make_transaction("25.00", day=date(2030, 1, 15))
+        url = f"/api/accounts/{self.account.pk}/balance/"
+        with mock.patch(
+            "django.utils.timezone.localdate", return_value=date(2030, 1, 14)
+        ):
+            response = self.client.get(url)
+            validators = {
+                "HTTP_IF_NONE_MATCH": response["ETag"],
+                "HTTP_IF_MODIFIED_SINCE": response["Last-Modified"],
+            }
+            self.assertEqual(self.client.get(url, **validators).status_code, 304)
+
+        with mock.patch(
+            "django.utils.timezone.localdate", return_value=date(2030, 1, 15)
+        ):
+            for name, value in validators.items():
+                response = self.client.get(url, **{name: value})
+                self.assertEqual(response.status_code, 200, name)
+                self.assertEqual(response.data["balance"], "965.00", name)
+
+
+@override_settings(
+    SQL_INSTRUMENTATION=True,
+    SQL_INSTRUMENTATION_MAX_QUERIES=5,
+    SQL_INSTRUMENTATION_SLOW_MS=10_000,
+)
+class InstrumentationTests(LedgerTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.user)
+        for day in range(1, 6):
+            self.make_transaction("1.00", day=date(2025, 1, day))
+
+    def server_timing(self, response):
+        metrics = {}
+        for entry in response["Server-Timing"].split(", "):
+            name, *fields = entry.split(";")
+            metrics[name] = dict(field.split("=", 1) for field in fields)
+        return metrics
+
+    def test_reports_phases_in_server_timing(self):
+        with self.assertNoLogs("wallet_app.instrumentation"):
+            response = self.client.get("/api/budgets/")
+        metrics = self.server_timing(response)
+        self.assertEqual(set(metrics), {"db", "serialize", "render", "total"})
+        self.assertIn("queries", metrics["db"]["desc"])
+        self.assertGreaterEqual(
+            float(metrics["total"]["dur"]), float(metrics["render"]["dur"])
+        )
+
+    def test_logs_repeated_queries_over_the_threshold(self):
+        # Without its joins the listing loads each row's category and account.
+        unjoined = classmethod(lambda cls, queryset: queryset)
+        with (
+            mock.patch.object(TransactionReadSerializer, "select", unjoined),
+            self.assertLogs("wallet_app.instrumentation", "WARNING") as logs,
+        ):
+            response = self.client.get("/api/transactions/")
+        self.assertEqual(response.status_code, 200)
+        message = logs.output[0]
+        self.assertIn("GET /api/transactions/ -> 200", message)
+        self.assertIn("Repeated queries:", message)
+        self.assertRegex(message, r"\d+x SELECT .*wallet_app_category")
+        self.assertIn("Slowest queries:", message)
+
+    @override_settings(SQL_INSTRUMENTATION=False)
+    def test_disabled_by_default(self):
+        response = self.client.get("/api/budgets/")
+        self.assertNotIn("Server-Timing", response)
+
+    def test_fingerprint_collapses_in_lists(self):
+        self.assertEqual(
+            fingerprint("SELECT *\n FROM t WHERE id IN (%s, %s, %s)"),
+            fingerprint("SELECT * FROM t WHERE id IN (%s)"),
+        )
+
+
+class AsyncAnalyticsTests(LedgerTestMixin, TransactionTestCase):
+    # Report sections run on worker threads with their own connections, which
+    # only see committed rows, so these tests cannot run inside a transaction.
+
+    def setUp(self):
+        super().setUp()
+        caches["analytics"].clear()
+        self.savings = Account.objects.create(
+            user=self.user, name="Savings", balance=Decimal("0")
+        )
+        self.make_transaction("2500.00", type="IN", day=date(2025, 1, 1))
+        self.make_transaction("40.00", day=date(2025, 1, 3))
+        self.make_transaction("60.00", day=date(2025, 2, 10), category=None)
+        self.make_transaction(
+            "100.00", type="TRANSFER", day=date(2025, 2, 11), to_account=self.savings
+        )
+        Budget.objects.create(
+            user=self.user,
+            category=self.category,
+            limit=Decimal("200.00"),
+            start_date=date(2025, 1, 1),
+            end_date=date(2025, 1, 31),
+        )
+        self.client = AsyncClient()
+        self.headers = {"Authorization": f"Bearer {AccessToken.for_user(self.user)}"}
+        self.sync_client = APIClient()
+        self.sync_client.force_authenticate(self.user)
+
+    def get(self, path):
+        return async_to_sync(self.client.get)(path, headers=self.headers)
+
+    def assertSameResponse(self, path):
+        response = self.get(f"/api/async{path}")
+        expected = self.sync_client.get(f"/api{path}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), expected.json())
+        return response
+
+    def test_report_matches_sync_view(self):
+        for group_by in ("day", "week", "month"):
+            caches["analytics"].clear()
+            self.assertSameResponse(
+                "/transactions/generate_report/"
+                f"?start_date=2025-01-01&end_date=2025-02-28&group_by={group_by}"
+            )
+
+    def test_report_shares_the_analytics_cache(self):
+        path = (
+            "/transactions/generate_report/?start_date=2025-01-01&end_date=2025-02-28"
+        )
+        self.assertEqual(self.get(f"/api/async{path}")["X-Analytics-Cache"], "MISS")
+        self.assertEqual(
+            self.sync_client.get(f"/api{path}")["X-Analytics-Cache"], "HIT"
+        )
+
+    def test_visualization_and_budget_progress_match_sync_views(self):
+        self.assertSameResponse("/transactions/visualization_data/?year=2025")
+        self.assertSameResponse("/budgets/progress/")
+        budget = Budget.objects.get()
+        self.assertSameResponse(f"/budgets/{budget.pk}/progress/")
+
+    def test_validation_and_authentication(self):
+        response = self.get("/api/async/transactions/generate_report/")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json()["error"], "start_date and end_date are required"
+        )
+        response = self.get(
+            "/api/async/transactions/generate_report/"
+            "?start_date=2025-02-30&end_date=2025-03-01"
+        )
+        self.assertEqual(response.status_code, 400)
+
+        other = User.objects.create_user(username="bob", password="secret")
+        budget = Budget.objects.get()
+        self.headers = {"Authorization": f"Bearer {AccessToken.for_user(other)}"}
+        self.assertEqual(
+            self.get(f"/api/async/budgets/{budget.pk}/progress/").status_code, 404
+        )
+
+        response = async_to_sync(self.client.get)("/api/async/budgets/progress/")
+        self.assertEqual(response.status_code, 401)
+
+
+@skipUnless(connection.vendor == "sqlite", "asserts on SQLite query plans")
+class QueryPlanTests(LedgerTestMixin, TestCase):
+    """Pin the hot query shapes to their indexes so they cannot regress to scans."""
+
+    def assertUsesIndex(self, queryset, *names):
+        plan = queryset.explain()
+        self.assertNotRegex(
+            plan, r"SCAN wallet_app_\w+\b(?! USING| VIRTUAL TABLE)", plan
+        )
+        self.assertTrue(
+            any(f"INDEX {name}" in plan for name in names),
+            f"expected one of {names} in:\n{plan}",
+        )
+
+    def test_transaction_listing(self):
+        transactions = Transaction.objects.filter(user=self.user)
+        self.assertUsesIndex(
+            transactions.order_by("-date", "-id")[:51], "txn_user_date_id_idx"
+        )
+        self.assertUsesIndex(
+            transactions.filter(
+                Q(date__lt=date(2025, 1, 1)) | Q(date=date(2025, 1, 1), id__lt=10)
+            ).order_by("-date", "-id")[:51],
+            "txn_user_date_id_idx",
+        )
+        self.assertUsesIndex(
+            transactions.filter(type="OUT", date__gte=date(2025, 1, 1)),
+            "txn_user_type_date_idx",
+        )
+
+    def test_account_statement(self):
+        self.assertUsesIndex(
+            Transaction.objects.filter(account=self.account).order_by("-date", "-id")[
+                :51
+            ],
+            "txn_account_date_id_idx",
+        )
+
+    def test_budget_spending_sum(self):
+        self.assertUsesIndex(
+            Transaction.objects.filter(
+                user=self.user,
+                category=self.category,
+                type="OUT",
+                date__range=(date(2025, 1, 1), date(2025, 1, 31)),
+            ),
+            "txn_user_cat_type_date_idx",
+        )
+        self.assertUsesIndex(
+            Budget.objects.filter(user=self.user).annotate(
+                total=Budget.spent_subquery()
+            ),
+            "txn_user_cat_type_date_idx",
+        )
+
+    def test_description_search(self):
+        transactions = Transaction.objects.filter(user=self.user)
+        self.assertUsesIndex(
+            search_transactions(transactions, "coffee").order_by("-date", "-id")[:51],
+            "txn_user_date_id_idx",
+        )
+        plan = (
+            search_transactions(transactions, "coffee", ranked=True)
+            .order_by("-search_rank", "-id")[:51]
+            .explain()
+        )
+        self.assertIn("wallet_app_transaction_fts VIRTUAL TABLE INDEX", plan)
+        self.assertIn("INTEGER PRIMARY KEY", plan)
+
+    def test_budget_lookup(self):
+        self.assertUsesIndex(
+            Budget.objects.filter(
+                user=self.user,
+                category=self.category,
+                start_date__lte=date(2025, 1, 15),
+                end_date__gte=date(2025, 1, 15),
+            ),
+            "budget_category_dates_idx",
+        )
+
+    def test_rollup_range(self):
+        for model, name in (
+            (DailyRollup, "daily_rollup_user_period_idx"),
+            (MonthlyRollup, "monthly_rollup_user_period_idx"),
+        ):
+            self.assertUsesIndex(
+                model.objects.filter(
+                    user=self.user,
+                    period__range=(date(2025, 1, 1), date(2025, 12, 31)),
+                ),
+                name,
+            )
+
+    def test_category_tree(self):
+        self.assertUsesIndex(
+            Category.objects.filter(user=self.user).order_by("path"),
+            "category_user_path_idx",
+        )
+
+
+class ReportTests(LedgerTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        caches["analytics"].clear()
+        self.client.force_authenticate(self.user)
+
+    def test_generate_report_reads_rollups(self):
+        self.make_transaction("10.00", day=date(2025, 1, 15))
+        self.make_transaction("15.00", day=date(2025, 1, 15))
+        self.make_transaction("100.00", type="IN", day=date(2025, 1, 20))
+        self.make_transaction("50.00", day=date(2025, 3, 1))
+
+        response = self.client.get(
+            "/api/transactions/generate_report/",
+            {"start_date": "2025-01-01", "end_date": "2025-01-31"},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["summary"]["total_in"], Decimal("100.00"))
+        self.assertEqual(response.data["summary"]["total_out"], Decimal("25.00"))
+        self.assertEqual(
+            [row["period"] for row in response.data["period_totals"]],
+            [date(2025, 1, 15), date(2025, 1, 20)],
+        )
+
+    def test_report_splits_flows_from_one_query(self):
+        savings = Account.objects.create(user=self.user, name="Savings", balance=0)
+        self.make_transaction("10.00", day=date(2025, 1, 6))
+        self.make_transaction("100.00", type="IN", day=date(2025, 1, 7))
+        self.make_transaction(
+            "40.00", type="TRANSFER", to_account=savings, day=date(2025, 1, 14)
+        )
+
+        with self.assertNumQueries(1):
+            report = build_report(
+                self.user, date(2025, 1, 1), date(2025, 1, 31), group_by="week"
+            )
+
+        groceries = report["by_category"][0]
+        self.assertEqual(groceries["category__name"], "Groceries")
+        self.assertEqual(
+            (
+                groceries["total_in"],
+                groceries["total_out"],
+                groceries["total_transfer"],
+            ),
+            (Decimal("100.00"), Decimal("10.00"), Decimal("40.00")),
+        )
+        self.assertEqual(report["summary"]["net"], Decimal("90.00"))
+        self.assertEqual(
+            [row["period"] for row in report["period_totals"]],
+            [date(2025, 1, 6), date(2025, 1, 13)],
+        )
+
+    def test_report_rejects_unknown_grouping(self):
+        response = self.client.get(
+            "/api/transactions/generate_report/",
+            {"start_date": "2025-01-01", "end_date": "2025-01-31", "group_by": "hour"},
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_visualization_data_reads_monthly_rollups(self):
+        self.make_transaction("10.00", day=date(2025, 1, 15))
+        self.make_transaction("100.00", type="IN", day=date(2025, 3, 20))
+
+        response = self.client.get(
+            "/api/transactions/visualization_data/", {"year": 2025}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        series = response.data["time_series"]
+        self.assertEqual(series["period"], "monthly")
+        self.assertEqual(len(series["buckets"]), 12)
+        self.assertEqual(
+            series["buckets"][:3], ["2025-01-01", "2025-02-01", "2025-03-01"]
+        )
+        self.assertEqual(series["total_out"][:3], ["10.00", "0.00", "0.00"])
+        self.assertEqual(series["total_in"][:3], ["0.00", "0.00", "100.00"])
+        self.assertEqual(series["net"][:3], ["-10.00", "0.00", "100.00"])
+
+    def test_visualization_buckets_are_gap_filled(self):
+        self.make_transaction("1.10", day=date(2024, 12, 30))
+        self.make_transaction("2.20", day=date(2025, 1, 5))
+        self.make_transaction("3.30", day=date(2025, 1, 6))
+        self.make_transaction("4.40", day=date(2026, 8, 1))
+        expected = {
+            "daily": (9, "2024-12-29", ["0.00", "1.10", "0.00"]),
+            "weekly": (3, "2024-12-23", ["0.00", "3.30", "3.30"]),
+            "quarterly": (9, "2024-10-01", ["1.10", "5.50", "0.00"]),
+            "yearly": (3, "2024-01-01", ["1.10", "5.50", "4.40"]),
+        }
+        for period, (count, first, out) in expected.items():
+            end_date = "2025-01-06" if period in ("daily", "weekly") else "2026-12-31"
+            response = self.client.get(
+                "/api/transactions/visualization_data/",
+                {
+                    "period": period,
+                    "start_date": "2024-12-29",
+                    "end_date": end_date,
+                },
+            )
+            self.assertEqual(response.status_code, 200, period)
+            series = response.data["time_series"]
+            self.assertEqual(len(series["buckets"]), count, period)
+            self.assertEqual(series["buckets"][0], first, period)
+            self.assertEqual(series["total_out"][: len(out)], out, period)
+
+    def test_visualization_excludes_days_outside_the_range(self):
+        for amount, day in (
+            ("10.00", date(2025, 1, 14)),
+            ("5.00", date(2025, 1, 15)),
+            ("7.00", date(2025, 2, 10)),
+            ("3.00", date(2025, 4, 14)),
+            ("20.00", date(2025, 4, 15)),
+        ):
+            self.make_transaction(amount, day=day)
+
+        for period in ("monthly", "quarterly", "yearly"):
+            response = self.client.get(
+                "/api/transactions/visualization_data/",
+                {
+                    "period": period,
+                    "start_date": "2025-01-15",
+                    "end_date": "2025-04-14",
+                },
+            )
+            self.assertEqual(response.status_code, 200, period)
+            series = response.data["time_series"]
+            self.assertEqual(sum(map(Decimal, series["total_out"])), 15, period)
+            self.assertEqual(
+                response.data["category_distribution"][0]["total"],
+                Decimal("15.00"),
+                period,
+            )
+
+        response = self.client.get(
+            "/api/transactions/visualization_data/",
+            {"start_date": "2025-01-15", "end_date": "2025-04-14"},
+        )
+        self.assertEqual(
+            response.data["time_series"]["total_out"], ["5.00", "7.00", "0.00", "3.00"]
+        )
+
+        response = self.client.get(
+            "/api/transactions/visualization_data/",
+            {"start_date": "2025-01-16", "end_date": "2025-02-09"},
+        )
+        self.assertEqual(response.data["time_series"]["total_out"], ["0.00", "0.00"])
+        self.assertEqual(response.data["category_distribution"], [])
+
+    def test_visualization_rejects_bad_parameters(self):
+        for params in (
+            {"period": "hourly"},
+            {"year": "soon"},
+            {"start_date": "2025-01-01"},
+            {"start_date": "2025-02-01", "end_date": "2025-01-01"},
+        ):
+            response = self.client.get("/api/transactions/visualization_data/", params)
+            self.assertEqual(response.status_code, 400, params)
+            self.assertIn("error", response.data)
+
+
+class ForecastTests(LedgerTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        caches["analytics"].clear()
+        self.client.force_authenticate(self.user)
+        self.rent = Category.objects.create(user=self.user, name="Rent")
+        # One dollar of groceries every day from January to March 10th.
+        day = date(2025, 1, 1)
+        while day <= date(2025, 3, 10):
+            self.make_transaction("1.00", day=day)
+            day += timedelta(days=1)
+
+    def test_forecast_projects_categories_and_budgets(self):
+        groceries = Budget.objects.create(
+            user=self.user,
+            category=self.category,
+            limit=Decimal("25.00"),
+            start_date=date(2025, 3, 1),
+            end_date=date(2025, 3, 31),
+        )
+        Budget.objects.create(
+            user=self.user,
+            category=self.rent,
+            limit=Decimal("500.00"),
+            start_date=date(2025, 3, 1),
+            end_date=date(2025, 3, 31),
+        )
+
+        response = self.client.get(
+            "/api/transactions/forecast/",
+            {"as_of": "2025-03-10", "months": 2, "window": 7},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.data["months"], ["2025-01-01", "2025-02-01", "2025-03-01"]
+        )
+        category = response.data["categories"][0]
+        self.assertEqual(category["category__name"], "Groceries")
+        self.assertEqual(category["month_to_date"], "10.00")
+        self.assertEqual(category["projected_month_end"], "31.00")
+        self.assertEqual(category["monthly"], ["31.00", "28.00", "31.00"])
+        self.assertEqual(category["month_over_month"], ["-3.00", "3.00"])
+        self.assertEqual(category["moving_average"], ["1.00"] * 10)
+        self.assertEqual(category["daily_trend"], "0.00")
+
+        over, within = response.data["budgets"]
+        self.assertEqual(over["budget_id"], groceries.pk)
+        self.assertEqual(over["spent"], "10.00")
+        self.assertEqual(over["projected_spent"], "31.00")
+        self.assertTrue(over["projected_to_exceed"])
+        self.assertEqual(over["exceeds_on"], "2025-03-26")
+        self.assertEqual(within["category__name"], "Rent")
+        self.assertEqual(within["projected_spent"], "0.00")
+        self.assertFalse(within["projected_to_exceed"])
+        self.assertIsNone(within["exceeds_on"])
+
+    def test_budgets_count_base_currency_spend_up_to_as_of(self):
+        FxRate.objects.create(
+            currency="EUR", date=date(2024, 1, 1), rate=Decimal("3.00")
+        )
+        fx_rates.clear()
+        euros = Account.objects.create(
+            user=self.user, name="Euros", balance=0, currency="EUR"
+        )
+        self.make_transaction("5.00", day=date(2025, 3, 3), account=euros)
+        budget = Budget.objects.create(
+            user=self.user,
+            category=self.category,
+            limit=Decimal("100.00"),
+            start_date=date(2024, 12, 15),
+            end_date=date(2025, 3, 31),
+        )
+
+        forecast = build_forecast(self.user, date(2025, 3, 5), 1, 7)
+
+        # Budgets only count dollars: January, February and March 1-5 at a
+        # dollar a day, and the counter also holds March 6-10.
+        self.assertEqual(budget.spent, Decimal("69.00"))
+        self.assertEqual(forecast["budgets"][0]["budget_id"], budget.pk)
+        self.assertEqual(forecast["budgets"][0]["spent"], "64.00")
+        # The category's own spend converts the 5 EUR at 3.00.
+        self.assertEqual(forecast["categories"][0]["month_to_date"], "20.00")
+
+    def test_default_day_revalidates_the_next_day(self):
+        with mock.patch(
+            "django.utils.timezone.localdate", return_value=date(2030, 3, 10)
+        ):
+            etag = self.client.get("/api/transactions/forecast/")["ETag"]
+            response = self.client.get(
+                "/api/transactions/forecast/", HTTP_IF_NONE_MATCH=etag
+            )
+            self.assertEqual(response.status_code, 304)
+        with mock.patch(
+            "django.utils.timezone.localdate", return_value=date(2030, 3, 11)
+        ):
+            response = self.client.get(
+                "/api/transactions/forecast/", HTTP_IF_NONE_MATCH=etag
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["as_of"], "2030-03-11")
+
+    def test_forecast_reads_two_queries(self):
+        Budget.objects.create(
+            user=self.user,
+            category=self.rent,
+            limit=Decimal("500.00"),
+            start_date=date(2025, 1, 1),
+            end_date=date(2025, 12, 31),
+        )
+        with self.assertNumQueries(2):
+            forecast = build_forecast(self.user, date(2025, 3, 10), 2, 7)
+        self.assertEqual(len(forecast["categories"]), 2)
+
+    def test_trend_projection(self):
+        intercepts, slopes = linear_trends(
+            np.array([[100, 200, 300, 400], [4, 3, 2, 1]])
+        )
+        self.assertEqual(intercepts.tolist(), [100.0, 4.0])
+        self.assertEqual(slopes.tolist(), [100.0, -1.0])
+        # Column d totals the next d days; the falling line stops at zero.
+        self.assertEqual(
+            projected_totals(intercepts, slopes, 4, 3).tolist(),
+            [[0.0, 500.0, 1100.0, 1800.0], [0.0, 0.0, 0.0, 0.0]],
+        )
+
+    def test_forecast_rejects_bad_parameters(self):
+        for params in (
+            {"as_of": "March"},
+            {"months": 0},
+            {"months": "a few"},
+            {"window": 29},
+        ):
+            response = self.client.get("/api/transactions/forecast/", params)
+            self.assertEqual(response.status_code, 400, params)
+            self.assertIn("error", response.data)
+
+
+class CurrencyTests(LedgerTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        caches["analytics"].clear()
+        fx_rates.clear()
+        self.client.force_authenticate(self.user)
+        self.euros = Account.objects.create(
+            user=self.user, name="Euros", balance=Decimal("500.00"), currency="EUR"
+        )
+        # Friday and Monday rates; the weekend carries Friday's forward.
+        self.load_rates(
+            "date,currency,rate\n2025-01-10,EUR,1.10\n2025-01-13,eur,1.20\n"
+        )
+
+    def load_rates(self, content):
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as handle:
+            handle.write(content)
+        self.addCleanup(os.remove, handle.name)
+        out = StringIO()
+        call_command("load_fx_rates", handle.name, stdout=out)
+        return out.getvalue()
+
+    def report(self, path="/api/transactions/generate_report/", **params):
+        params = {"start_date": "2025-01-01", "end_date": "2025-01-31", **params}
+        return self.client.get(path, params)
+
+    def test_report_converts_foreign_accounts_per_day(self):
+        self.make_transaction("100.00", day=date(2025, 1, 15))
+        self.make_transaction("50.00", account=self.euros, day=date(2025, 1, 11))
+        self.make_transaction(
+            "200.00", type="IN", account=self.euros, day=date(2025, 1, 13)
+        )
+
+        with self.assertNumQueries(3):
+            report = build_report(
+                self.user, date(2025, 1, 1), date(2025, 1, 31), group_by="month"
+            )
+        self.assertEqual(report["currency"], "USD")
+        self.assertEqual(report["summary"]["total_out"], Decimal("155.00"))
+        self.assertEqual(report["summary"]["total_in"], Decimal("240.00"))
+        (euros,) = [
+            row for row in report["by_account"] if row["account__name"] == "Euros"
+        ]
+        self.assertEqual(euros["count"], 2)
+        self.assertEqual(report["period_totals"][0]["net"], Decimal("85.00"))
+        # Rates for the month are now cached.
+        with self.assertNumQueries(1):
+            build_report(self.user, date(2025, 1, 1), date(2025, 1, 31))
+
+        response = self.report(group_by="month")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["summary"]["total_out"], Decimal("155.00"))
+        async_report = json.loads(
+            async_to_sync(AsyncClient().get)(
+                "/api/async/transactions/generate_report/",
+                {
+                    "start_date": "2025-01-01",
+                    "end_date": "2025-01-31",
+                    "group_by": "month",
+                },
+                headers={"authorization": f"Bearer {AccessToken.for_user(self.user)}"},
+            ).content
+        )
+        self.assertEqual(async_report["summary"]["total_out"], 155.0)
+
+    def test_visualization_converts_foreign_accounts(self):
+        self.make_transaction("10.00", day=date(2025, 1, 15))
+        self.make_transaction("10.00", account=self.euros, day=date(2025, 1, 14))
+        self.make_transaction("10.00", account=self.euros, day=date(2025, 2, 3))
+
+        response = self.client.get(
+            "/api/transactions/visualization_data/", {"year": 2025}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.data["time_series"]["total_out"][:3], ["22.00", "12.00", "0.00"]
+        )
+        self.assertEqual(
+            response.data["category_distribution"],
+            [{"category__name": "Groceries", "total": Decimal("34.00")}],
+        )
+
+    def test_category_totals_convert_and_budgets_count_the_base_currency(self):
+        budget = Budget.objects.create(
+            user=self.user,
+            category=self.category,
+            limit=Decimal("15.00"),
+            start_date=date(2025, 1, 1),
+            end_date=date(2025, 1, 31),
+        )
+        self.make_transaction("10.00", day=date(2025, 1, 15))
+        self.make_transaction("10.00", account=self.euros, day=date(2025, 1, 14))
+
+        self.assertEqual(
+            Category.spending_totals(self.user, [self.category]),
+            {self.category.pk: (Decimal("22.00"), Decimal("22.00"))},
+        )
+        budget.refresh_from_db()
+        self.assertEqual(budget.spent, Decimal("10.00"))
+        self.assertFalse(BudgetNotification.objects.exists())
+        rebuild_budget_spent()
+        budget.refresh_from_db()
+        self.assertEqual(budget.spent, Decimal("10.00"))
+        budget.save()
+        self.assertEqual(budget.spent, Decimal("10.00"))
+
+    def test_transfers_and_currency_changes_keep_amounts_in_one_currency(self):
+        response = self.client.post(
+            "/api/transactions/",
+            {
+                "account": self.account.pk,
+                "to_account": self.euros.pk,
+                "amount": "10.00",
+                "type": "TRANSFER",
+                "date": "2025-01-15",
+            },
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("to_account", response.data)
+        self.assertFalse(Transaction.objects.exists())
+
+        response = self.client.patch(
+            f"/api/accounts/{self.euros.pk}/", {"currency": "GBP"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.make_transaction("17.00", account=self.euros, day=date(2025, 1, 14))
+        response = self.client.patch(
+            f"/api/accounts/{self.euros.pk}/", {"currency": "USD"}
+        )
+        self.assertEqual(response.status_code, 400)
+        self.euros.refresh_from_db()
+        self.assertEqual(self.euros.currency, "GBP")
+
+    def test_missing_rate_is_reported(self):
+        self.make_transaction("5.00", account=self.euros, day=date(2025, 1, 9))
+        response = self.report()
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data["error"], "No EUR exchange rate on or before 2025-01-09"
+        )
+
+    def test_loading_rates_replaces_and_invalidates(self):
+        self.make_transaction("10.00", account=self.euros, day=date(2025, 1, 13))
+        self.assertEqual(self.report().data["summary"]["total_out"], Decimal("12.00"))
+
+        output = self.load_rates("date,currency,rate\n2025-01-13,EUR,1.5\n")
+        self.assertIn("Loaded 1 rates for 1 currencies into USD.", output)
+        self.assertEqual(FxRate.objects.count(), 2)
+        self.assertEqual(self.report().data["summary"]["total_out"], Decimal("15.00"))
+
+        with self.assertRaisesMessage(CommandError, "Line 2: invalid rate"):
+            self.load_rates("date,currency,rate\n2025-01-14,EURO,1.5\n")
+        with self.assertRaisesMessage(CommandError, "Missing columns: rate"):
+            self.load_rates("date,currency\n")
+
+    @override_settings(FX_RATE_CACHE_SIZE=1)
+    def test_rate_cache_evicts_least_recently_used_month(self):
+        self.assertEqual(fx_rates.rate("EUR", date(2025, 1, 12)), Decimal("1.10"))
+        self.assertEqual(fx_rates.rate("EUR", date(2025, 2, 1)), Decimal("1.20"))
+        with self.assertNumQueries(0):
+            fx_rates.rate("EUR", date(2025, 2, 28))
+        with self.assertNumQueries(2):
+            fx_rates.rate("EUR", date(2025, 1, 31))
+        self.assertEqual(fx_rates.rate("USD", date(1999, 1, 1)), 1)
+
+
+class PaginationTests(LedgerTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.user)
+        # Several rows share a date so the id tie-breaker is exercised.
+        self.transactions = [
+            self.make_transaction("1.00", day=date(2025, 1, 1 + i // 3))
+            for i in range(10)
+        ]
+
+    def walk(self, url, params, key="next"):
+        seen = []
+        response = self.client.get(url, params)
+        while True:
+            seen.extend(row["id"] for row in response.data["results"])
+            if not response.data[key]:
+                return seen, response
+            response = self.client.get(response.data[key])
+
+    def test_pages_cover_every_row_once_in_date_id_order(self):
+        ids, last = self.walk("/api/transactions/", {"page_size": 3})
+        expected = [
+            t.pk for t in sorted(self.transactions, key=lambda t: (t.date, t.pk))
+        ][::-1]
+        self.assertEqual(ids, expected)
+
+        back, _ = self.walk(last.data["previous"], {}, key="previous")
+        self.assertEqual(len(back), 9)
+
+    def test_pagination_honours_filters(self):
+        ids, _ = self.walk(
+            "/api/transactions/", {"page_size": 2, "start_date": "2025-01-03"}
+        )
+        self.assertEqual(len(ids), 4)
+
+    def test_account_transactions_are_paginated(self):
+        response = self.client.get(
+            f"/api/accounts/{self.account.pk}/transactions/", {"page_size": 4}
+        )
+        self.assertEqual(len(response.data["results"]), 4)
+        self.assertIsNotNone(response.data["next"])
+
+    def test_invalid_date_filters_are_rejected(self):
+        for url in (
+            "/api/transactions/",
+            f"/api/accounts/{self.account.pk}/transactions/",
+        ):
+            response = self.client.get(url, {"start_date": "2025-13-01"})
+            self.assertEqual(response.status_code, 400)
+            self.assertIn("start_date", response.data)
+
+    def test_invalid_cursor(self):
+        response = self.client.get("/api/transactions/", {"cursor": "garbage"})
+        self.assertEqual(response.status_code, 404)
+
+
+class TransactionReadTests(LedgerTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.user)
+        savings = Account.objects.create(user=self.user, name="Savings", balance=0)
+        self.rule = RecurringTransaction.objects.create(
+            user=self.user,
+            account=self.account,
+            category=self.category,
+            amount=Decimal("9.99"),
+            type="OUT",
+            start_date=date(2025, 1, 1),
+            description="Streaming",
+        )
+        self.make_transaction("12.50", day=date(2025, 1, 2), description="Lunch")
+        self.make_transaction(
+            "40.00", type="TRANSFER", to_account=savings, category=None
+        )
+        self.make_transaction("9.99", day=date(2025, 2, 1), recurring=self.rule)
+        for i in range(60):
+            self.make_transaction("1.00", day=date(2025, 3, 1 + i % 28))
+
+    def test_reads_match_the_model_serializer(self):
+        rows = Transaction.objects.order_by("-date", "-id")
+        expected = TransactionSerializer(rows, many=True).data
+
+        listed = self.client.get("/api/transactions/", {"page_size": 500})
+        self.assertEqual(listed.data["results"], expected)
+        self.assertNotIn("category_name", listed.data["results"][-2])
+
+        transfer = rows.get(type="TRANSFER")
+        detail = self.client.get(f"/api/transactions/{transfer.pk}/")
+        self.assertEqual(detail.data, TransactionSerializer(transfer).data)
+
+        statement = self.client.get(
+            f"/api/accounts/{self.account.pk}/transactions/",
+            {"page_size": 500, "running_balance": "true"},
+        )
+        account = Account.objects.get(pk=self.account.pk)
+        balances = account.running_balances(list(rows))
+        self.assertEqual(
+            statement.data["results"],
+            TransactionSerializer(
+                rows, many=True, context={"running_balances": balances}
+            ).data,
+        )
+
+    def test_query_count_does_not_depend_on_page_size(self):
+        # The data version for conditional GETs, then one page query.
+        for page_size in (1, 10, 50, 500):
+            with self.assertNumQueries(2):
+                response = self.client.get(
+                    "/api/transactions/", {"page_size": page_size}
+                )
+            self.assertEqual(len(response.data["results"]), min(page_size, 63))
+            # Account statements also load the account.
+            with self.assertNumQueries(3):
+                self.client.get(
+                    f"/api/accounts/{self.account.pk}/transactions/",
+                    {"page_size": page_size},
+                )
+
+
+class SearchTests(LedgerTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.user)
+        self.coffee = self.make_transaction("4.50", description="Coffee at Blue Bottle")
+        self.beans = self.make_transaction(
+            "18.00",
+            description="Coffee beans, grinder cleaning tablets and a new filter",
+            day=date(2025, 1, 20),
+        )
+        self.cafe = self.make_transaction("3.20", description="Café au lait")
+        self.rent = self.make_transaction("900.00", description="Rent for January")
+
+    def search(self, **params):
+        response = self.client.get("/api/transactions/", params)
+        self.assertEqual(response.status_code, 200)
+        return [row["id"] for row in response.data["results"]]
+
+    def test_prefix_terms_must_all_match(self):
+        self.assertEqual(
+            sorted(self.search(search="COFF")), sorted([self.coffee.pk, self.beans.pk])
+        )
+        self.assertEqual(self.search(search="coffee blu"), [self.coffee.pk])
+        self.assertEqual(self.search(search="coffee rent"), [])
+        self.assertEqual(len(self.search(search="  ")), 4)
+
+    @skipUnless(connection.vendor == "sqlite", "FTS5 tokenizer folds diacritics")
+    def test_terms_match_without_diacritics(self):
+        self.assertEqual(self.search(search="cafe"), [self.cafe.pk])
+
+    def test_combines_with_other_filters(self):
+        groceries = Category.objects.create(user=self.user, name="Fun")
+        Transaction.objects.filter(pk=self.beans.pk).update(category=groceries)
+        self.assertEqual(
+            self.search(search="coffee", max_amount="10"), [self.coffee.pk]
+        )
+        self.assertEqual(
+            self.search(search="coffee", category=groceries.pk), [self.beans.pk]
+        )
+        self.assertEqual(
+            self.search(search="coffee", start_date="2025-01-16"), [self.beans.pk]
+        )
+
+    def test_index_follows_saves_bulk_inserts_and_deletes(self):
+        self.coffee.description = "Tea at Blue Bottle"
+        self.coffee.save()
+        self.assertEqual(self.search(search="coffee"), [self.beans.pk])
+        self.assertEqual(self.search(search="tea"), [self.coffee.pk])
+
+        self.beans.delete()
+        Transaction.objects.filter(pk=self.cafe.pk).delete()
+        self.assertEqual(self.search(search="coffee"), [])
+        self.assertEqual(self.search(search="cafe"), [])
+
+        (imported,) = Transaction.objects.bulk_create(
+            [
+                Transaction(
+                    user=self.user,
+                    account=self.account,
+                    amount=Decimal("2.00"),
+                    type="OUT",
+                    date=date(2025, 2, 1),
+                    description="Coffee refill",
+                )
+            ]
+        )
+        self.assertEqual(self.search(search="refill coffee"), [imported.pk])
+
+    @skipUnless(connection.vendor == "sqlite", "bm25 ranks shorter matches first")
+    def test_relevance_ordering_pages_best_match_first(self):
+        response = self.client.get(
+            "/api/transactions/",
+            {"search": "coffee", "ordering": "relevance", "page_size": 1},
+        )
+        self.assertEqual(
+            [row["id"] for row in response.data["results"]], [self.coffee.pk]
+        )
+        response = self.client.get(response.data["next"])
+        self.assertEqual(
+            [row["id"] for row in response.data["results"]], [self.beans.pk]
+        )
+        self.assertIsNone(response.data["next"])
+        response = self.client.get(response.data["previous"])
+        self.assertEqual(
+            [row["id"] for row in response.data["results"]], [self.coffee.pk]
+        )
+
+    def test_search_other_users_rows_is_scoped(self):
+        other = User.objects.create_user(username="bob", password="secret")
+        self.client.force_authenticate(other)
+        self.assertEqual(self.search(search="coffee"), [])
+
+
+class ExportTests(LedgerTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.user)
+        self.make_transaction("12.50", day=date(2025, 1, 2), description="Lunch")
+        self.make_transaction("300.00", type="IN", day=date(2025, 1, 1))
+
+    def test_csv_export_streams_rows_in_date_order(self):
+        response = self.client.get("/api/transactions/export/")
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        rows = list(
+            csv.reader(b"".join(response.streaming_content).decode().splitlines())
+        )
+        self.assertEqual(rows[0][:4], ["id", "date", "type", "amount"])
+        self.assertEqual([row[2] for row in rows[1:]], ["IN", "OUT"])
+        self.assertEqual(rows[2][8:], ["Groceries", "Lunch"])
+
+    def test_ndjson_export_honours_filters(self):
+        response = self.client.get(
+            "/api/transactions/export/", {"file_format": "ndjson", "type": "OUT"}
+        )
+
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 1)
+        record = json.loads(lines[0])
+        self.assertEqual(record["amount"], "12.50")
+        self.assertEqual(record["account_name"], "Checking")
+
+    def test_unknown_format(self):
+        response = self.client.get("/api/transactions/export/", {"file_format": "xls"})
+        self.assertEqual(response.status_code, 400)
+
+
+class ImportTests(LedgerTestMixin, APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(self.user)
+
+    def upload(self, name, content, encoding="utf-8", **data):
+        upload = SimpleUploadedFile(name, content.encode(encoding))
+        return self.client.post(
+            "/api/transactions/import/",
+            {"file": upload, **data},
+            format="multipart",
+        )
+
+    def test_csv_import_reports_bad_rows_and_keeps_good_ones(self):
+        content = (
+            "date,amount,description,category\n"
+            f"2025-01-10,-25.00,Groceries,{self.category.pk}\n"
+            "not-a-date,10.00,Broken,\n"
+            "2025-01-11,500.00,Salary,\n"
+            "2025-01-12,5.00,Unknown category,999999\n"
+        )
+
+        response = self.upload("statement.csv", content, account=self.account.pk)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["created"], 2)
+        self.assertEqual([e["row"] for e in response.data["errors"]], [2, 4])
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal("1475.00"))
+        self.assertEqual(
+            DailyRollup.objects.get(type="OUT", period=date(2025, 1, 10)).total,
+            Decimal("25.00"),
+        )
+
+    def test_import_checks_every_budget_it_spends_against(self):
+        january, february = (
+            Budget.objects.create(
+                user=self.user,
+                category=self.category,
+                limit=Decimal("50.00"),
+                start_date=start,
+                end_date=end,
+            )
+            for start, end in (
+                (date(2025, 1, 1), date(2025, 1, 31)),
+                (date(2025, 2, 1), date(2025, 2, 28)),
+            )
+        )
+        content = (
+            "date,amount,category\n"
+            f"2025-01-10,-200.00,{self.category.pk}\n"
+            f"2025-02-10,-5.00,{self.category.pk}\n"
+        )
+
+        response = self.upload("statement.csv", content, account=self.account.pk)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            list(BudgetNotification.objects.values_list("budget", flat=True)),
+            [january.pk],
+        )
+
+    def test_jsonl_import_uses_row_accounts(self):
+        content = (
+            json.dumps(
+                {
+                    "date": "2025-01-10",
+                    "amount": "40.00",
+                    "type": "OUT",
+                    "account": self.account.pk,
+                }
+            )
+            + "\n{broken\n"
+        )
+
+        response = self.upload("statement.jsonl", content)
+
+        self.assertEqual(response.data["created"], 1)
+        self.assertEqual(response.data["errors"][0]["row"], 2)
+
+    def test_ofx_import(self):
+        content = """OFXHEADER:100
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20250105120000<TRNAMT>-12.50<NAME>Coffee</STMTTRN>
+<STMTTRN>
+<TRNTYPE>CREDIT
+<DTPOSTED>20250106
+<TRNAMT>100.00
+<NAME>Refund
+</STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+        response = self.upload("statement.ofx", content, account=self.account.pk)
+
+        self.assertEqual(response.data["created"], 2)
+        self.assertEqual(
+            list(Transaction.objects.order_by("date").values_list("type", "amount")),
+            [("OUT", Decimal("12.50")), ("IN", Decimal("100.00"))],
+        )
+
+    def test_rejects_unknown_account(self):
+        response = self.upload("statement.csv", "date,amount\n", account=999999)
+        self.assertEqual(response.status_code, 400)
+
+    def test_rejects_files_that_are_not_utf8_before_importing(self):
+        rows = "".join(f"2025-01-{day:02},-1.00,Bread\n" for day in range(10, 13))
+        content = "date,amount,description\n" + rows + "2025-01-13,-4.50,Café\n"
+
+        response = self.upload(
+            "statement.csv", content, encoding="latin-1", account=self.account.pk
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["error"], "Line 5 is not valid UTF-8")
+        self.assertFalse(Transaction.objects.exists())
+
+
+class BenchmarkTests(TransactionTestCase):
+    # The async endpoints read through worker connections, which only see
+    # committed rows.
+
+    def setUp(self):
+        self.created = LedgerGenerator(
+            users=2,
+            accounts=3,
+            transactions=400,
+            days=120,
+            end_date=date(2025, 3, 31),
+            prefix="bench",
+        ).run()
+        self.user = User.objects.get(username="bench0")
+
+    def test_generated_ledger_is_consistent(self):
+        self.assertEqual(self.created["users"], 2)
+        transactions = Transaction.objects.filter(user=self.user)
+        self.assertEqual(transactions.count(), 400)
+        self.assertEqual(
+            DailyRollup.objects.filter(user=self.user).aggregate(n=Sum("count"))["n"],
+            400,
+        )
+        for budget in Budget.objects.filter(user=self.user):
+            spent = transactions.filter(
+                type="OUT",
+                category=budget.category,
+                date__range=(budget.start_date, budget.end_date),
+            ).aggregate(total=Sum("amount"))["total"]
+            self.assertEqual(budget.spent, spent or 0)
+        for category in Category.objects.filter(user=self.user, parent__isnull=False):
+            self.assertEqual(category.path, f"{category.parent_id}/{category.pk}/")
+
+        for account in Account.objects.filter(user=self.user):
+            flows = Transaction.objects.filter(
+                Q(account=account) | Q(to_account=account)
+            )
+            net = sum(
+                (
+                    txn.amount
+                    if txn.type == "IN" or txn.to_account_id == account.pk
+                    else -txn.amount
+                )
+                for txn in flows
+            )
+            self.assertEqual(account.balance - net, account.opening_balance)
+            self.assertTrue(500 <= account.opening_balance <= 5000)
+
+    def test_benchmarks_write_comparable_json(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, "results.json")
+            call_command(
+                "run_benchmarks",
+                user="bench0",
+                repeat=2,
+                output=output,
+                stderr=StringIO(),
+            )
+            with open(output) as handle:
+                report = json.load(handle)
+            call_command(
+                "run_benchmarks",
+                user="bench0",
+                repeat=1,
+                only=["transaction_list"],
+                compare=output,
+                stdout=StringIO(),
+                stderr=(comparison := StringIO()),
+            )
+
+        self.assertEqual(report["meta"]["transactions"], 400)
+        for name, result in report["results"].items():
+            self.assertIn(result["status"], ([200], [201]), name)
+            self.assertGreater(result["queries"], 0, name)
+            self.assertLessEqual(result["min_ms"], result["median_ms"])
+        self.assertIn("transaction_list", comparison.getvalue())
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 400)
+
+    def test_user_cache_saves_a_query_per_request(self):
+        only = ["budget_list", "transaction_list"]
+        cold = run_benchmarks(self.user, repeat=2, cold_auth=True, only=only)
+        warm = run_benchmarks(self.user, repeat=2, only=only)
+        for name in only:
+            self.assertEqual(warm[name]["queries"], cold[name]["queries"] - 1, name)
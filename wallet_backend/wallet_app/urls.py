@@ -7,11 +7,14 @@ from .views import (
     AccountViewSet,
     CategoryViewSet,
     TransactionViewSet,
+    RecurringTransactionViewSet,
     BudgetViewSet,
     landing_page,
+    AnalyticsCacheStatsView,
     UserRegistrationView,
     UserDetailsView,
 )
+from . import async_views
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
 from rest_framework import permissions
@@ -33,11 +36,44 @@ router = DefaultRouter()
 router.register(r"accounts", AccountViewSet, basename="account")
 router.register(r"categories", CategoryViewSet, basename="category")
 router.register(r"transactions", TransactionViewSet, basename="transaction")
+router.register(r"recurring", RecurringTransactionViewSet, basename="recurring")
 router.register(r"budgets", BudgetViewSet, basename="budget")
 
 # URL patterns
 urlpatterns = [
     path("", landing_page, name="landing-page"),  # Landing page
+    path(
+        "api/analytics/cache/",
+        AnalyticsCacheStatsView.as_view(),
+        name="analytics-cache-stats",
+    ),
+    path(
+        "api/async/",
+        include(
+            [
+                path(
+                    "transactions/generate_report/",
+                    async_views.generate_report,
+                    name="async-generate-report",
+                ),
+                path(
+                    "transactions/visualization_data/",
+                    async_views.visualization_data,
+                    name="async-visualization-data",
+                ),
+                path(
+                    "budgets/progress/",
+                    async_views.batch_budget_progress,
+                    name="async-budget-batch-progress",
+                ),
+                path(
+                    "budgets/<int:pk>/progress/",
+                    async_views.budget_progress,
+                    name="async-budget-progress",
+                ),
+            ]
+        ),
+    ),
     path("api/", include(router.urls)),  # API endpoints
     path(
         "auth/",
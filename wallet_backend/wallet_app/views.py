@@ -1,30 +1,62 @@
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
 from rest_framework import viewsets, status, generics, permissions
 from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
-from django.db.models import Sum, Count, Q
-from django.db.models.functions import TruncMonth, TruncDay
-from datetime import datetime
+from rest_framework.exceptions import ValidationError as DRFValidationError
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from django_filters import rest_framework as filters
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
-from .models import Account, Category, Transaction, Budget, BudgetNotification
+from .models import (
+    Account,
+    Category,
+    Transaction,
+    RecurringTransaction,
+    Budget,
+    BudgetNotification,
+)
+from .analytics import (
+    build_forecast,
+    build_report,
+    build_visualization,
+    forecast_parameters,
+    report_parameters,
+    visualization_parameters,
+)
+from .cache import analytics_cache
+from .exporters import EXPORT_FORMATS, STREAMERS, export_rows
+from .fx import MissingRateError
+from .importers import IMPORT_FORMATS, PARSERS, TransactionImporter, check_encoding
+from .mixins import ConditionalGetMixin
+from .pagination import TransactionKeysetPagination
+from .search import search_transactions
 from .serializers import (
     AccountSerializer,
+    AccountBalanceSerializer,
     CategorySerializer,
+    CategoryNodeSerializer,
+    CategorySpendingSerializer,
     TransactionSerializer,
+    TransactionReadSerializer,
+    RecurringTransactionSerializer,
     BudgetSerializer,
+    BudgetProgressSerializer,
     BudgetNotificationSerializer,
     TransactionReportSerializer,
     UserRegistrationSerializer,
     UserSerializer,
 )
 from rest_framework.views import APIView
-from django.core.exceptions import ValidationError
+from django.utils import timezone
 from django.utils.dateparse import parse_date
 
 
+def cache_headers(hit):
+    """Headers telling clients whether an analytics response came from cache."""
+    return {"X-Analytics-Cache": "HIT" if hit else "MISS"}
+
+
 # Landing page view
 def landing_page(request):
     """Landing page view that provides a welcome message and link to API documentation."""
@@ -54,6 +86,16 @@ class UserRegistrationView(generics.CreateAPIView):
         return Response(serializer.errors, status=400)
 
 
+class AnalyticsCacheStatsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        """
+        Hit and miss counters of this process's analytics cache.
+        """
+        return Response(analytics_cache.stats())
+
+
 class UserDetailsView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -73,6 +115,15 @@ class TransactionFilter(filters.FilterSet):
     start_date = filters.DateFilter(field_name="date", lookup_expr="gte")
     end_date = filters.DateFilter(field_name="date", lookup_expr="lte")
     type = filters.ChoiceFilter(choices=Transaction.TRANSACTION_TYPE)
+    search = filters.CharFilter(
+        method="filter_search",
+        help_text="Words the description must contain, matched as prefixes.",
+    )
+    ordering = filters.ChoiceFilter(
+        choices=[("relevance", "Relevance")],
+        method="filter_ordering",
+        help_text="relevance: list search matches best first.",
+    )
 
     class Meta:
         model = Transaction
@@ -84,10 +135,20 @@ class TransactionFilter(filters.FilterSet):
             "max_amount",
             "start_date",
             "end_date",
+            "search",
+            "ordering",
         ]
 
+    def filter_search(self, queryset, name, value):
+        ranked = self.form.cleaned_data.get("ordering") == "relevance"
+        return search_transactions(queryset, value, ranked=ranked)
+
+    def filter_ordering(self, queryset, name, value):
+        # Applied by the paginator; filter_search adds the rank it orders by.
+        return queryset
 
-class AccountViewSet(viewsets.ModelViewSet):
+
+class AccountViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """ViewSet for managing Account model."""
 
     permission_classes = [IsAuthenticated]
@@ -109,37 +170,159 @@ class AccountViewSet(viewsets.ModelViewSet):
         """Save the account with the authenticated user."""
         serializer.save(user=self.request.user)
 
+    def varies_by_day(self, request):
+        # Balances default to today's, which future-dated rows join at midnight.
+        return self.action == "balance" and not request.query_params.get("as_of")
+
     @swagger_auto_schema(
         operation_description="Get all transactions for a specific account.",
-        responses={200: TransactionSerializer(many=True)},
+        manual_parameters=[
+            openapi.Parameter(
+                "running_balance",
+                openapi.IN_QUERY,
+                description="Include the account balance after each transaction",
+                type=openapi.TYPE_BOOLEAN,
+                required=False,
+            ),
+        ],
+        responses={200: TransactionSerializer(many=True), 400: "Invalid filters"},
     )
     @action(detail=True, methods=["get"])
     def transactions(self, request, pk=None):
-        """Get all transactions for a specific account."""
+        """Get all transactions for a specific account, one page at a time."""
         account = self.get_object()
-        transactions = Transaction.objects.filter(account=account)
-        serializer = TransactionSerializer(transactions, many=True)
+        filterset = TransactionFilter(
+            request.query_params,
+            queryset=TransactionReadSerializer.select(
+                Transaction.objects.filter(account=account)
+            ),
+            request=request,
+        )
+        # Invalid filters are rejected as on the transaction listing.
+        if not filterset.is_valid():
+            raise DRFValidationError(filterset.errors)
+        transactions = filterset.qs
+        paginator = TransactionKeysetPagination()
+        page = paginator.paginate_queryset(transactions, request, view=self)
+        context = {}
+        if request.query_params.get("running_balance") in ("1", "true"):
+            context["running_balances"] = account.running_balances(page)
+        serializer = TransactionReadSerializer(page, many=True, context=context)
+        return paginator.get_paginated_response(serializer.data)
+
+    @swagger_auto_schema(
+        operation_description="Get the account balance at the end of a given day.",
+        manual_parameters=[
+            openapi.Parameter(
+                "as_of",
+                openapi.IN_QUERY,
+                description="Date (YYYY-MM-DD), defaults to today",
+                type=openapi.TYPE_STRING,
+                required=False,
+            ),
+        ],
+        responses={200: AccountBalanceSerializer, 400: "Invalid date"},
+    )
+    @action(detail=True, methods=["get"])
+    def balance(self, request, pk=None):
+        """Get the balance of an account as of a past (or future) date."""
+        account = self.get_object()
+        as_of = request.query_params.get("as_of")
+        try:
+            day = parse_date(as_of) if as_of else timezone.localdate()
+        except ValueError:
+            day = None
+        if day is None:
+            return Response(
+                {"error": "Invalid date format. Use YYYY-MM-DD"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        serializer = AccountBalanceSerializer(
+            {"account": account.pk, "as_of": day, "balance": account.balance_as_of(day)}
+        )
         return Response(serializer.data)
 
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """ViewSet for managing Category model."""
 
     permission_classes = [IsAuthenticated]
     serializer_class = CategorySerializer
     queryset = Category.objects.all()
 
+    spending_parameters = [
+        openapi.Parameter(
+            "start_date",
+            openapi.IN_QUERY,
+            description="Only count spending on or after this date (YYYY-MM-DD)",
+            type=openapi.TYPE_STRING,
+            format=openapi.FORMAT_DATE,
+            required=False,
+        ),
+        openapi.Parameter(
+            "end_date",
+            openapi.IN_QUERY,
+            description="Only count spending on or before this date (YYYY-MM-DD)",
+            type=openapi.TYPE_STRING,
+            format=openapi.FORMAT_DATE,
+            required=False,
+        ),
+    ]
+
     @swagger_auto_schema(
         operation_description="List all categories for the authenticated user.",
+        manual_parameters=spending_parameters,
         responses={200: CategorySerializer(many=True)},
     )
     def list(self, request):
-        return super().list(request)
+        categories = list(self.get_queryset().select_related("parent").order_by("path"))
+        serializer = self.get_tree_serializer(categories, categories)
+        return Response(serializer.data)
+
+    @swagger_auto_schema(
+        operation_description="Get a category with its subtree and spending totals.",
+        manual_parameters=spending_parameters,
+        responses={200: CategorySerializer},
+    )
+    def retrieve(self, request, pk=None):
+        category = self.get_object()
+        tree = [
+            category,
+            *category.get_descendants().select_related("parent").order_by("path"),
+        ]
+        serializer = self.get_tree_serializer(category, tree, many=False)
+        return Response(serializer.data)
 
     def get_queryset(self):
         """Filter queryset to return only user's categories."""
         return self.queryset.filter(user=self.request.user)
 
+    def get_spending_range(self):
+        """Parse the optional start_date/end_date query parameters."""
+        dates = []
+        for name in ("start_date", "end_date"):
+            value = self.request.query_params.get(name)
+            parsed = parse_date(value) if value else None
+            if value and not parsed:
+                raise DRFValidationError({name: "Invalid date format. Use YYYY-MM-DD"})
+            dates.append(parsed)
+        return dates
+
+    def get_tree_serializer(
+        self, categories, tree, serializer_class=CategorySerializer, many=True
+    ):
+        """
+        Serialize ``categories`` with subcategories nested and spending totals
+        rolled up from the already loaded ``tree``.
+        """
+        start_date, end_date = self.get_spending_range()
+        context = self.get_serializer_context()
+        context["children"] = Category.children_map(tree)
+        context["spending"] = Category.spending_totals(
+            self.request.user, tree, start_date, end_date
+        )
+        return serializer_class(categories, many=many, context=context)
+
     def perform_create(self, serializer):
         """Save the category with the authenticated user."""
         serializer.save(user=self.request.user)
@@ -152,34 +335,213 @@ class CategoryViewSet(viewsets.ModelViewSet):
     def subcategories(self, request, pk=None):
         """Get all subcategories for a specific category."""
         category = self.get_object()
-        subcategories = Category.objects.filter(parent=category)
-        serializer = CategorySerializer(subcategories, many=True)
+        descendants = list(
+            category.get_descendants().select_related("parent").order_by("path")
+        )
+        children = [node for node in descendants if node.parent_id == category.pk]
+        serializer = self.get_tree_serializer(children, descendants)
+        return Response(serializer.data)
+
+    @swagger_auto_schema(
+        operation_description="Get the chain of parent categories, starting at the root.",
+        responses={200: CategoryNodeSerializer(many=True)},
+    )
+    @action(detail=True, methods=["get"])
+    def ancestors(self, request, pk=None):
+        """Get the ancestors of a specific category, root first."""
+        category = self.get_object()
+        serializer = CategoryNodeSerializer(category.get_ancestors(), many=True)
+        return Response(serializer.data)
+
+    @swagger_auto_schema(
+        operation_description="Get every category below a specific category.",
+        responses={200: CategoryNodeSerializer(many=True)},
+    )
+    @action(detail=True, methods=["get"])
+    def descendants(self, request, pk=None):
+        """Get all descendants of a specific category in tree order."""
+        category = self.get_object()
+        serializer = CategoryNodeSerializer(
+            category.get_descendants().order_by("path"), many=True
+        )
+        return Response(serializer.data)
+
+    @swagger_auto_schema(
+        operation_description="Get own and subtree expense totals for every category.",
+        manual_parameters=spending_parameters,
+        responses={200: CategorySpendingSerializer(many=True)},
+    )
+    @action(detail=False, methods=["get"])
+    def spending(self, request):
+        """Get spending per category, rolled up the hierarchy, in tree order."""
+        categories = list(self.get_queryset().order_by("path"))
+        serializer = self.get_tree_serializer(
+            categories, categories, serializer_class=CategorySpendingSerializer
+        )
         return Response(serializer.data)
 
 
-class TransactionViewSet(viewsets.ModelViewSet):
+class TransactionViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """ViewSet for managing Transaction model."""
 
     permission_classes = [IsAuthenticated]
     serializer_class = TransactionSerializer
     queryset = Transaction.objects.all()
+    filter_backends = [filters.DjangoFilterBackend]
     filterset_class = TransactionFilter
+    pagination_class = TransactionKeysetPagination
 
     @swagger_auto_schema(
         operation_description="List all transactions for the authenticated user.",
         responses={200: TransactionSerializer(many=True)},
     )
     def list(self, request):
-        return super().list(request)
+        page = self.paginate_queryset(self.filter_queryset(self.get_queryset()))
+        return self.get_paginated_response(
+            TransactionReadSerializer(page, many=True).data
+        )
+
+    @swagger_auto_schema(responses={200: TransactionSerializer})
+    def retrieve(self, request, pk=None):
+        return Response(TransactionReadSerializer(self.get_object()).data)
 
     def get_queryset(self):
         """Filter queryset to return only user's transactions."""
-        return self.queryset.filter(user=self.request.user)
+        queryset = self.queryset.filter(user=self.request.user)
+        if self.action in ("list", "retrieve"):
+            # Reads join the names they show; writes need the full rows.
+            queryset = TransactionReadSerializer.select(queryset)
+        return queryset
 
     def perform_create(self, serializer):
         """Save the transaction with the authenticated user."""
         serializer.save(user=self.request.user)
 
+    def varies_by_day(self, request):
+        # Forecasts default to today and charts to this year, which move
+        # without any write.
+        params = request.query_params
+        if self.action == "forecast":
+            return not params.get("as_of")
+        if self.action == "visualization_data":
+            return not (
+                params.get("year") or params.get("start_date") or params.get("end_date")
+            )
+        return False
+
+    @swagger_auto_schema(
+        operation_description="Import transactions in bulk from a CSV, JSON Lines or OFX file.",
+        manual_parameters=[
+            openapi.Parameter(
+                "file",
+                openapi.IN_FORM,
+                description="Statement file to import",
+                type=openapi.TYPE_FILE,
+                required=True,
+            ),
+            openapi.Parameter(
+                "file_format",
+                openapi.IN_FORM,
+                description="csv, jsonl or ofx (defaults to the file extension)",
+                type=openapi.TYPE_STRING,
+                required=False,
+            ),
+            openapi.Parameter(
+                "account",
+                openapi.IN_FORM,
+                description="Account used for rows that do not name one",
+                type=openapi.TYPE_INTEGER,
+                required=False,
+            ),
+        ],
+        responses={
+            201: "Import summary with per-row errors",
+            400: "Bad Request - Missing file, unknown format or no valid rows",
+        },
+    )
+    @action(
+        detail=False,
+        methods=["POST"],
+        url_path="import",
+        parser_classes=[MultiPartParser],
+    )
+    def import_transactions(self, request):
+        """Import a bank statement, reporting invalid rows without aborting."""
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response(
+                {"error": "file is required"}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        file_format = request.data.get("file_format") or upload.name.rsplit(".", 1)[-1]
+        file_format = file_format.lower()
+        if file_format not in IMPORT_FORMATS:
+            return Response(
+                {"error": f"file_format must be one of {', '.join(IMPORT_FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        account_id = request.data.get("account")
+        try:
+            account_id = int(account_id) if account_id else None
+        except ValueError:
+            account_id = -1
+        importer = TransactionImporter(request.user, default_account_id=account_id)
+        if account_id is not None and importer.context["default_account"] is None:
+            return Response(
+                {"error": "Unknown account"}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            check_encoding(upload)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        result = importer.run(PARSERS[file_format](upload))
+        return Response(
+            result,
+            status=(
+                status.HTTP_201_CREATED
+                if result["created"]
+                else status.HTTP_400_BAD_REQUEST
+            ),
+        )
+
+    @swagger_auto_schema(
+        operation_description="Download the user's transactions as CSV or NDJSON.",
+        manual_parameters=[
+            openapi.Parameter(
+                "file_format",
+                openapi.IN_QUERY,
+                description="csv (default) or ndjson",
+                type=openapi.TYPE_STRING,
+                required=False,
+            ),
+        ],
+        responses={
+            200: "Streamed transaction export",
+            400: "Bad Request - Unknown file_format",
+        },
+    )
+    @action(detail=False, methods=["GET"])
+    def export(self, request):
+        """Stream every matching transaction without loading them into memory."""
+        file_format = request.query_params.get("file_format", "csv").lower()
+        if file_format not in EXPORT_FORMATS:
+            return Response(
+                {"error": f"file_format must be one of {', '.join(EXPORT_FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        rows = export_rows(self.filter_queryset(self.get_queryset()))
+        response = StreamingHttpResponse(
+            STREAMERS[file_format](rows), content_type=EXPORT_FORMATS[file_format]
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="transactions.{file_format}"'
+        )
+        return response
+
     @swagger_auto_schema(
         operation_description="Generate a transaction report for a specific time period.",
         manual_parameters=[
@@ -199,6 +561,13 @@ class TransactionViewSet(viewsets.ModelViewSet):
                 format=openapi.FORMAT_DATE,
                 required=True,
             ),
+            openapi.Parameter(
+                "group_by",
+                openapi.IN_QUERY,
+                description="Bucket size for period_totals: day (default), week or month",
+                type=openapi.TYPE_STRING,
+                required=False,
+            ),
         ],
         responses={
             200: TransactionReportSerializer,
@@ -209,75 +578,26 @@ class TransactionViewSet(viewsets.ModelViewSet):
     def generate_report(self, request):
         """Generate a comprehensive transaction report for a specific time period."""
         try:
-            start_date = request.query_params.get("start_date")
-            end_date = request.query_params.get("end_date")
-
-            if not start_date or not end_date:
-                return Response(
-                    {"error": "start_date and end_date are required"},
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
-
-            try:
-                start_date = parse_date(start_date)
-                end_date = parse_date(end_date)
-                if not start_date or not end_date:
-                    raise ValidationError("Invalid date format")
-            except ValidationError:
-                return Response(
-                    {"error": "Invalid date format. Use YYYY-MM-DD"},
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
-
-            if start_date > end_date:
-                return Response(
-                    {"error": "start_date must be before end_date"},
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
-
-            transactions = Transaction.objects.filter(
-                user=request.user, date__range=[start_date, end_date]
-            )
+            start_date, end_date, group_by = report_parameters(request.query_params)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-            total_in = (
-                transactions.filter(type="IN").aggregate(total=Sum("amount"))["total"]
-                or 0
-            )
-            total_out = (
-                transactions.filter(type="OUT").aggregate(total=Sum("amount"))["total"]
-                or 0
+        try:
+            report_data, hit = analytics_cache.get_or_compute(
+                request.user,
+                "generate_report",
+                {
+                    "start_date": start_date,
+                    "end_date": end_date,
+                    "group_by": group_by,
+                },
+                lambda: build_report(request.user, start_date, end_date, group_by),
             )
 
-            report_data = {
-                "period": {
-                    "start_date": start_date.isoformat(),
-                    "end_date": end_date.isoformat(),
-                },
-                "summary": {
-                    "total_in": total_in,
-                    "total_out": total_out,
-                    "net": total_in - total_out,
-                },
-                "by_category": list(
-                    transactions.values("category__name")
-                    .annotate(total=Sum("amount"), count=Count("id"))
-                    .order_by("-total")
-                ),
-                "by_account": list(
-                    transactions.values("account__name")
-                    .annotate(total=Sum("amount"), count=Count("id"))
-                    .order_by("-total")
-                ),
-                "daily_totals": list(
-                    transactions.annotate(day=TruncDay("date"))
-                    .values("day")
-                    .annotate(total=Sum("amount"))
-                    .order_by("day")
-                ),
-            }
-
-            return Response(report_data)
+            return Response(report_data, headers=cache_headers(hit))
 
+        except MissingRateError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             return Response(
                 {"error": "An error occurred while generating the report"},
@@ -290,48 +610,130 @@ class TransactionViewSet(viewsets.ModelViewSet):
             openapi.Parameter(
                 "period",
                 openapi.IN_QUERY,
-                description="Period for visualization (monthly/yearly)",
+                description="Bucket size: daily, weekly, monthly (default), "
+                "quarterly or yearly",
                 type=openapi.TYPE_STRING,
                 required=False,
             ),
             openapi.Parameter(
                 "year",
                 openapi.IN_QUERY,
-                description="Year for visualization",
+                description="Year for visualization, unless a date range is given",
                 type=openapi.TYPE_INTEGER,
                 required=False,
             ),
+            openapi.Parameter(
+                "start_date",
+                openapi.IN_QUERY,
+                description="Start of the range (YYYY-MM-DD), with end_date",
+                type=openapi.TYPE_STRING,
+                required=False,
+            ),
+            openapi.Parameter(
+                "end_date",
+                openapi.IN_QUERY,
+                description="End of the range (YYYY-MM-DD), with start_date",
+                type=openapi.TYPE_STRING,
+                required=False,
+            ),
         ],
     )
     @action(detail=False, methods=["GET"])
     def visualization_data(self, request):
         """Get data formatted for visualization purposes."""
-        period = request.query_params.get("period", "monthly")
-        year = request.query_params.get("year", datetime.now().year)
-
-        transactions = Transaction.objects.filter(user=request.user, date__year=year)
-
-        if period == "monthly":
-            data = (
-                transactions.annotate(month=TruncMonth("date"))
-                .values("month")
-                .annotate(
-                    total_in=Sum("amount", filter=Q(type="IN")),
-                    total_out=Sum("amount", filter=Q(type="OUT")),
-                )
-                .order_by("month")
+        try:
+            period, start_date, end_date = visualization_parameters(
+                request.query_params
+            )
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            data, hit = analytics_cache.get_or_compute(
+                request.user,
+                "visualization_data",
+                {"period": period, "start_date": start_date, "end_date": end_date},
+                lambda: build_visualization(request.user, period, start_date, end_date),
+            )
+        except MissingRateError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(data, headers=cache_headers(hit))
+
+    @swagger_auto_schema(
+        operation_description="Spending trends and month-end projections per "
+        "category, with the active budgets projected to be exceeded.",
+        manual_parameters=[
+            openapi.Parameter(
+                "as_of",
+                openapi.IN_QUERY,
+                description="Day to forecast from (YYYY-MM-DD), default today",
+                type=openapi.TYPE_STRING,
+                format=openapi.FORMAT_DATE,
+                required=False,
+            ),
+            openapi.Parameter(
+                "months",
+                openapi.IN_QUERY,
+                description="Whole months of history to fit, 1 to 24 (default 3)",
+                type=openapi.TYPE_INTEGER,
+                required=False,
+            ),
+            openapi.Parameter(
+                "window",
+                openapi.IN_QUERY,
+                description="Moving-average window in days, 1 to 28 (default 7)",
+                type=openapi.TYPE_INTEGER,
+                required=False,
+            ),
+        ],
+        responses={200: "Spending forecast", 400: "Bad Request"},
+    )
+    @action(detail=False, methods=["GET"])
+    def forecast(self, request):
+        """Project each category's and active budget's spend from its trend."""
+        try:
+            as_of, months, window = forecast_parameters(request.query_params)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            data, hit = analytics_cache.get_or_compute(
+                request.user,
+                "forecast",
+                {"as_of": as_of, "months": months, "window": window},
+                lambda: build_forecast(request.user, as_of, months, window),
             )
+        except MissingRateError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(data, headers=cache_headers(hit))
 
-        category_data = (
-            transactions.values("category__name")
-            .annotate(total=Sum("amount"))
-            .order_by("-total")[:5]
+
+class RecurringTransactionViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
+    """
+    ViewSet for managing recurring transaction rules. Occurrences are posted
+    by the ``materialize_recurring`` management command.
+    """
+
+    permission_classes = [IsAuthenticated]
+    serializer_class = RecurringTransactionSerializer
+    queryset = RecurringTransaction.objects.all()
+
+    def get_queryset(self):
+        """Filter queryset to return only user's recurring transactions."""
+        return (
+            self.queryset.filter(user=self.request.user)
+            .select_related("account", "category")
+            .order_by("next_date", "pk")
         )
 
-        return Response({"time_series": data, "category_distribution": category_data})
+    def perform_create(self, serializer):
+        """Save the rule with the authenticated user."""
+        serializer.save(user=self.request.user)
 
 
-class BudgetViewSet(viewsets.ModelViewSet):
+class BudgetViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """ViewSet for managing Budget model."""
 
     permission_classes = [IsAuthenticated]
@@ -347,7 +749,9 @@ class BudgetViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         """Filter queryset to return only user's budgets."""
-        return self.queryset.filter(user=self.request.user)
+        # Progress is read from Budget.spent, so joining the category is the
+        # only extra work needed to serialize a page of budgets.
+        return self.queryset.filter(user=self.request.user).select_related("category")
 
     def perform_create(self, serializer):
         """Save the budget with the authenticated user."""
@@ -361,23 +765,22 @@ class BudgetViewSet(viewsets.ModelViewSet):
     def progress(self, request, pk=None):
         """Get progress information for a specific budget."""
         budget = self.get_object()
-        total_spent = (
-            Transaction.objects.filter(
-                category=budget.category,
-                date__range=[budget.start_date, budget.end_date],
-                type="OUT",
-            ).aggregate(total=Sum("amount"))["total"]
-            or 0
-        )
+        return Response(budget.get_progress())
 
-        return Response(
-            {
-                "budget_limit": budget.limit,
-                "total_spent": total_spent,
-                "remaining": budget.limit - total_spent,
-                "percentage_used": (total_spent / budget.limit) * 100,
-            }
-        )
+    @swagger_auto_schema(
+        operation_description="Get progress information for all of the user's budgets.",
+        responses={200: BudgetProgressSerializer(many=True)},
+    )
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="progress",
+        url_name="batch-progress",
+    )
+    def batch_progress(self, request):
+        """Get progress information for every budget in one response."""
+        serializer = BudgetProgressSerializer(self.get_queryset(), many=True)
+        return Response(serializer.data)
 
 
 class BudgetNotificationViewSet(viewsets.ReadOnlyModelViewSet):
@@ -50,6 +50,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "wallet_app.instrumentation.SQLInstrumentationMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -59,12 +60,12 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
-MIDDLEWARE.insert(1, "whitenoise.middleware.WhiteNoiseMiddleware")
+MIDDLEWARE.insert(2, "whitenoise.middleware.WhiteNoiseMiddleware")
 
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "wallet_app.authentication.CachedJWTAuthentication",
     ],
     "DEFAULT_RENDERER_CLASSES": [
         "rest_framework.renderers.JSONRenderer",
@@ -133,6 +134,84 @@ if not DATABASES["default"].get("ENGINE"):
     )
 
 
+# Caches
+# Analytics results (reports, charts) are cached per user and invalidated by a
+# per-user data version. "locmem" and "file" suit a single node and cull
+# entries past ANALYTICS_CACHE_MAX_ENTRIES: locmem drops the least recently
+# used third, the file backend a random third of its files. Any other value
+# is used as a Django cache backend path with ANALYTICS_CACHE_LOCATION.
+
+ANALYTICS_CACHE_BACKENDS = {
+    "locmem": "django.core.cache.backends.locmem.LocMemCache",
+    "file": "django.core.cache.backends.filebased.FileBasedCache",
+}
+ANALYTICS_CACHE_BACKEND = os.getenv("ANALYTICS_CACHE_BACKEND", "locmem")
+ANALYTICS_CACHE_TIMEOUT = int(os.getenv("ANALYTICS_CACHE_TIMEOUT", 3600))
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "analytics": {
+        "BACKEND": ANALYTICS_CACHE_BACKENDS.get(
+            ANALYTICS_CACHE_BACKEND, ANALYTICS_CACHE_BACKEND
+        ),
+        "LOCATION": os.getenv(
+            "ANALYTICS_CACHE_LOCATION",
+            (
+                str(BASE_DIR / "analytics_cache")
+                if ANALYTICS_CACHE_BACKEND == "file"
+                else "wallet-analytics"
+            ),
+        ),
+    },
+}
+if ANALYTICS_CACHE_BACKEND in ANALYTICS_CACHE_BACKENDS:
+    CACHES["analytics"]["OPTIONS"] = {
+        "MAX_ENTRIES": int(os.getenv("ANALYTICS_CACHE_MAX_ENTRIES", 5000)),
+    }
+
+# Worker threads (each with its own database connection) used by the async
+# analytics endpoints to run independent report sections concurrently.
+ASYNC_ANALYTICS_WORKERS = int(os.getenv("ASYNC_ANALYTICS_WORKERS", 4))
+
+
+# Currencies
+# Reports are in BASE_CURRENCY; amounts of accounts in other currencies are
+# converted with the daily rates in FxRate (see the load_fx_rates command).
+# Rates are cached per process: FX_RATE_CACHE_SIZE currency-months, each kept
+# for FX_RATE_CACHE_TTL seconds.
+
+BASE_CURRENCY = os.getenv("BASE_CURRENCY", "USD")
+FX_RATE_CACHE_SIZE = int(os.getenv("FX_RATE_CACHE_SIZE", 256))
+FX_RATE_CACHE_TTL = int(os.getenv("FX_RATE_CACHE_TTL", 3600))
+
+
+# Authentication
+# Users resolved from access tokens are cached per process for
+# AUTH_USER_CACHE_TTL seconds (0 disables the cache), up to
+# AUTH_USER_CACHE_SIZE users. Saving or deleting a user bumps its version in
+# the AUTH_USER_CACHE_ALIAS cache, which every request checks its entry
+# against. Point it at a cache shared by all workers (e.g. Redis) so
+# deactivation and password changes apply everywhere on the next request;
+# with the per-process default, other workers keep their entry until it
+# expires.
+
+AUTH_USER_CACHE_TTL = int(os.getenv("AUTH_USER_CACHE_TTL", 30))
+AUTH_USER_CACHE_SIZE = int(os.getenv("AUTH_USER_CACHE_SIZE", 1024))
+AUTH_USER_CACHE_ALIAS = os.getenv("AUTH_USER_CACHE_ALIAS", "default")
+
+
+# Request instrumentation
+# With SQL_INSTRUMENTATION=1 every response carries a Server-Timing header with
+# query count, database, serializer and render time, and requests over either
+# threshold are logged to "wallet_app.instrumentation" with their SQL.
+
+SQL_INSTRUMENTATION = os.getenv("SQL_INSTRUMENTATION", "0") == "1"
+SQL_INSTRUMENTATION_MAX_QUERIES = int(os.getenv("SQL_INSTRUMENTATION_MAX_QUERIES", 50))
+SQL_INSTRUMENTATION_SLOW_MS = float(os.getenv("SQL_INSTRUMENTATION_SLOW_MS", 500))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 